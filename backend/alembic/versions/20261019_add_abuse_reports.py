@@ -0,0 +1,57 @@
+"""
+abuse_reports queue + moderation_cases
+
+Revision ID: 20261019_add_abuse_reports
+Revises: 20261019_add_publication_status
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_abuse_reports'
+down_revision = '20261019_add_publication_status'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'moderation_cases',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('target_type', sa.String(length=10), nullable=False),
+        sa.Column('target_key', sa.String(length=500), nullable=False),
+        sa.Column('horse_id', sa.Integer(), sa.ForeignKey('horse_profiles.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('status', sa.String(length=10), nullable=False, server_default='open'),
+        sa.Column('report_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reasons', sa.JSON(), nullable=True),
+        sa.Column('flags', sa.JSON(), nullable=True),
+        sa.Column('first_reported_at', sa.DateTime(), nullable=False),
+        sa.Column('last_reported_at', sa.DateTime(), nullable=False),
+        sa.UniqueConstraint('target_type', 'target_key', name='uq_moderation_cases_target'),
+    )
+    op.create_index('ix_moderation_cases_status', 'moderation_cases', ['status', 'report_count'])
+
+    op.create_table(
+        'abuse_reports',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('target_type', sa.String(length=10), nullable=False),
+        sa.Column('target_key', sa.String(length=500), nullable=False),
+        sa.Column('reason', sa.String(length=30), nullable=False),
+        sa.Column('comment', sa.Text(), nullable=True),
+        sa.Column('reporter_key', sa.String(length=40), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.Column('case_id', sa.Integer(), sa.ForeignKey('moderation_cases.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('outcome', sa.String(length=10), nullable=True),
+    )
+    op.create_index('ix_abuse_reports_queue', 'abuse_reports', ['processed_at', 'id'])
+    op.create_index('ix_abuse_reports_case_reporter', 'abuse_reports', ['case_id', 'reporter_key'])
+
+
+def downgrade():
+    op.drop_index('ix_abuse_reports_case_reporter', table_name='abuse_reports')
+    op.drop_index('ix_abuse_reports_queue', table_name='abuse_reports')
+    op.drop_table('abuse_reports')
+    op.drop_index('ix_moderation_cases_status', table_name='moderation_cases')
+    op.drop_table('moderation_cases')
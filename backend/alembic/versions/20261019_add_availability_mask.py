@@ -0,0 +1,107 @@
+"""
+add available_mask (day/time-block bitmask) to riders, owners and horses
+
+Revision ID: 20261019_add_availability_mask
+Revises: 20250912_add_horse_ad_meta_fields
+Create Date: 2026-10-19
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_availability_mask'
+down_revision = '20250912_add_horse_ad_meta_fields'
+branch_labels = None
+depends_on = None
+
+TABLES = ('rider_profiles', 'owner_profiles', 'horse_profiles')
+CHUNK = 500
+
+# Bevroren kopie van availability.schedule_to_mask (bit dag * 3 + dagdeel), zodat
+# deze migratie niet meeverandert met de app-code
+DAYS = ('maandag', 'dinsdag', 'woensdag', 'donderdag', 'vrijdag', 'zaterdag', 'zondag')
+TIME_BLOCKS = ('ochtend', 'middag', 'avond')
+DAY_ALIASES = {
+    'monday': 'maandag', 'tuesday': 'dinsdag', 'wednesday': 'woensdag', 'thursday': 'donderdag',
+    'friday': 'vrijdag', 'saturday': 'zaterdag', 'sunday': 'zondag',
+}
+BLOCK_ALIASES = {'morning': 'ochtend', 'afternoon': 'middag', 'evening': 'avond'}
+
+PG_FUNCTIONS = (
+    """
+    CREATE OR REPLACE FUNCTION popcount(x bigint) RETURNS integer AS $$
+        SELECT length(replace(x::bit(64)::text, '0', ''))
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION mask_days(x bigint) RETURNS integer AS $$
+        SELECT count(*)::integer FROM generate_series(0, 6) AS d WHERE ((x >> (d * 3)) & 7) <> 0
+    $$ LANGUAGE sql IMMUTABLE
+    """,
+)
+
+
+def _index(value, names, aliases):
+    key = str(value or '').strip().lower()
+    key = aliases.get(key, key)
+    return names.index(key) if key in names else None
+
+
+def schedule_to_mask(schedule):
+    if not isinstance(schedule, dict):
+        return 0
+    mask = 0
+    for day, blocks in schedule.items():
+        d = _index(day, DAYS, DAY_ALIASES)
+        if d is None or not isinstance(blocks, (list, tuple, set)):
+            continue
+        for block in blocks:
+            b = _index(block, TIME_BLOCKS, BLOCK_ALIASES)
+            if b is not None:
+                mask |= 1 << (d * len(TIME_BLOCKS) + b)
+    return mask
+
+
+def _backfill(bind, table):
+    t = sa.table(table, sa.column('id', sa.Integer), sa.column('available_days', sa.JSON),
+                 sa.column('available_mask', sa.Integer))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(t.c.id, t.c.available_days).where(t.c.id > last_id).order_by(t.c.id).limit(CHUNK)
+        ).fetchall()
+        if not rows:
+            break
+        for row_id, days in rows:
+            if isinstance(days, str):
+                try:
+                    days = json.loads(days)
+                except ValueError:
+                    days = None
+            bind.execute(t.update().where(t.c.id == row_id).values(available_mask=schedule_to_mask(days)))
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('available_mask', sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for ddl in PG_FUNCTIONS:
+            op.execute(ddl)
+    for table in TABLES:
+        _backfill(bind, table)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute('DROP FUNCTION IF EXISTS mask_days(bigint)')
+        op.execute('DROP FUNCTION IF EXISTS popcount(bigint)')
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('available_mask')
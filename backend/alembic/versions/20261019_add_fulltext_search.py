@@ -0,0 +1,118 @@
+"""
+add full-text search on horse ads (SQLite FTS5 / Postgres tsvector)
+
+Revision ID: 20261019_add_fulltext_search
+Revises: 20261019_add_profile_tags
+Create Date: 2026-10-19
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_fulltext_search'
+down_revision = '20261019_add_profile_tags'
+branch_labels = None
+depends_on = None
+
+CHUNK = 500
+
+# Bevroren kopie van de index-opbouw in fulltext.py zoals bij deze revisie
+FTS_TABLE = 'horse_ads_fts'
+FTS_COLUMNS = ('title', 'description', 'breed', 'stable_city', 'keywords')
+JSON_COLUMNS = ('ad_types', 'coat_colors', 'temperament')
+SOURCE_COLUMNS = ('title', 'description', 'breed', 'stable_city', 'ad_type') + JSON_COLUMNS
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+# Postgres: gegenereerde kolom, gewicht A = titel/trefwoorden, B = ras/plaats, C = verhaal
+PG_SEARCH_VECTOR = """
+    setweight(to_tsvector('dutch', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('dutch',
+        coalesce(ad_type, '') || ' ' ||
+        translate(coalesce(ad_types::text, '') || ' ' || coalesce(coat_colors::text, '') || ' ' ||
+                  coalesce(temperament::text, ''), '[]",_', '     ')), 'A') ||
+    setweight(to_tsvector('dutch', coalesce(breed, '') || ' ' || coalesce(stable_city, '')), 'B') ||
+    setweight(to_tsvector('dutch', coalesce(description, '')), 'C')
+"""
+
+
+def _light_stem(word):
+    for suffix in ('heden', 'en', 'e', 's'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            break
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in 'aeiou':
+        word = word[:-1]
+    return word
+
+
+def _stemmer():
+    try:
+        import snowballstemmer
+    except ImportError:
+        return _light_stem
+    return snowballstemmer.stemmer('dutch').stemWord
+
+
+def _tokens(value, stem):
+    value = unicodedata.normalize('NFKD', str(value or '').lower())
+    value = ''.join(ch for ch in value if not unicodedata.combining(ch))
+    return ' '.join(stem(w) for w in _WORD_RE.findall(value))
+
+
+def _document(row, stem):
+    keywords = [v for col in JSON_COLUMNS for v in (row.get(col) or [])]
+    if row.get('ad_type'):
+        keywords.append(row['ad_type'])
+    raw = {
+        'title': row.get('title'),
+        'description': row.get('description'),
+        'breed': row.get('breed'),
+        'stable_city': row.get('stable_city'),
+        'keywords': ' '.join(str(v).replace('_', ' ') for v in keywords),
+    }
+    return {k: _tokens(v, stem) for k, v in raw.items()}
+
+
+def _backfill_sqlite(bind):
+    t = sa.table('horse_profiles', sa.column('id', sa.Integer),
+                 *[sa.column(c, sa.JSON if c in JSON_COLUMNS else sa.String) for c in SOURCE_COLUMNS])
+    insert = sa.text(
+        f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) VALUES (:id, {', '.join(':' + c for c in FTS_COLUMNS)})"
+    )
+    stem = _stemmer()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(t.c.id, *[t.c[c] for c in SOURCE_COLUMNS]).where(t.c.id > last_id).order_by(t.c.id).limit(CHUNK)
+        ).mappings().fetchall()
+        if not rows:
+            break
+        bind.execute(insert, [{'id': row['id'], **_document(row, stem)} for row in rows])
+        last_id = rows[-1]['id']
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            f"ALTER TABLE horse_profiles ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({PG_SEARCH_VECTOR}) STORED"
+        )
+        op.create_index('ix_horse_profiles_search_vector', 'horse_profiles', ['search_vector'], postgresql_using='gin')
+    elif bind.dialect.name == 'sqlite':
+        op.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({', '.join(FTS_COLUMNS)}, "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        _backfill_sqlite(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.drop_index('ix_horse_profiles_search_vector', table_name='horse_profiles')
+        op.drop_column('horse_profiles', 'search_vector')
+    elif bind.dialect.name == 'sqlite':
+        op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
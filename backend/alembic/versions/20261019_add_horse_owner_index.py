@@ -0,0 +1,22 @@
+"""
+add (owner_profile_id, id, updated_at) index on horse_profiles
+
+Revision ID: 20261019_add_horse_owner_index
+Revises: 20261019_add_profile_versions
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_horse_owner_index'
+down_revision = '20261019_add_profile_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_horse_profiles_owner', 'horse_profiles', ['owner_profile_id', 'id', 'updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_horse_profiles_owner', table_name='horse_profiles')
@@ -0,0 +1,25 @@
+"""
+add version to horse_profiles (partial updates / optimistic concurrency)
+
+Revision ID: 20261019_add_horse_version
+Revises: 20261019_add_fulltext_search
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_horse_version'
+down_revision = '20261019_add_fulltext_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('horse_profiles') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('horse_profiles') as batch_op:
+        batch_op.drop_column('version')
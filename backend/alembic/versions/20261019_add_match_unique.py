@@ -0,0 +1,41 @@
+"""
+matches: unique (rider_profile_id, horse_profile_id)
+
+Revision ID: 20261019_add_match_unique
+Revises: 20261019_add_jobs
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_match_unique'
+down_revision = '20261019_add_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    conn = op.get_bind()
+    # Dubbele paren samenvoegen in de oudste rij: likes OR-en, daarna de rest weg
+    dupes = conn.execute(sa.text(
+        "SELECT rider_profile_id, horse_profile_id, MIN(id), "
+        "MAX(CASE WHEN rider_liked THEN 1 ELSE 0 END), MAX(CASE WHEN owner_liked THEN 1 ELSE 0 END) "
+        "FROM matches GROUP BY rider_profile_id, horse_profile_id HAVING COUNT(*) > 1"
+    )).all()
+    for rider_id, horse_id, keep_id, rider_liked, owner_liked in dupes:
+        rider_liked, owner_liked = bool(rider_liked), bool(owner_liked)
+        conn.execute(sa.text(
+            "UPDATE matches SET rider_liked = :r, owner_liked = :o, is_mutual_match = :m WHERE id = :id"
+        ), {"r": rider_liked, "o": owner_liked, "m": rider_liked and owner_liked, "id": keep_id})
+        conn.execute(sa.text(
+            "DELETE FROM matches WHERE rider_profile_id = :r AND horse_profile_id = :h AND id <> :id"
+        ), {"r": rider_id, "h": horse_id, "id": keep_id})
+
+    with op.batch_alter_table('matches') as batch_op:
+        batch_op.create_unique_constraint('uq_matches_rider_horse', ['rider_profile_id', 'horse_profile_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('matches') as batch_op:
+        batch_op.drop_constraint('uq_matches_rider_horse', type_='unique')
@@ -0,0 +1,97 @@
+"""
+add profile_tags (normalized list values for indexed filtering)
+
+Revision ID: 20261019_add_profile_tags
+Revises: 20261019_no_gos_native_json
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_profile_tags'
+down_revision = '20261019_no_gos_native_json'
+branch_labels = None
+depends_on = None
+
+TABLES = {'horse': 'horse_profiles', 'rider': 'rider_profiles'}
+CHUNK = 500
+
+# Bevroren kopie van tags.TAGGED/extract_tags zoals bij deze revisie; latere
+# attributen (bv. no_gos) backfillt hun eigen migratie
+TAGGED = {
+    'horse': {
+        'ad_types': ('ad_types', 'ad_type'),
+        'temperament': ('temperament',),
+        'coat_colors': ('coat_colors',),
+        'disciplines': ('disciplines',),
+        'required_skills': ('required_skills',),
+    },
+    'rider': {
+        'general_skills': ('general_skills',),
+        'riding_styles': ('riding_styles',),
+        'discipline_preferences': ('discipline_preferences',),
+    },
+}
+
+
+def _values(raw):
+    if raw is None:
+        return []
+    if isinstance(raw, dict):
+        raw = list(raw.keys())
+    elif isinstance(raw, str):
+        raw = [raw]
+    return [str(v).strip().lower()[:100] for v in raw if v is not None and str(v).strip()]
+
+
+def extract_tags(entity, row):
+    return {
+        attribute: {v for col in columns for v in _values(row.get(col))}
+        for attribute, columns in TAGGED[entity].items()
+    }
+
+
+def _backfill(bind, tags_table, entity):
+    columns = sorted({c for cols in TAGGED[entity].values() for c in cols})
+    # ad_type is een gewone string, de rest JSON
+    t = sa.table(TABLES[entity], sa.column('id', sa.Integer),
+                 *[sa.column(c, sa.String if c == 'ad_type' else sa.JSON) for c in columns])
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(t.c.id, *[t.c[c] for c in columns]).where(t.c.id > last_id).order_by(t.c.id).limit(CHUNK)
+        ).mappings().fetchall()
+        if not rows:
+            break
+        values = [
+            {'entity': entity, 'entity_id': row['id'], 'attribute': attribute, 'value': value}
+            for row in rows
+            for attribute, vals in extract_tags(entity, dict(row)).items()
+            for value in sorted(vals)
+        ]
+        if values:
+            bind.execute(tags_table.insert(), values)
+        last_id = rows[-1]['id']
+
+
+def upgrade():
+    tags_table = op.create_table(
+        'profile_tags',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('entity', sa.String(length=10), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('attribute', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.String(length=100), nullable=False),
+        sa.UniqueConstraint('entity', 'entity_id', 'attribute', 'value', name='uq_profile_tags_entity_attr_value'),
+    )
+    op.create_index('ix_profile_tags_lookup', 'profile_tags', ['entity', 'attribute', 'value', 'entity_id'])
+
+    bind = op.get_bind()
+    for entity in TABLES:
+        _backfill(bind, tags_table, entity)
+
+
+def downgrade():
+    op.drop_index('ix_profile_tags_lookup', table_name='profile_tags')
+    op.drop_table('profile_tags')
@@ -0,0 +1,29 @@
+"""
+add version to rider_profiles / owner_profiles (optimistic concurrency)
+
+Revision ID: 20261019_add_profile_versions
+Revises: 20261019_add_horse_version
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_profile_versions'
+down_revision = '20261019_add_horse_version'
+branch_labels = None
+depends_on = None
+
+TABLES = ('rider_profiles', 'owner_profiles')
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('version')
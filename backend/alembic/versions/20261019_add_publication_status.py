@@ -0,0 +1,175 @@
+"""
+publication status (draft/published) for horses and riders + published_ads read table
+
+Revision ID: 20261019_add_publication_status
+Revises: 20261019_add_horse_owner_index
+Create Date: 2026-10-19
+"""
+import json
+import math
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_publication_status'
+down_revision = '20261019_add_horse_owner_index'
+branch_labels = None
+depends_on = None
+
+CHUNK = 500
+
+# Bevroren kopie van published_ads.ad_values en de card view (serializers.CARD_FIELDS)
+# zoals bij deze revisie. Kolomtypes zodat JSON/datums net zo binnenkomen als via de ORM.
+GEO_CELL_DEGREES = 0.1
+SOURCE_TYPES = {
+    'id': sa.Integer, 'owner_profile_id': sa.Integer, 'status': sa.String,
+    'title': sa.String, 'name': sa.String, 'type': sa.String, 'age': sa.Integer, 'height': sa.Integer,
+    'ad_type': sa.String, 'ad_types': sa.JSON, 'photos': sa.JSON, 'stable_city': sa.String,
+    'cost_model': sa.String, 'cost_amount': sa.Integer, 'available_mask': sa.Integer,
+    'min_days_per_week': sa.Integer, 'stable_lat': sa.Float, 'stable_lon': sa.Float, 'updated_at': sa.DateTime,
+}
+
+
+def _card(row):
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'name': row['name'],
+        'type': row['type'],
+        'age': row['age'],
+        'height': row['height'],
+        'ad_type': row['ad_type'],
+        'ad_types': row['ad_types'] or [],
+        'cover_photo': row['photos'][0] if row['photos'] else None,
+        'is_available': True,
+        'stable_city': row['stable_city'],
+        'cost_model': row['cost_model'],
+        'cost_amount': row['cost_amount'],
+    }
+
+
+def _geo_cell(lat, lon):
+    if lat is None or lon is None:
+        return None
+    return f'{math.floor(lat / GEO_CELL_DEGREES)}:{math.floor(lon / GEO_CELL_DEGREES)}'
+
+
+def ad_values(row):
+    return {
+        'horse_id': row['id'],
+        'owner_profile_id': row['owner_profile_id'],
+        'card': json.dumps(_card(row), ensure_ascii=False, separators=(',', ':')),
+        'available_mask': row['available_mask'] or 0,
+        'min_days_per_week': row['min_days_per_week'],
+        'geo_cell': _geo_cell(row['stable_lat'], row['stable_lon']),
+        'lat': row['stable_lat'],
+        'lon': row['stable_lon'],
+        'cost_model': row['cost_model'],
+        'cost_amount': row['cost_amount'],
+        'updated_at': row['updated_at'] or datetime.utcnow(),
+    }
+
+
+def _no_gos(raw):
+    # tags._values/normalize voor een JSON-lijst
+    if isinstance(raw, str):
+        raw = [raw]
+    return {str(v).strip().lower()[:100] for v in raw or [] if v is not None and str(v).strip()}
+
+
+def _chunks(bind, t, *criteria):
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(t).where(t.c.id > last_id, *criteria).order_by(t.c.id).limit(CHUNK)
+        ).mappings().fetchall()
+        if not rows:
+            break
+        yield rows
+        last_id = rows[-1]['id']
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # is_available -> status
+    with op.batch_alter_table('horse_profiles') as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=10), nullable=False, server_default='draft'))
+    horses = sa.table('horse_profiles', sa.column('status', sa.String), sa.column('is_available', sa.Boolean))
+    op.execute(horses.update().where(horses.c.is_available.is_(True)).values(status='published'))
+    with op.batch_alter_table('horse_profiles') as batch_op:
+        batch_op.drop_column('is_available')
+
+    # Ruiters: gepubliceerd was users.onboarding_completed
+    with op.batch_alter_table('rider_profiles') as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(length=10), nullable=False, server_default='draft'))
+    riders = sa.table('rider_profiles', sa.column('status', sa.String), sa.column('user_id', sa.Integer))
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('onboarding_completed', sa.Boolean))
+    op.execute(riders.update().where(
+        riders.c.user_id.in_(sa.select(users.c.id).where(users.c.onboarding_completed.is_(True)))
+    ).values(status='published'))
+
+    ads = op.create_table(
+        'published_ads',
+        sa.Column('horse_id', sa.Integer(), sa.ForeignKey('horse_profiles.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('owner_profile_id', sa.Integer(), nullable=False),
+        sa.Column('card', sa.Text(), nullable=False),
+        sa.Column('available_mask', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('min_days_per_week', sa.Integer(), nullable=True),
+        sa.Column('geo_cell', sa.String(length=16), nullable=True),
+        sa.Column('lat', sa.Float(), nullable=True),
+        sa.Column('lon', sa.Float(), nullable=True),
+        sa.Column('cost_model', sa.String(length=20), nullable=True),
+        sa.Column('cost_amount', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_published_ads_recent', 'published_ads', ['updated_at', 'horse_id'])
+    op.create_index('ix_published_ads_geo_cell', 'published_ads', ['geo_cell'])
+
+    source = sa.table('horse_profiles', *[sa.column(c, t) for c, t in SOURCE_TYPES.items()])
+    for rows in _chunks(bind, source, source.c.status == 'published'):
+        bind.execute(ads.insert(), [ad_values(dict(row)) for row in rows])
+
+    # no_gos als tag, zodat "exclude_no_gos" de index gebruikt i.p.v. JSON te decoderen.
+    # Tags die er al staan overslaan: databases die add_profile_tags draaiden toen die
+    # de live tags.TAGGED (incl. no_gos) las, hebben ze al.
+    tags_table = sa.table('profile_tags', sa.column('entity', sa.String), sa.column('entity_id', sa.Integer),
+                          sa.column('attribute', sa.String), sa.column('value', sa.String))
+    no_gos = sa.table('horse_profiles', sa.column('id', sa.Integer), sa.column('no_gos', sa.JSON))
+    for rows in _chunks(bind, no_gos, no_gos.c.no_gos.isnot(None)):
+        existing = set(bind.execute(
+            sa.select(tags_table.c.entity_id, tags_table.c.value).where(
+                tags_table.c.entity == 'horse',
+                tags_table.c.attribute == 'no_gos',
+                tags_table.c.entity_id.in_([row['id'] for row in rows]),
+            )
+        ).fetchall())
+        values = [
+            {'entity': 'horse', 'entity_id': row['id'], 'attribute': 'no_gos', 'value': value}
+            for row in rows
+            for value in sorted(_no_gos(row['no_gos']))
+            if (row['id'], value) not in existing
+        ]
+        if values:
+            bind.execute(tags_table.insert(), values)
+
+
+def downgrade():
+    tags_table = sa.table('profile_tags', sa.column('entity', sa.String), sa.column('attribute', sa.String))
+    op.execute(tags_table.delete().where(tags_table.c.entity == 'horse', tags_table.c.attribute == 'no_gos'))
+
+    op.drop_index('ix_published_ads_geo_cell', table_name='published_ads')
+    op.drop_index('ix_published_ads_recent', table_name='published_ads')
+    op.drop_table('published_ads')
+
+    with op.batch_alter_table('rider_profiles') as batch_op:
+        batch_op.drop_column('status')
+
+    with op.batch_alter_table('horse_profiles') as batch_op:
+        batch_op.add_column(sa.Column('is_available', sa.Boolean(), nullable=True))
+    horses = sa.table('horse_profiles', sa.column('status', sa.String), sa.column('is_available', sa.Boolean))
+    op.execute(horses.update().values(is_available=(horses.c.status == 'published')))
+    with op.batch_alter_table('horse_profiles') as batch_op:
+        batch_op.drop_column('status')
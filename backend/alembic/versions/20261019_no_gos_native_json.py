@@ -0,0 +1,90 @@
+"""
+store no_gos / health_limitations as native JSON instead of JSON-in-Text
+
+Revision ID: 20261019_no_gos_native_json
+Revises: 20261019_add_availability_mask
+Create Date: 2026-10-19
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_no_gos_native_json'
+down_revision = '20261019_add_availability_mask'
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    'horse_profiles': ('no_gos',),
+    'rider_profiles': ('no_gos', 'health_limitations'),
+}
+CHUNK = 500
+
+
+def _to_json(text):
+    if text is None or text == '':
+        return None
+    try:
+        val = json.loads(text)
+    except (TypeError, ValueError):
+        # losse tekst (oude records) als één item bewaren
+        return [text]
+    if val is None or isinstance(val, list):
+        return val
+    return [val]
+
+
+def _to_text(val):
+    return None if val is None else json.dumps(val)
+
+
+def _copy(bind, table, src_type, dst_type, convert, suffix_src, suffix_dst):
+    """Kopieer in chunks (op id) van `<col><suffix_src>` naar `<col><suffix_dst>`."""
+    cols = COLUMNS[table]
+    src = [sa.column(c + suffix_src, src_type) for c in cols]
+    dst = [sa.column(c + suffix_dst, dst_type) for c in cols]
+    t = sa.table(table, sa.column('id', sa.Integer), *src, *dst)
+    stmt = t.update().where(t.c.id == sa.bindparam('_id')).values(
+        {d.name: sa.bindparam('_' + d.name) for d in dst}
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(t.c.id, *[t.c[s.name] for s in src]).where(t.c.id > last_id).order_by(t.c.id).limit(CHUNK)
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(stmt, [
+            {'_id': row[0], **{'_' + d.name: convert(row[i + 1]) for i, d in enumerate(dst)}}
+            for row in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def _swap(table, new_type, suffix):
+    with op.batch_alter_table(table) as batch_op:
+        for col in COLUMNS[table]:
+            batch_op.drop_column(col)
+            batch_op.alter_column(col + suffix, new_column_name=col, existing_type=new_type)
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table, cols in COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for col in cols:
+                batch_op.add_column(sa.Column(col + '_json', sa.JSON(), nullable=True))
+        _copy(bind, table, sa.Text, sa.JSON(none_as_null=True), _to_json, '', '_json')
+        _swap(table, sa.JSON(), '_json')
+
+
+def downgrade():
+    bind = op.get_bind()
+    for table, cols in COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for col in cols:
+                batch_op.add_column(sa.Column(col + '_text', sa.Text(), nullable=True))
+        _copy(bind, table, sa.JSON, sa.Text, _to_text, '', '_text')
+        _swap(table, sa.Text(), '_text')
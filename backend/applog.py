@@ -0,0 +1,186 @@
+"""Gestructureerde logging voor de API.
+
+- Eén `QueueHandler` op de root logger: de request-thread/event loop zet alleen
+  een record in een queue, een `QueueListener` thread schrijft naar stdout.
+- Elke regel is JSON (of leesbare tekst met LOG_FORMAT=text) met `request_id`,
+  gezet door `RequestIdMiddleware` (overgenomen uit X-Request-ID of nieuw).
+- DEBUG records worden gesampled (LOG_DEBUG_SAMPLE, default 0.01); een record
+  met `extra={"sample": 1.0}` overschrijft dat per call.
+
+Configuratie via env: LOG_LEVEL (INFO), LOG_FORMAT (json), LOG_DEBUG_SAMPLE.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Attributen die elk LogRecord heeft; de rest komt uit `extra=` en gaat mee als veld
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "sample"}
+
+# HTTP clients loggen elke request op INFO; alleen waarschuwingen doorlaten
+QUIET_LOGGERS = ("httpx", "urllib3")
+
+_listener = None
+_exc_formatter = logging.Formatter()
+
+
+class RequestIdFilter(logging.Filter):
+    """Kopieert de request-id uit de context naar het record (draait in de aanroepende taak)."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Laat een fractie van de DEBUG records door; INFO en hoger altijd."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = getattr(record, "sample", self.rate)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = {k: v for k, v in vars(record).items() if k not in _RESERVED}
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class _PreparedQueueHandler(QueueHandler):
+    """Rendert msg/args en traceback in de aanroepende taak; de stdlib zou de traceback in msg plakken."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+def setup_logging(level: str = None, fmt: str = None, debug_sample: float = None):
+    """Idempotent: installeer queue-gebaseerde logging op de root logger."""
+    global _listener
+    if _listener is not None:
+        return
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = fmt or os.getenv("LOG_FORMAT", "json")
+    if debug_sample is None:
+        debug_sample = float(os.getenv("LOG_DEBUG_SAMPLE", "0.01"))
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    handler = _PreparedQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(SamplingFilter(debug_sample))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush de queue en stop de listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+access_log = logging.getLogger("horsesharing.access")
+SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "500"))
+
+
+class RequestIdMiddleware:
+    """ASGI middleware: request-id in context + X-Request-ID header + access log.
+
+    Access log: WARNING bij 5xx of trager dan LOG_SLOW_REQUEST_MS, anders DEBUG (gesampled).
+    Een SSE-stream (text/event-stream) duurt per definitie lang en telt niet als traag.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")[:64]
+                break
+        request_id = incoming or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+        status = 500
+        streaming = False
+        started = time.perf_counter()
+
+        async def send_with_id(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(k == b"content-type" and v.startswith(b"text/event-stream") for k, v in message.get("headers", ()))
+                message["headers"] = list(message.get("headers", ())) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            slow = duration_ms >= SLOW_REQUEST_MS and not streaming
+            level = logging.WARNING if status >= 500 or slow else logging.DEBUG
+            if access_log.isEnabledFor(level):
+                access_log.log(level, "%s %s %s", scope["method"], scope["path"], status,
+                               extra={"status": status, "duration_ms": duration_ms})
+            request_id_var.reset(token)
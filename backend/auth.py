@@ -1,30 +1,37 @@
-import os
-import requests
+import logging
+import time
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, undefer
 from database import get_db
-from models import User
-from dotenv import load_dotenv
-
-load_dotenv()
+from models import User, OwnerProfile, RiderProfile
+from metrics import KINDE_VERIFY_SECONDS
+from ratelimit import verified_tokens
+from settings import get_settings
 
 security = HTTPBearer()
-
-KINDE_DOMAIN = os.getenv("KINDE_DOMAIN")
-KINDE_CLIENT_ID = os.getenv("KINDE_CLIENT_ID")
-KINDE_CLIENT_SECRET = os.getenv("KINDE_CLIENT_SECRET")
+log = logging.getLogger("horsesharing.auth")
 
 def verify_kinde_token(token: str) -> dict:
     """Verify Kinde JWT token and return user info"""
+    import requests  # pas bij de eerste verificatie laden (startup)
+    kinde_domain = get_settings().kinde_domain
     try:
         # Get Kinde public keys for token verification
-        jwks_url = f"{KINDE_DOMAIN}/.well-known/jwks"
+        jwks_url = f"{kinde_domain}/.well-known/jwks"
         
         # For now, we'll use Kinde's user info endpoint to verify token
         headers = {"Authorization": f"Bearer {token}"}
-        response = requests.get(f"{KINDE_DOMAIN}/oauth2/user_profile", headers=headers)
-        
+        started = time.perf_counter()
+        try:
+            response = requests.get(f"{kinde_domain}/oauth2/user_profile", headers=headers)
+        except Exception:
+            KINDE_VERIFY_SECONDS.observe(("error",), time.perf_counter() - started)
+            raise
+        outcome = "ok" if response.status_code == 200 else "invalid"
+        KINDE_VERIFY_SECONDS.observe((outcome,), time.perf_counter() - started)
+
         if response.status_code != 200:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -38,6 +45,18 @@ def verify_kinde_token(token: str) -> dict:
             detail="Token verification failed"
         )
 
+def load_user(db: Session, *criteria):
+    """User + (smalle) owner/rider profielen in één query, zodat /auth/me e.d. niet lazy laden."""
+    return (
+        db.query(User)
+        .options(
+            joinedload(User.owner_profile).load_only(OwnerProfile.id, OwnerProfile.user_id, OwnerProfile.photo_url, OwnerProfile.version),
+            joinedload(User.rider_profile).load_only(RiderProfile.id, RiderProfile.user_id, RiderProfile.version, RiderProfile.status),
+        )
+        .filter(*criteria)
+        .first()
+    )
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -45,14 +64,12 @@ def get_current_user(
     """Get current authenticated user"""
     token = credentials.credentials
     kinde_user = verify_kinde_token(token)
-    # Debug: laat zien welke velden Kinde teruggeeft (eenmalig nuttig bij integratie)
-    try:
-        print(f"Kinde user keys: {list(kinde_user.keys())}")
-    except Exception:
-        pass
+    # Debug: welke velden Kinde teruggeeft (gesampled, alleen bij LOG_LEVEL=DEBUG)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Kinde user keys", extra={"keys": sorted(kinde_user)})
     
     # Get or create user in our database
-    user = db.query(User).filter(User.kinde_id == kinde_user["id"]).first()
+    user = load_user(db, User.kinde_id == kinde_user["id"])
 
     # Prepare robust fields from Kinde
     given = (kinde_user.get("given_name") or kinde_user.get("first_name") or "").strip()
@@ -98,11 +115,53 @@ def get_current_user(
                 user.email = token_email
                 updated = True
         if updated:
+            user_id = user.id
             db.commit()
-            db.refresh(user)
+            user = load_user(db, User.id == user_id)
 
+    # Voor de rate limiter: vanaf nu telt dit token in de bucket van deze gebruiker
+    verified_tokens.remember(token, user.id)
     return user
 
+# Profiel-dependencies. FastAPI cachet een dependency per request: een route en
+# haar sub-dependencies die `current_owner` gebruiken delen één uitkomst, en die
+# komt uit de joinedload van `load_user` (geen extra query). De `*_profile`
+# varianten laden de overige kolommen met één SELECT op de primary key.
+
+def current_owner(current_user: User = Depends(get_current_user)) -> OwnerProfile | None:
+    """Eigenaarsprofiel van de gebruiker (id/version/photo_url geladen) of None."""
+    return current_user.owner_profile
+
+def current_rider(current_user: User = Depends(get_current_user)) -> RiderProfile | None:
+    """Ruiterprofiel van de gebruiker (id/version/status geladen) of None."""
+    return current_user.rider_profile
+
+def require_owner(owner: OwnerProfile | None = Depends(current_owner)) -> OwnerProfile:
+    if owner is None:
+        raise HTTPException(status_code=404, detail="Owner profile not found")
+    return owner
+
+def require_rider(rider: RiderProfile | None = Depends(current_rider)) -> RiderProfile:
+    if rider is None:
+        raise HTTPException(status_code=404, detail="Rider profile not found")
+    return rider
+
+def _full(db: Session, profile):
+    if profile is None:
+        return None
+    model = type(profile)
+    return db.execute(
+        select(model).options(undefer("*")).where(model.id == profile.id).execution_options(populate_existing=True)
+    ).scalar_one()
+
+def owner_profile(owner: OwnerProfile | None = Depends(current_owner), db: Session = Depends(get_db)) -> OwnerProfile | None:
+    """Volledig eigenaarsprofiel of None."""
+    return _full(db, owner)
+
+def rider_profile(rider: RiderProfile | None = Depends(current_rider), db: Session = Depends(get_db)) -> RiderProfile | None:
+    """Volledig ruiterprofiel of None."""
+    return _full(db, rider)
+
 def get_optional_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -112,3 +171,64 @@ def get_optional_user(
         return get_current_user(credentials, db)
     except HTTPException:
         return None
+
+def sync_kinde_user(kinde_id: str, name: str | None = None, phone: str | None = None, strict: bool = False):
+    """Best-effort: naam/telefoon naar Kinde via de Management API (alleen met M2M creds).
+
+    Eén token-request en één PATCH; fouten zijn niet fataal voor de lokale update.
+    Met `strict` volgt een RuntimeError, zodat de `kinde_sync` job opnieuw probeert.
+    """
+    settings = get_settings()
+    m2m_client_id = settings.kinde_m2m_client_id
+    m2m_client_secret = settings.kinde_m2m_client_secret
+    kinde_domain = settings.kinde_domain
+    kinde_audience = settings.kinde_audience
+    kinde_scope = settings.kinde_m2m_scope
+    if not (m2m_client_id and m2m_client_secret and kinde_domain and kinde_id and (name or phone)):
+        return
+    import requests
+    body = {}
+    if name:
+        parts = name.strip().split(" ", 1)
+        given = parts[0] if parts else ""
+        family = parts[1] if len(parts) > 1 else ""
+        # Stuur beide varianten voor maximale compatibiliteit
+        body.update({"first_name": given, "last_name": family, "given_name": given, "family_name": family,
+                     "name": name})
+    if phone:
+        body["phone_number"] = phone
+    try:
+        token_resp = requests.post(
+            f"{kinde_domain}/oauth2/token",
+            data={
+                "grant_type": "client_credentials",
+                "client_id": m2m_client_id,
+                "client_secret": m2m_client_secret,
+                **({"audience": kinde_audience} if kinde_audience else {}),
+                **({"scope": kinde_scope} if kinde_scope else {}),
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=10,
+        )
+        if not token_resp.ok:
+            log.warning("Kinde M2M token failed", extra={"status": token_resp.status_code})
+            if strict:
+                raise RuntimeError(f"Kinde M2M token failed: {token_resp.status_code}")
+            return
+        access_token = token_resp.json().get("access_token")
+        patch_resp = requests.patch(
+            f"{kinde_domain}/api/v1/user",
+            json=body,
+            params={"id": kinde_id},
+            headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
+            timeout=10,
+        )
+        if not patch_resp.ok:
+            log.warning("Kinde user PATCH failed", extra={"status": patch_resp.status_code, "fields": sorted(body)})
+            if strict:
+                raise RuntimeError(f"Kinde user PATCH failed: {patch_resp.status_code}")
+    except Exception:
+        if strict:
+            raise
+        # Niet fatal; lokale update gaat door
+        log.warning("Kinde user sync failed", exc_info=True)
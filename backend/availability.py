@@ -0,0 +1,120 @@
+"""Beschikbaarheid als bitmask (7 dagen x 3 dagdelen).
+
+`available_days` blijft de JSON-bron ({"maandag": ["ochtend", "avond"], ...}).
+Bij elke write wordt `available_mask` afgeleid, zodat overlap en
+`min_days_per_week` checks in Python en in SQL één integer-operatie zijn.
+
+Bit-indeling: bit (dag * 3 + dagdeel), maandag/ochtend = bit 0.
+"""
+from sqlalchemy import func
+
+DAYS = ("maandag", "dinsdag", "woensdag", "donderdag", "vrijdag", "zaterdag", "zondag")
+TIME_BLOCKS = ("ochtend", "middag", "avond")
+
+# Oudere records gebruiken Engelse sleutels (zie comments in models.py)
+DAY_ALIASES = {
+    "monday": "maandag",
+    "tuesday": "dinsdag",
+    "wednesday": "woensdag",
+    "thursday": "donderdag",
+    "friday": "vrijdag",
+    "saturday": "zaterdag",
+    "sunday": "zondag",
+}
+BLOCK_ALIASES = {
+    "morning": "ochtend",
+    "afternoon": "middag",
+    "evening": "avond",
+}
+
+BLOCKS_PER_DAY = len(TIME_BLOCKS)
+DAY_BITS = (1 << BLOCKS_PER_DAY) - 1
+FULL_MASK = (1 << (len(DAYS) * BLOCKS_PER_DAY)) - 1
+
+_DAY_INDEX = {d: i for i, d in enumerate(DAYS)}
+_BLOCK_INDEX = {b: i for i, b in enumerate(TIME_BLOCKS)}
+
+
+def _day_index(day):
+    key = str(day or "").strip().lower()
+    return _DAY_INDEX.get(DAY_ALIASES.get(key, key))
+
+
+def _block_index(block):
+    key = str(block or "").strip().lower()
+    return _BLOCK_INDEX.get(BLOCK_ALIASES.get(key, key))
+
+
+def schedule_to_mask(schedule) -> int:
+    """{"maandag": ["ochtend"], ...} -> int. Onbekende dagen/dagdelen worden genegeerd."""
+    if not isinstance(schedule, dict):
+        return 0
+    mask = 0
+    for day, blocks in schedule.items():
+        d = _day_index(day)
+        if d is None or not isinstance(blocks, (list, tuple, set)):
+            continue
+        for block in blocks:
+            b = _block_index(block)
+            if b is not None:
+                mask |= 1 << (d * BLOCKS_PER_DAY + b)
+    return mask
+
+
+def mask_to_schedule(mask) -> dict:
+    """Inverse van schedule_to_mask (alleen dagen met minimaal één dagdeel)."""
+    mask = int(mask or 0)
+    out = {}
+    for d, day in enumerate(DAYS):
+        bits = (mask >> (d * BLOCKS_PER_DAY)) & DAY_BITS
+        if bits:
+            out[day] = [b for i, b in enumerate(TIME_BLOCKS) if bits & (1 << i)]
+    return out
+
+
+def popcount(mask) -> int:
+    return int(mask or 0).bit_count()
+
+
+def days_in_mask(mask) -> int:
+    """Aantal dagen met minimaal één dagdeel."""
+    mask = int(mask or 0)
+    return sum(1 for d in range(len(DAYS)) if (mask >> (d * BLOCKS_PER_DAY)) & DAY_BITS)
+
+
+def overlap_blocks(a, b) -> int:
+    """Aantal gedeelde dagdelen."""
+    return popcount(int(a or 0) & int(b or 0))
+
+
+def overlap_days(a, b) -> int:
+    """Aantal dagen waarop minimaal één dagdeel overlapt."""
+    return days_in_mask(int(a or 0) & int(b or 0))
+
+
+def schedule_compatible(rider_mask, horse_mask, min_days_per_week=None) -> bool:
+    """Minimaal één gedeeld dagdeel en (indien gezet) genoeg gedeelde dagen."""
+    shared = int(rider_mask or 0) & int(horse_mask or 0)
+    if not shared:
+        return False
+    if min_days_per_week:
+        return days_in_mask(shared) >= int(min_days_per_week)
+    return True
+
+
+# -----------------------------
+# SQL-zijde: popcount()/mask_days() zijn in SQLite geregistreerd via
+# database.py en in Postgres aangemaakt door de migratie.
+# -----------------------------
+
+def sql_overlap_blocks(column, mask: int):
+    return func.popcount(column.op("&")(int(mask)))
+
+
+def sql_overlap_days(column, mask: int):
+    return func.mask_days(column.op("&")(int(mask)))
+
+
+def register_sqlite_functions(dbapi_connection) -> None:
+    dbapi_connection.create_function("popcount", 1, popcount, deterministic=True)
+    dbapi_connection.create_function("mask_days", 1, days_in_mask, deterministic=True)
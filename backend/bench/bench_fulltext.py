@@ -0,0 +1,97 @@
+"""Vrije-tekst zoeken: FTS5 + bm25 vs. naïeve LIKE-scan over titel/verhaal/ras.
+
+Seedt N advertenties direct via Core (index via `fulltext.document`) en meet
+de mediane querytijd voor een paar typische zoekopdrachten.
+
+Gebruik: python -m bench.bench_fulltext [--n 100000] [--repeat 10]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import insert, or_, text
+from sqlalchemy.orm import Session
+
+from bench.common import make_engine
+from fulltext import FTS_COLUMNS, FTS_TABLE, apply_fulltext, document
+from models import PUBLISHED, HorseProfile
+
+QUERIES = ("rustige vos bijrijden Utrecht", "schimmel springen", "friese merrie", "kwpn")
+
+_TITLES = ("Rustige vos zoekt bijrijder", "Sportieve schimmel", "Lieve Friese merrie", "Brave pony", "Jonge ruin")
+_DESCRIPTIONS = (
+    "Gaat graag naar buiten en is braaf in het verkeer.",
+    "Springpaard voor gevorderde ruiters, L-niveau dressuur.",
+    "Rustig karakter, geschikt voor verzorgen en grondwerk.",
+)
+_BREEDS = ("KWPN", "Fries", "Holsteiner", "Welsh", "Haflinger")
+_CITIES = ("Utrecht", "Amersfoort", "Zwolle", "Leiden", "Arnhem", "Groningen")
+_COLORS = ("vos", "schimmel", "zwart", "bruin")
+_AD_TYPES = ("bijrijden", "lease", "verzorgen")
+
+
+def seed(engine, n, chunk=5000):
+    rnd = random.Random(42)
+    cols = ", ".join(FTS_COLUMNS)
+    params = ", ".join(":" + c for c in FTS_COLUMNS)
+    with engine.begin() as conn:
+        for start in range(0, n, chunk):
+            rows = []
+            for i in range(start, min(n, start + chunk)):
+                rows.append({
+                    "id": i + 1, "owner_profile_id": 1, "name": f"Paard {i}", "type": "horse",
+                    "title": rnd.choice(_TITLES), "description": " ".join(rnd.sample(_DESCRIPTIONS, 2)),
+                    "breed": rnd.choice(_BREEDS), "stable_city": rnd.choice(_CITIES),
+                    "coat_colors": [rnd.choice(_COLORS)], "ad_types": [rnd.choice(_AD_TYPES)],
+                    "temperament": [], "ad_type": None, "status": PUBLISHED,
+                })
+            conn.execute(insert(HorseProfile), rows)
+            conn.execute(
+                text(f"INSERT INTO {FTS_TABLE} (rowid, {cols}) VALUES (:id, {params})"),
+                [{"id": r["id"], **document(r)} for r in rows],
+            )
+
+
+def _like(query, q):
+    for word in q.split():
+        pattern = f"%{word}%"
+        query = query.filter(or_(
+            HorseProfile.title.ilike(pattern), HorseProfile.description.ilike(pattern),
+            HorseProfile.breed.ilike(pattern), HorseProfile.stable_city.ilike(pattern),
+        ))
+    return query
+
+
+def _median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    engine = make_engine()
+    t0 = time.perf_counter()
+    seed(engine, args.n)
+    print(f"{args.n} advertenties geseed in {time.perf_counter() - t0:.1f}s")
+
+    with Session(engine) as db:
+        base = db.query(HorseProfile.id).filter(HorseProfile.status == PUBLISHED)
+        print(f"  {'zoekopdracht':<32} {'LIKE':>10} {'FTS5':>10} {'hits':>7}")
+        for q in QUERIES:
+            like_ms = _median_ms(lambda: _like(base, q).limit(20).all(), args.repeat)
+            fts = apply_fulltext(base, q, "sqlite")
+            fts_ms = _median_ms(lambda: fts.limit(20).all(), args.repeat)
+            print(f"  {q:<32} {like_ms:8.2f}ms {fts_ms:8.2f}ms {fts.count():>7}")
+
+
+if __name__ == "__main__":
+    main()
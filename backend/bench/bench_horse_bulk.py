@@ -0,0 +1,91 @@
+"""Bulk import/export van paarden: doorlooptijd en piekgeheugen.
+
+Importeert N paarden als NDJSON en als CSV via `POST /owner/horses/bulk` (elke
+meting twee keer, dus 4N paarden) en exporteert ze weer via
+`GET /owner/horses/export`. Piekgeheugen (tracemalloc) laat zien dat import en
+export niet alle rijen tegelijk vasthouden; de TestClient buffert wel de hele
+response, dus bij de export telt de body zelf mee.
+
+Gebruik: python -m bench.bench_horse_bulk [--rows 5000]
+"""
+import argparse
+import csv
+import io
+import json
+import time
+import tracemalloc
+
+from sqlalchemy.orm import Session
+
+from bench.common import make_client, make_engine
+from models import OwnerProfile, User
+
+
+def _rows(n):
+    for i in range(n):
+        yield {
+            "name": f"Paard {i}", "type": "horse", "title": "Rustige vos zoekt bijrijder",
+            "description": "Gaat graag naar buiten en is braaf in het verkeer.", "breed": "KWPN",
+            "age": 4 + i % 18, "height": 140 + i % 40, "ad_types": ["bijrijden"],
+            "disciplines": ["dressuur", "buitenritten"], "temperament": ["rustig"],
+            "available_days": {"maandag": ["ochtend"], "zaterdag": ["middag"]},
+            "cost_model": "per_maand", "cost_amount": 100 + i % 200, "stable_city": "Utrecht",
+        }
+
+
+def _ndjson(n):
+    return "".join(json.dumps(r) + "\n" for r in _rows(n)).encode()
+
+
+def _csv(n):
+    rows = list(_rows(n))
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+    writer.writeheader()
+    for r in rows:
+        writer.writerow({k: json.dumps(v) if isinstance(v, (list, dict)) else v for k, v in r.items()})
+    return buffer.getvalue().encode()
+
+
+def _measure(fn):
+    """(response, seconden, piek MB); tracemalloc vertraagt sterk, dus tijd en geheugen in aparte runs."""
+    t0 = time.perf_counter()
+    response = fn()
+    elapsed = time.perf_counter() - t0
+    assert response.status_code == 200, response.text[:200]
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return response, elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine = make_engine()
+    with Session(engine) as db:
+        user = User(kinde_id="bench", email="bench@example.com", name="Bench Stal")
+        db.add(user)
+        db.flush()
+        db.add(OwnerProfile(user_id=user.id, postcode="3511 AA", visible_radius=10, available_days={}))
+        db.commit()
+        user_id = user.id
+    client = make_client(engine, user_id)
+
+    print(f"bulk import/export, {args.rows} paarden per run")
+    for fmt, body in (("ndjson", _ndjson(args.rows)), ("csv", _csv(args.rows))):
+        response, elapsed, peak = _measure(lambda: client.post(
+            "/owner/horses/bulk", content=body, params={"format": fmt}))
+        result = response.json()
+        print(f"  import {fmt:<6} {elapsed:6.2f} s  {args.rows / elapsed:8.0f} rijen/s  piek {peak:6.1f} MB  "
+              f"created={result['created']} failed={result['failed']}")
+    for fmt in ("ndjson", "csv"):
+        response, elapsed, peak = _measure(lambda: client.get("/owner/horses/export", params={"format": fmt}))
+        print(f"  export {fmt:<6} {elapsed:6.2f} s  {len(response.content) / 1e6:6.1f} MB  piek {peak:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
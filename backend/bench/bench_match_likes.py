@@ -0,0 +1,157 @@
+"""Gelijktijdige likes: klopt `is_mutual_match` en zijn er geen dubbele rijen?
+
+Per paar ruiter/paard starten een aantal threads tegelijk (Barrier): de ruiter
+liket een paar keer (dubbele klik, meerdere workers) en bij de helft van de
+paren, waar het algoritme al een match-rij klaarzette, liket de eigenaar
+op hetzelfde moment. Daarna gelden:
+
+- één rij per paar (unique constraint);
+- `is_mutual_match` == rider_liked AND owner_liked, voor elke rij;
+- elke overgang naar wederzijds is precies één keer gemeld (`changed`), dus
+  precies één `match` event.
+
+Exit 1 bij een schending. `--naive` doet hetzelfde met een read-modify-write
+in Python, ter vergelijking (verliest updates onder contentie).
+`--url` draait tegen een andere database, bv. Postgres.
+
+Gebruik: python -m bench.bench_match_likes [--pairs 200] [--clicks 3] [--naive] [--url postgresql://...]
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from bench.common import make_engine
+from database import Base
+from matches import owner_like, rider_like
+from models import PUBLISHED, HorseProfile, Match, OwnerProfile, RiderProfile, User
+
+
+def seed(engine, pairs):
+    """Eén eigenaar met `pairs` paarden en `pairs` ruiters; paar i = (ruiter i, paard i)."""
+    with Session(engine) as db:
+        owner_user = User(kinde_id="kp_owner", email="owner@example.com", name="Eigenaar")
+        db.add(owner_user)
+        db.flush()
+        owner = OwnerProfile(user_id=owner_user.id, postcode="3511 AA", visible_radius=10, available_days={})
+        db.add(owner)
+        db.flush()
+        horses, riders = [], []
+        for i in range(pairs):
+            user = User(kinde_id=f"kp_rider_{i}", email=f"rider{i}@example.com", name=f"Ruiter {i}")
+            db.add(user)
+            db.flush()
+            rider = RiderProfile(user_id=user.id, postcode="3511 AA", max_travel_distance=10, available_days={}, age=30)
+            horse = HorseProfile(owner_profile_id=owner.id, name=f"Paard {i}", type="horse", status=PUBLISHED)
+            db.add_all([rider, horse])
+            riders.append(rider)
+            horses.append(horse)
+        db.flush()
+        # Helft: voorgestelde match (nog niemand geliket), waar de eigenaar tegelijk met de ruiter liket
+        proposed = {}
+        for i in range(0, pairs, 2):
+            match = Match(rider_profile_id=riders[i].id, horse_profile_id=horses[i].id, rider_liked=False,
+                          owner_liked=False, is_mutual_match=False, status="pending")
+            db.add(match)
+            db.flush()
+            proposed[i] = match.id
+        db.commit()
+        return owner_user.id, [(r.id, h.id) for r, h in zip(riders, horses)], proposed
+
+
+def naive_rider_like(db, rider_profile_id, horse_id):
+    match = db.query(Match).filter_by(rider_profile_id=rider_profile_id, horse_profile_id=horse_id).first()
+    if match is None:
+        match = Match(rider_profile_id=rider_profile_id, horse_profile_id=horse_id, owner_liked=False)
+        db.add(match)
+    changed = not match.rider_liked
+    match.rider_liked = True
+    match.is_mutual_match = bool(match.owner_liked)
+    db.flush()
+    return {"is_mutual_match": match.is_mutual_match}, changed
+
+
+def naive_owner_like(db, match_id, user_id):
+    match = db.get(Match, match_id)
+    changed = not match.owner_liked
+    match.owner_liked = True
+    match.is_mutual_match = bool(match.rider_liked)
+    db.flush()
+    return {"is_mutual_match": match.is_mutual_match}, changed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--clicks", type=int, default=3, help="gelijktijdige likes van de ruiter per paar")
+    parser.add_argument("--naive", action="store_true")
+    parser.add_argument("--url", help="database-URL (default: tijdelijke SQLite)")
+    args = parser.parse_args()
+
+    if args.url:
+        engine = create_engine(args.url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+    else:
+        engine = make_engine()
+    owner_user_id, pairs, proposed = seed(engine, args.pairs)
+    factory = sessionmaker(bind=engine)
+    do_rider, do_owner = (naive_rider_like, naive_owner_like) if args.naive else (rider_like, owner_like)
+
+    reported, errors = [], []
+    lock = threading.Lock()
+
+    def run(fn, *fn_args, barrier):
+        barrier.wait()
+        try:
+            with factory() as db:
+                row, changed = fn(db, *fn_args)
+                db.commit()
+            with lock:
+                reported.append(bool(changed and row["is_mutual_match"]))
+        except Exception as e:
+            with lock:
+                errors.append(repr(e)[:200])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=(args.clicks + 1) * 4) as pool:
+        for i, (rider_id, horse_id) in enumerate(pairs):
+            parties = args.clicks + (1 if i in proposed else 0)
+            barrier = threading.Barrier(parties)
+            for _ in range(args.clicks):
+                pool.submit(run, do_rider, rider_id, horse_id, barrier=barrier)
+            if i in proposed:
+                pool.submit(run, do_owner, proposed[i], owner_user_id, barrier=barrier)
+    elapsed = time.perf_counter() - started
+
+    with Session(engine) as db:
+        rows = db.execute(select(Match.rider_profile_id, Match.horse_profile_id, Match.rider_liked,
+                                 Match.owner_liked, Match.is_mutual_match)).all()
+        total = db.scalar(select(func.count()).select_from(Match))
+    per_pair = {}
+    for r in rows:
+        per_pair[(r.rider_profile_id, r.horse_profile_id)] = per_pair.get((r.rider_profile_id, r.horse_profile_id), 0) + 1
+    duplicates = sum(n - 1 for n in per_pair.values() if n > 1)
+    wrong = sum(1 for r in rows if bool(r.is_mutual_match) != bool(r.rider_liked and r.owner_liked))
+    mutual = sum(1 for r in rows if r.is_mutual_match)
+    missed = sum(1 for i in proposed if not next(
+        (r.is_mutual_match for r in rows if (r.rider_profile_id, r.horse_profile_id) == pairs[i]), False))
+
+    print(f"{'naive' if args.naive else 'upsert'}: {len(reported) + len(errors)} likes in {elapsed:.2f}s")
+    print(f"  rijen {total} (verwacht {len(pairs)}), dubbel {duplicates}")
+    print(f"  wederzijds {mutual} (verwacht {len(proposed)}), gemist {missed}, inconsistent {wrong}")
+    print(f"  gemelde nieuwe matches {sum(reported)} (verwacht {len(proposed)})")
+    if errors:
+        print(f"  fouten {len(errors)}: {errors[0]}")
+    ok = (not errors and not duplicates and not wrong and not missed and total == len(pairs)
+          and sum(reported) == len(proposed) == mutual)
+    print("ok" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""GET /owner/horses met 500 paarden: stdlib encoder vs FastJSONResponse.
+
+Meet (1) alleen de encode-stap voor dezelfde payload via FastAPI's
+`jsonable_encoder` + `JSONResponse` ("voor") en `FastJSONResponse` ("na"), en
+(2) de volledige request-latency van het endpoint.
+
+Gebruik: python -m bench.bench_owner_horses [--n 500] [--repeat 30] [--view edit]
+"""
+import argparse
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from bench.bench_serializers import make_horses
+from bench.common import make_client, make_engine
+from models import OwnerProfile, User
+from responses import ORJSON_AVAILABLE, FastJSONResponse
+
+
+def seed(engine, n):
+    with Session(engine) as db:
+        user = User(kinde_id="bench", email="bench@example.com", name="Bench Owner")
+        db.add(user)
+        db.flush()
+        owner = OwnerProfile(user_id=user.id, postcode="3511 AA", visible_radius=10, available_days={})
+        db.add(owner)
+        db.flush()
+        for h in make_horses(n):
+            h.id = None
+            h.owner_profile_id = owner.id
+            db.add(h)
+        db.commit()
+        return user.id
+
+
+def _median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--view", default="edit")
+    parser.add_argument("--limit", type=int, default=200, help="paginagrootte (max 200)")
+    args = parser.parse_args()
+
+    engine = make_engine()
+    client = make_client(engine, seed(engine, args.n))
+    url = f"/owner/horses?view={args.view}&limit={args.limit}"
+    payload = client.get(url).json()
+
+    before = _median_ms(lambda: JSONResponse(jsonable_encoder(payload)).body, args.repeat)
+    after = _median_ms(lambda: FastJSONResponse(payload).body, args.repeat)
+    request = _median_ms(lambda: client.get(url), args.repeat)
+    # Wat "Mijn paarden" laadt: eerste pagina card view
+    overview = client.get("/owner/horses")
+    overview_ms = _median_ms(lambda: client.get("/owner/horses"), args.repeat)
+
+    print(f"GET {url} met {args.n} paarden (orjson={'ja' if ORJSON_AVAILABLE else 'nee'})")
+    print(f"  encode voor (jsonable_encoder + json): {before:8.2f} ms")
+    print(f"  encode na   (FastJSONResponse):        {after:8.2f} ms")
+    print(f"  volledige request:                     {request:8.2f} ms")
+    print(f"  eerste pagina card view:               {overview_ms:8.2f} ms ({len(overview.content) / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Rate limiter: kosten per `hit` en groei van de bucket-opslag.
+
+Simuleert `--hours` verkeer (gesimuleerde klok, `--rps` requests per seconde)
+op één begrensde route, met een wisselende populatie gebruikers en IP's
+(elke minuut schuift het venster op, zoals bezoekers die komen en gaan). Per
+backend (memory, sqlite) toont het de tijd per `hit` (p50/p99) en hoeveel
+buckets er aan het eind nog staan.
+
+Exit 1 als de SQLite-tabel niet opgeruimd wordt: er mogen niet meer rijen
+staan dan keys die in het laatste IDLE_SECONDS + PRUNE_EVERY_SECONDS gebruikt
+zijn, en geen enkele bucket die binnen IDLE_SECONDS gebruikt is mag weg zijn.
+
+Gebruik: python -m bench.bench_ratelimit [--hours 3] [--rps 5] [--pool 200]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from ratelimit import RULES, MemoryBackend, SQLiteBackend
+
+ROUTE = ("GET", "/geo/lookup")
+
+
+def simulate(backend, hours, rps, pool, seed=1):
+    """-> (tijden per hit in µs, laatste gebruik per key, gesimuleerde eindtijd)."""
+    rng = random.Random(seed)
+    rules = RULES[ROUTE]
+    start = 1_000_000.0
+    last_used, timings = {}, []
+    for i in range(int(hours * 3600 * rps)):
+        now = start + i / rps
+        window = int((now - start) // 60) * (pool // 10)
+        user = window + rng.randrange(pool)
+        ip = window + rng.randrange(pool)
+        buckets = [(f"user:{ROUTE[0]} {ROUTE[1]}:{user}", rules["user"]), (f"ip:{ROUTE[0]} {ROUTE[1]}:10.0.{ip}", rules["ip"])]
+        t0 = time.perf_counter()
+        backend.hit(buckets, now)
+        timings.append((time.perf_counter() - t0) * 1e6)
+        for key, _ in buckets:
+            last_used[key] = now
+    return timings, last_used, now
+
+
+def report(name, timings, keys_total, stored):
+    print(f"  {name:<8} p50 {statistics.median(timings):7.1f} µs   "
+          f"p99 {statistics.quantiles(timings, n=100)[98]:7.1f} µs   "
+          f"keys gezien {keys_total:>7}   opgeslagen {stored:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=3)
+    parser.add_argument("--rps", type=float, default=5)
+    parser.add_argument("--pool", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.hours:g} uur x {args.rps:g} req/s, {args.pool} actieve gebruikers/IP's per minuut")
+
+    memory = MemoryBackend()
+    timings, last_used, _ = simulate(memory, args.hours, args.rps, args.pool)
+    report("memory", timings, len(last_used), len(memory._buckets))
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rate_limits.db")
+        backend = SQLiteBackend(path)
+        timings, last_used, now = simulate(backend, args.hours, args.rps, args.pool)
+        with sqlite3.connect(path) as conn:
+            stored = {key for (key,) in conn.execute("SELECT key FROM rate_buckets")}
+        report("sqlite", timings, len(last_used), len(stored))
+
+        horizon = SQLiteBackend.IDLE_SECONDS + SQLiteBackend.PRUNE_EVERY_SECONDS
+        may_keep = {key for key, t in last_used.items() if t >= now - horizon}
+        must_keep = {key for key, t in last_used.items() if t >= now - SQLiteBackend.IDLE_SECONDS}
+        if not stored <= may_keep:
+            print(f"\nFAIL: {len(stored - may_keep)} buckets ouder dan {horizon}s niet opgeruimd")
+            failed = True
+        if not must_keep <= stored:
+            print(f"\nFAIL: {len(must_keep - stored)} recent gebruikte buckets verwijderd")
+            failed = True
+    if failed:
+        sys.exit(1)
+    print("\nok")
+
+
+if __name__ == "__main__":
+    main()
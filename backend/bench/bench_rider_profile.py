@@ -0,0 +1,69 @@
+"""POST /rider-profile: latency voor create en update met een volledig onboarding-payload.
+
+Gebruikt de `full_onboarding` case uit de golden set. Kinde wordt niet
+aangeroepen (geen M2M env vars), dus dit meet parsing + mapping + flush.
+
+Gebruik: python -m bench.bench_rider_profile [--repeat 200]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from sqlalchemy.orm import Session
+
+from bench.common import make_client, make_engine
+from bench.rider_profile_golden import CASES
+from models import RiderProfile, User
+
+
+def _timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    payload = json.loads(CASES.read_text())["full_onboarding"][0]
+    engine = make_engine()
+    with Session(engine) as db:
+        user = User(kinde_id="bench", email="bench@example.com", name="Bench Rider")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    client = make_client(engine, user_id)
+
+    def create():
+        with Session(engine) as db:
+            db.query(RiderProfile).filter(RiderProfile.user_id == user_id).delete()
+            db.commit()
+        assert client.post("/rider-profile", json=payload).status_code == 200
+
+    def update():
+        assert client.post("/rider-profile", json=payload).status_code == 200
+
+    # create() bevat ook een DELETE; meet die los om hem eraf te halen
+    def delete_only():
+        with Session(engine) as db:
+            db.query(RiderProfile).filter(RiderProfile.user_id == user_id).delete()
+            db.commit()
+
+    create_p50, create_p95 = _timed(create, args.repeat)
+    delete_p50, _ = _timed(delete_only, args.repeat)
+    create()
+    update_p50, update_p95 = _timed(update, args.repeat)
+    print(f"POST /rider-profile ({args.repeat}x)")
+    print(f"  create  p50 {create_p50 - delete_p50:6.2f} ms   p95 {create_p95 - delete_p50:6.2f} ms")
+    print(f"  update  p50 {update_p50:6.2f} ms   p95 {update_p95:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
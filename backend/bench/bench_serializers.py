@@ -0,0 +1,54 @@
+"""Serialisatietijd per 1k paarden voor elke view in serializers.py.
+
+Gebruik: python -m bench.bench_serializers [--n 1000] [--repeat 20]
+"""
+import argparse
+import statistics
+import time
+from datetime import date
+
+from models import HorseProfile
+from serializers import VIEWS, compile_horse_serializer
+
+
+def make_horses(n):
+    horses = []
+    for i in range(n):
+        horses.append(HorseProfile(
+            id=i + 1, owner_profile_id=1, name=f"Paard {i}", type="horse", title=f"Lieve vos {i}",
+            description="Rustige ruin die graag buiten rijdt. " * 5, ad_type="bijrijden",
+            ad_types=["bijrijden", "verzorgen"], height=160, age=12, gender="ruin", breed="KWPN",
+            photos=[f"https://cdn.example/p/{i}_{k}.jpg" for k in range(6)],
+            videos=[f"https://cdn.example/v/{i}.mp4"], disciplines={"dressuur": "L1"},
+            temperament=["rustig", "speels"], coat_colors=["vos"], required_tasks=["uitmesten"],
+            optional_tasks=["poetsen"], available_days={"maandag": ["ochtend"], "woensdag": ["avond"]},
+            min_days_per_week=2, comfort_flags={"traffic": True}, rules={"helmet_required": True},
+            no_gos=["sporen"], is_available=True, start_date=date(2025, 1, 1),
+            stable_city="Utrecht", stable_postcode="3511 AA", stable_house_number="12",
+            cost_model="per_maand", cost_amount=150,
+        ))
+    return horses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    horses = make_horses(args.n)
+    print(f"{args.n} paarden, {args.repeat} herhalingen")
+    for view in VIEWS:
+        serialize = compile_horse_serializer(view, is_owner=False)
+        timings = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            for h in horses:
+                serialize(h)
+            timings.append((time.perf_counter() - t0) * 1000)
+        per_1k = statistics.median(timings) * 1000 / args.n
+        print(f"  {view:<7} {len(VIEWS[view]):>3} velden  {per_1k:8.2f} ms / 1k paarden")
+
+
+if __name__ == "__main__":
+    main()
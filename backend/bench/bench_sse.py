@@ -0,0 +1,61 @@
+"""Live events (events.py): geheugen per idle stream en fan-out van één event.
+
+Start N streams (`events.stream`, zoals GET /events ze gebruikt) als tasks in
+één event loop, elk op zijn eigen user-kanaal plus een gedeeld ad-kanaal, en
+meet met tracemalloc het geheugen per idle stream. Daarna één publish op het
+gedeelde kanaal: tijd tot alle N streams het frame hebben. Sockets en de ASGI
+laag tellen niet mee; het gaat om wat de broker per verbinding kost.
+
+Gebruik: python -m bench.bench_sse [--connections 5000]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import events
+
+
+async def _run(n):
+    received = 0
+    all_in = asyncio.Event()
+
+    async def client(i):
+        nonlocal received
+        gen = events.stream([f"user:{i}", "ad:1"])
+        await gen.__anext__()  # ready
+        await gen.__anext__()  # het ad-event
+        received += 1
+        if received == n:
+            all_in.set()
+        await gen.aclose()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(client(i)) for i in range(n)]
+    while events.broker.count < n:
+        await asyncio.sleep(0.01)
+    idle = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    events.broker.publish("ad:1", "ad", {"horse_id": 1, "status": "published", "version": 2})
+    await all_in.wait()
+    fanout = time.perf_counter() - started
+    await asyncio.gather(*tasks)
+
+    print(f"{n} idle streams: {idle / n / 1024:.1f} KB per stream ({idle / 1024 / 1024:.1f} MB totaal)")
+    print(f"fan-out van 1 event naar {n} streams: {fanout * 1000:.1f} ms")
+    print(f"open na afloop: {events.broker.count}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=5000)
+    args = parser.parse_args()
+    events.HEARTBEAT_SECONDS = 3600  # geen pings tijdens de meting
+    asyncio.run(_run(args.connections))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Startup: `import main` en `create_app()` in een vers proces.
+
+Draait `python -X importtime -c "import main"` (een paar keer, mediaan) en
+toont de totale importtijd van main, de duurste modules (cumulatief, alleen
+top-level packages) en de tijd van `create_app()`. Modules die pas bij het
+eerste gebruik geladen horen te worden (LAZY) mogen niet in de import zitten:
+exit 1 als dat toch gebeurt.
+
+Gebruik: python -m bench.bench_startup [--repeat 5] [--top 15]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# HTTP-clients, SDK's en de server zelf: lazy in auth/geocode/main/moderation/tasks/events/fulltext.
+# (`azure` en `azure.ai` zelf zijn lege namespace packages; find_spec laadt die wel.)
+LAZY = ("requests", "uvicorn", "dotenv", "azure.storage", "azure.ai.contentsafety", "azure.core", "PIL", "redis",
+        "snowballstemmer")
+
+APP_SNIPPET = """
+import time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+main.create_app()
+t2 = time.perf_counter()
+print(f"{(t1 - t0) * 1000:.1f} {(t2 - t1) * 1000:.1f}")
+"""
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def importtime():
+    """[(module, self_us, cumulatief_us, diepte)] voor `import main`."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND_DIR,
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return rows
+
+
+def app_timing():
+    """(import main ms, create_app ms), gemeten in het proces zelf."""
+    out = subprocess.run([sys.executable, "-c", APP_SNIPPET], cwd=BACKEND_DIR, capture_output=True, text=True,
+                         check=True, env={**os.environ, "JOBS_WORKER": "off", "MODERATION_WORKER": "off"})
+    imp, create = out.stdout.split()[-2:]
+    return float(imp), float(create)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [importtime() for _ in range(args.repeat)]
+    totals = [next(cum for name, _, cum, _ in rows if name == "main") for rows in runs]
+    timings = [app_timing() for _ in range(args.repeat)]
+
+    # Top-level packages (sqlalchemy, fastapi, ...) en onze eigen modules, van de laatste run
+    top = {}
+    for name, _, cum, _ in runs[-1]:
+        root = name.split(".")[0]
+        if name == root:
+            top[root] = max(top.get(root, 0), cum)
+    top.pop("main", None)
+
+    print(f"import main (-X importtime): {statistics.median(totals) / 1000:.1f} ms "
+          f"(mediaan van {args.repeat}, min {min(totals) / 1000:.1f})")
+    print(f"import main (wall):          {statistics.median(t[0] for t in timings):.1f} ms")
+    print(f"create_app():                {statistics.median(t[1] for t in timings):.1f} ms")
+    print(f"\n  {'module':<28}{'cumulatief ms':>14}")
+    for name, cum in sorted(top.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {name:<28}{cum / 1000:>14.1f}")
+
+    eager = sorted({lazy for name, *_ in runs[-1] for lazy in LAZY if name == lazy or name.startswith(lazy + ".")})
+    if eager:
+        print(f"\nFAIL: bij import geladen, hoort lazy: {', '.join(eager)}")
+        sys.exit(1)
+    print("\nok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Gedeelde opzet voor benchmarks: losse SQLite database + TestClient.
+
+De app draait tegen een tijdelijke database (niet `horsesharing.db`) en
+`get_current_user` wordt vervangen door een vaste gebruiker, zodat er geen
+Kinde calls gedaan worden.
+"""
+import os
+import tempfile
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from availability import register_sqlite_functions
+from database import Base, get_db
+from fulltext import install_sqlite
+
+
+def make_engine(path=None):
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="hs_bench_", suffix=".db")
+        os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _register(dbapi_connection, connection_record):
+        register_sqlite_functions(dbapi_connection)
+
+    Base.metadata.create_all(engine)
+    # FTS5-tabel komt normaal uit de migratie
+    with engine.begin() as conn:
+        install_sqlite(conn)
+    return engine
+
+
+def make_client(engine, user_id=None):
+    """TestClient met get_db override op `engine`.
+
+    Met `user_id` wordt ook get_current_user vervangen door die gebruiker;
+    zonder loopt de echte auth (stub dan `auth.verify_kinde_token`).
+    """
+    from fastapi import Depends
+    from fastapi.testclient import TestClient
+    import auth
+    import main
+    from models import User
+
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def _current_user(db=Depends(get_db)):
+        return db.get(User, user_id)
+
+    main.app.dependency_overrides[get_db] = _get_db
+    if user_id is not None:
+        main.app.dependency_overrides[auth.get_current_user] = _current_user
+    else:
+        main.app.dependency_overrides.pop(auth.get_current_user, None)
+    return TestClient(main.app)
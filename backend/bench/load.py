@@ -0,0 +1,282 @@
+"""Load-test van de API hot paths tegen geseede data en gestubde externe diensten.
+
+Start drie processen: de stubs (Kinde/PDOK/Nominatim/Azure, zie stubs.py),
+de API via uvicorn op een geseede SQLite database (seed.py) en deze driver,
+die per scenario N requests met C gelijktijdige clients afvuurt.
+
+Resultaat: p50/p95/p99, gemiddelde en throughput per scenario, als tabel en
+als JSON in bench/results/. Met --compare wordt p95 tegen een eerdere run
+gelegd (exit 1 bij een regressie boven --threshold).
+
+Gebruik:
+    python -m bench.load --scale 10k --requests 500 --concurrency 8
+    python -m bench.load --scale 10k --compare bench/results/load_10k_<ts>.json
+    python -m bench.load --only auth_me,ad_detail --latency-ms kinde=40
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+from bench.seed import describe, parse_scale, seed
+from bench.stubs import parse_latency
+
+RESULTS_DIR = Path(__file__).parent / "results"
+UPLOAD_BYTES = os.urandom(20_000)
+WARMUP = 10
+
+
+# -----------------------------
+# Processen
+# -----------------------------
+
+def _run_stubs(port, latency, ready):
+    from bench.stubs import serve
+    serve(port, latency)
+    ready.set()
+    threading.Event().wait()
+
+
+def _run_api(db_path, stub_url, port, upload_backend):
+    from bench.stubs import stub_env
+    env = stub_env(stub_url)
+    if upload_backend != "azure":
+        for key in ("AZURE_STORAGE_CONNECTION_STRING", "AZURE_CONTAINER", "AZURE_PUBLIC_BASE_URL"):
+            env.pop(key)
+    os.environ.update(env)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # alle clients komen van 127.0.0.1: de per-IP buckets zouden de meting afknijpen
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+    import uvicorn
+    from sqlalchemy.orm import sessionmaker
+
+    import main
+    import routers.media
+    from bench.common import make_engine
+    from bench.stubs import FakeBlobServiceClient, FakeContentSettings
+    from database import get_db
+    from settings import get_settings
+
+    engine = make_engine(db_path)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Workers uit: die draaien op SessionLocal, niet op de bench-database
+    app = main.create_app(replace(get_settings(), upload_root=tempfile.mkdtemp(prefix="hs_load_uploads_"),
+                                  moderation_worker=False, jobs_worker=False))
+    app.dependency_overrides[get_db] = _get_db
+    if upload_backend == "azure":
+        routers.media._azure_blob_sdk = lambda: (FakeBlobServiceClient, FakeContentSettings)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def _free_port():
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).ok:
+                return
+        except requests.RequestException:
+            time.sleep(0.1)
+    raise SystemExit(f"{url} kwam niet op binnen {timeout}s")
+
+
+# -----------------------------
+# Scenario's
+# -----------------------------
+
+def scenarios(info):
+    """naam -> functie(rnd) die (methode, pad, kwargs) oplevert."""
+    owners = range(info["owner_user_ids"][0], info["owner_user_ids"][1] + 1)
+    riders = range(info["rider_user_ids"][0], info["rider_user_ids"][1] + 1)
+
+    def auth(uid):
+        return {"Authorization": f"Bearer bench-{uid}"}
+
+    return {
+        "auth_me": lambda r: ("GET", "/auth/me", {"headers": auth(r.choice(riders))}),
+        "owner_horses": lambda r: ("GET", "/owner/horses", {"headers": auth(r.choice(owners))}),
+        "ad_detail": lambda r: ("GET", f"/ads/{r.randint(1, info['horses'])}", {"headers": auth(r.choice(riders))}),
+        "rider_profile_get": lambda r: ("GET", "/rider-profile", {"headers": auth(r.choice(riders))}),
+        "rider_profile_post": lambda r: ("POST", "/rider-profile", {
+            "headers": auth(r.choice(riders)),
+            "json": {"photos": [f"https://cdn.example/r/{r.randint(1, 10**6)}.jpg"],
+                     "budget_max_euro": r.choice((150, 200, 250))},
+        }),
+        # Vooral cache-missers: willekeurige postcode/huisnummer
+        "geo_lookup_pdok": lambda r: ("GET", "/geo/lookup", {"params": {
+            "country": "NL", "postcode": f"{r.randint(1000, 9999)}AB", "number": str(r.randint(1, 300))}}),
+        "geo_lookup_osm": lambda r: ("GET", "/geo/lookup", {"params": {
+            "country": "BE", "postcode": str(r.randint(1000, 9999)), "number": str(r.randint(1, 300))}}),
+        "media_upload": lambda r: ("POST", "/media/upload", {
+            "headers": auth(r.choice(owners)),
+            "files": {"files": ("foto.jpg", UPLOAD_BYTES, "image/jpeg")},
+        }),
+    }
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentiel over een gesorteerde lijst."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def run_scenario(base_url, build, n, concurrency, seed_value):
+    local = threading.local()
+
+    def one(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        method, path, kwargs = build(random.Random(seed_value * 1_000_003 + i))
+        t0 = time.perf_counter()
+        try:
+            status = session.request(method, base_url + path, timeout=30, **kwargs).status_code
+        except requests.RequestException:
+            status = 0
+        return (time.perf_counter() - t0) * 1000, status
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, range(-WARMUP, 0)))
+        started = time.perf_counter()
+        results = list(pool.map(one, range(n)))
+        wall = time.perf_counter() - started
+
+    latencies = sorted(ms for ms, _ in results)
+    statuses = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": n, "errors": errors, "status_codes": statuses,
+        "p50_ms": round(percentile(latencies, 50), 2), "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2), "mean_ms": round(statistics.fmean(latencies), 2),
+        "rps": round(n / wall, 1),
+    }
+
+
+def compare(current, baseline_path, threshold):
+    baseline = json.loads(Path(baseline_path).read_text())["scenarios"]
+    regressions = 0
+    print(f"\nvs. {baseline_path}")
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        delta = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        flag = "REGRESSIE" if delta > threshold else ""
+        regressions += bool(flag)
+        print(f"  {name:<20} p95 {before['p95_ms']:>8.2f} -> {result['p95_ms']:>8.2f} ms  ({delta:+6.1f}%) {flag}")
+    return regressions
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", default="1k", help="1k, 10k, 100k of een aantal paarden")
+    parser.add_argument("--db", help="geseede database hergebruiken/aanmaken op dit pad")
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", help="komma-gescheiden scenario's")
+    parser.add_argument("--upload", choices=("azure", "local"), default="azure",
+                        help="azure = Blob stub via HTTP, local = schrijven naar een tijdelijke map")
+    parser.add_argument("--latency-ms", default="", help="stub-latency, bv. kinde=30,pdok=40,nominatim=120")
+    parser.add_argument("--out", help="JSON resultaatbestand (default: bench/results/load_<scale>_<ts>.json)")
+    parser.add_argument("--compare", help="eerdere JSON run om p95 mee te vergelijken")
+    parser.add_argument("--threshold", type=float, default=20.0, help="p95 regressie-drempel in procent")
+    args = parser.parse_args()
+
+    scale = parse_scale(args.scale)
+    db_path = args.db or os.path.join(tempfile.gettempdir(), f"hs_load_{scale}.db")
+    if not os.path.exists(db_path):
+        from bench.common import make_engine
+        t0 = time.perf_counter()
+        seed(make_engine(db_path), scale)
+        print(f"geseed: {db_path} ({time.perf_counter() - t0:.1f}s)")
+    from bench.common import make_engine
+    info = describe(make_engine(db_path))
+
+    ctx = multiprocessing.get_context("spawn")
+    stub_port, api_port = _free_port(), _free_port()
+    ready = ctx.Event()
+    stubs = ctx.Process(target=_run_stubs, args=(stub_port, parse_latency(args.latency_ms), ready), daemon=True)
+    stubs.start()
+    ready.wait(10)
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    api = ctx.Process(target=_run_api, args=(db_path, stub_url, api_port, args.upload), daemon=True)
+    api.start()
+    base_url = f"http://127.0.0.1:{api_port}"
+    try:
+        _wait_for(base_url + "/health")
+        all_scenarios = scenarios(info)
+        names = args.only.split(",") if args.only else list(all_scenarios)
+        results = {}
+        print(f"scale={scale} {info['owners']} eigenaren / {info['horses']} paarden / {info['riders']} ruiters, "
+              f"{args.requests} requests x {args.concurrency} clients")
+        print(f"  {'scenario':<20} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8}  fouten")
+        for i, name in enumerate(names):
+            result = results[name] = run_scenario(base_url, all_scenarios[name], args.requests, args.concurrency, i)
+            print(f"  {name:<20} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                  f"{result['rps']:>8.1f}  {result['errors']} {result['status_codes'] if result['errors'] else ''}")
+    finally:
+        api.terminate()
+        stubs.terminate()
+
+    run = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"), "git": _git_revision(),
+            "scale": scale, "counts": {k: info[k] for k in ("owners", "horses", "riders")},
+            "requests": args.requests, "concurrency": args.concurrency, "upload": args.upload,
+            "stub_latency_ms": {k: v * 1000 for k, v in parse_latency(args.latency_ms).items()},
+            "python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count(),
+        },
+        "scenarios": results,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"load_{scale}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(run, indent=2) + "\n")
+    print(f"\nresultaat: {out}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
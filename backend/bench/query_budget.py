@@ -0,0 +1,105 @@
+"""Query budgets: aantal SQL statements per endpoint (N+1 regressies).
+
+Draait de echte `get_current_user` (Kinde gestubd) tegen een tijdelijke
+database en faalt (exit 1) als een endpoint boven zijn plafond komt.
+`--router owner` toont en controleert alleen de routes van routers/owner.py
+(de rest draait wel, voor dezelfde volgorde en data).
+
+Gebruik: python -m bench.query_budget [-v] [--router NAAM]
+"""
+import argparse
+import importlib
+import sys
+
+from sqlalchemy.orm import Session
+
+import auth
+from bench.common import make_client, make_engine
+from dbstats import count_queries
+from models import PUBLISHED, HorseProfile, OwnerProfile, RiderProfile, User
+
+KINDE_CLAIMS = {"id": "kp_budget", "email": "budget@example.com", "given_name": "Budget", "family_name": "Test"}
+HEADERS = {"Authorization": "Bearer budget"}
+
+# (methode, pad, extra kwargs, plafond)
+BUDGETS = [
+    ("GET", "/auth/me", {}, 2),
+    ("POST", "/auth/set-role", {"json": {"role": "owner"}}, 3),
+    ("GET", "/owner-profile", {}, 2),
+    ("GET", "/rider-profile", {}, 2),
+    ("POST", "/rider-profile", {"json": {"photos": ["https://cdn.example/p/1.jpg"], "budget_max_euro": 150}}, 4),
+    # eigenaarsprofiel komt uit de user-query (current_owner), niet uit een eigen lookup
+    ("GET", "/owner/horses", {}, 3),
+    ("GET", "/owner/horses/{horse_id}", {}, 2),
+    ("GET", "/ads/{horse_id}", {}, 3),
+    ("GET", "/ads/{horse_id}", {"etag": True}, 2),
+    ("GET", "/ads/search", {"params": {"q": "rustige vos"}}, 3),
+    # gepubliceerd paard: UPDATE ... RETURNING + upsert in published_ads
+    ("PATCH", "/owner/horses/{horse_id}", {"json": {"cost_amount": 150}}, 3),
+    ("POST", "/owner/horses/bulk", {"content": b'{"name": "Bles"}\n{"name": "Vos", "type": "horse"}\n',
+                                    "headers": {"Content-Type": "application/x-ndjson"}}, 9),
+    ("GET", "/owner/horses/export", {"params": {"format": "csv"}}, 2),
+    ("POST", "/owner/horses", {"json": {"name": "Nieuw", "type": "horse"}}, 6),
+    # een van de paarden uit de bulk import
+    ("DELETE", "/owner/horses/3", {}, 7),
+    # UPSERT ... RETURNING + ontvangers van het event; owner-like op de match die daaruit kwam
+    ("POST", "/matches/{horse_id}/like", {}, 3),
+    ("POST", "/matches/1/owner-like", {}, 3),
+    # alleen de INSERT in de queue; de worker doet de rest
+    ("POST", "/abuse/report", {"json": {"target_type": "horse", "horse_id": 1, "reason": "spam"}}, 2),
+]
+
+
+def seed(engine):
+    with Session(engine) as db:
+        user = User(kinde_id=KINDE_CLAIMS["id"], email=KINDE_CLAIMS["email"], name="Budget Test")
+        db.add(user)
+        db.flush()
+        owner = OwnerProfile(user_id=user.id, postcode="3511 AA", visible_radius=10, available_days={})
+        db.add(owner)
+        db.add(RiderProfile(user_id=user.id, postcode="3511 AA", max_travel_distance=10, available_days={},
+                             age=30))
+        db.flush()
+        horse = HorseProfile(owner_profile_id=owner.id, name="Budget", type="horse", title="Rustige vos",
+                             status=PUBLISHED)
+        db.add(horse)
+        db.commit()
+        return horse.id
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-v", "--verbose", action="store_true", help="toon de statements")
+    parser.add_argument("--router", help="alleen de routes van routers/<NAAM>.py (auth, owner, horses, ...)")
+    args = parser.parse_args()
+    routes = importlib.import_module(f"routers.{args.router}").router.routes if args.router else None
+
+    auth.verify_kinde_token = lambda token: dict(KINDE_CLAIMS)
+    engine = make_engine()
+    horse_id = seed(engine)
+    client = make_client(engine)
+
+    failures = 0
+    for method, path, kwargs, ceiling in BUDGETS:
+        kwargs = dict(kwargs)
+        url = path.format(horse_id=horse_id)
+        headers = {**HEADERS, **kwargs.pop("headers", {})}
+        if kwargs.pop("etag", False):
+            headers["If-None-Match"] = client.get(url, headers=HEADERS).headers["etag"]
+        with count_queries(engine) as stats:
+            response = client.request(method, url, headers=headers, **kwargs)
+        if routes is not None and not any(method in r.methods and r.path_regex.match(url) for r in routes):
+            continue
+        ok = stats.count <= ceiling and response.status_code < 400
+        failures += not ok
+        label = f"{method} {url}" + (" (If-None-Match)" if "If-None-Match" in headers else "")
+        print(f"  {'ok ' if ok else 'FAIL'} {label:<40} {response.status_code} {stats.count:>2} / {ceiling}")
+        if args.verbose or not ok:
+            for statement in stats.statements:
+                print("       " + " ".join(statement.split())[:160])
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Golden checks voor POST /rider-profile.
+
+Speelt elke case uit `golden/rider_profile_cases.json` (een reeks POSTs van één
+nieuwe gebruiker: create + updates) af tegen een lege database en vergelijkt de
+resulterende `rider_profiles` rij (+ naam/telefoon van de user) met
+`golden/rider_profile_rows.json`.
+
+Gebruik: python -m bench.rider_profile_golden [--update]
+"""
+import argparse
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from bench.common import make_client, make_engine
+from models import RiderProfile, User
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+CASES = GOLDEN_DIR / "rider_profile_cases.json"
+ROWS = GOLDEN_DIR / "rider_profile_rows.json"
+
+# Niet deterministisch of puur administratief
+SKIP_COLUMNS = {"id", "user_id", "created_at", "updated_at", "version"}
+
+
+def _age_from(dob):
+    today = date.today()
+    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+
+
+def snapshot(db, user_id):
+    user = db.get(User, user_id)
+    profile = db.query(RiderProfile).filter(RiderProfile.user_id == user_id).first()
+    row = None
+    if profile is not None:
+        row = {}
+        for column in RiderProfile.__table__.columns:
+            if column.name in SKIP_COLUMNS:
+                continue
+            value = getattr(profile, column.key)
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            row[column.name] = value
+        # leeftijd schuift mee met de datum: alleen vastleggen dát hij klopt met de geboortedatum
+        if profile.date_of_birth and profile.age == _age_from(profile.date_of_birth):
+            row["age"] = "<from date_of_birth>"
+    return {"user": {"name": user.name, "phone": user.phone}, "rider_profile": row}
+
+
+def run_case(steps):
+    engine = make_engine()
+    with Session(engine) as db:
+        user = User(kinde_id="golden", email="golden@example.com", name="Golden User")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    client = make_client(engine, user_id)
+    statuses = [client.post("/rider-profile", json=body).status_code for body in steps]
+    with Session(engine) as db:
+        return {"statuses": statuses, **snapshot(db, user_id)}
+
+
+def _diff(expected, actual, path=""):
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual)):
+            yield from _diff(expected.get(key), actual.get(key), f"{path}.{key}" if path else key)
+    elif expected != actual:
+        yield f"{path}: {expected!r} != {actual!r}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--update", action="store_true", help="schrijf de huidige uitkomst als golden")
+    args = parser.parse_args()
+
+    cases = json.loads(CASES.read_text())
+    results = {name: run_case(steps) for name, steps in cases.items()}
+
+    if args.update:
+        ROWS.write_text(json.dumps(results, indent=2, sort_keys=True, ensure_ascii=False) + "\n")
+        print(f"{len(results)} cases geschreven naar {ROWS.name}")
+        return
+
+    golden = json.loads(ROWS.read_text())
+    failures = 0
+    for name, result in results.items():
+        diffs = list(_diff(golden.get(name), result))
+        failures += bool(diffs)
+        print(f"  {'ok ' if not diffs else 'FAIL'} {name}")
+        for line in diffs:
+            print(f"       {line}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
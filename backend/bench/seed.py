@@ -0,0 +1,182 @@
+"""Deterministische testdata op schaal: users, eigenaren, paarden en ruiters.
+
+Schaal = aantal paarden; per 10 paarden één eigenaar, per 2 paarden één ruiter.
+Alles via Core bulk-inserts in chunks (ORM events staan dus uit); afgeleide
+data (full-text index, profile_tags, available_mask, published_ads) wordt hier
+zelf gevuld.
+
+Users krijgen `kinde_id = kp_bench_<id>` (zie `identity`); de Kinde-stub
+(bench/stubs.py) accepteert token `bench-<id>` voor die gebruiker.
+
+Gebruik: python -m bench.seed --scale 10k --db /tmp/hs_10k.db
+"""
+import argparse
+import random
+import time
+from datetime import date
+
+from sqlalchemy import func, insert, select, text
+
+from availability import schedule_to_mask
+from bench.common import make_engine
+from fulltext import FTS_COLUMNS, FTS_TABLE, document
+from models import PUBLISHED, HorseProfile, OwnerProfile, ProfileTag, PublishedAd, RiderProfile, User
+from published_ads import SOURCE_COLUMNS as AD_SOURCE_COLUMNS, ad_values
+from tags import extract_tags
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+HORSES_PER_OWNER = 10
+HORSES_PER_RIDER = 2
+
+_FIRST = ("Sanne", "Lotte", "Emma", "Noor", "Daan", "Sem", "Eva", "Tim", "Fleur", "Mila")
+_LAST = ("de Vries", "Jansen", "Bakker", "Visser", "Smit", "Mulder", "de Boer")
+_CITIES = (("Utrecht", "3511", 52.09, 5.12), ("Amersfoort", "3811", 52.16, 5.39), ("Zwolle", "8011", 52.51, 6.09),
+           ("Leiden", "2311", 52.16, 4.49), ("Arnhem", "6811", 51.98, 5.91), ("Groningen", "9711", 53.22, 6.57))
+_DAYS = ("maandag", "dinsdag", "woensdag", "donderdag", "vrijdag", "zaterdag", "zondag")
+_BLOCKS = ("ochtend", "middag", "avond")
+_TITLES = ("Rustige vos zoekt bijrijder", "Sportieve schimmel", "Lieve Friese merrie", "Brave pony", "Jonge ruin")
+_DESCRIPTIONS = ("Gaat graag naar buiten en is braaf in het verkeer.",
+                 "Springpaard voor gevorderde ruiters, L-niveau dressuur.",
+                 "Rustig karakter, geschikt voor verzorgen en grondwerk.")
+_BREEDS = ("KWPN", "Fries", "Holsteiner", "Welsh", "Haflinger")
+_COLORS = ("vos", "schimmel", "zwart", "bruin")
+_AD_TYPES = ("bijrijden", "lease", "verzorgen")
+_TEMPERAMENT = ("rustig", "energiek", "gevoelig", "nuchter")
+_DISCIPLINES = ("dressuur", "springen", "buitenritten", "western")
+_SKILLS = ("grondwerk", "longeren_basis", "opzadelen", "hoeven_uitkrabben")
+_TASKS = ("uitmesten", "poetsen", "voeren", "weide")
+
+
+def parse_scale(value):
+    return SCALES.get(value) or int(value)
+
+
+def identity(uid):
+    """Deterministische gebruiker; de Kinde-stub geeft exact deze claims terug."""
+    return {
+        "id": f"kp_bench_{uid}", "email": f"bench{uid}@example.com",
+        "given_name": _FIRST[uid % len(_FIRST)], "family_name": _LAST[uid % len(_LAST)],
+    }
+
+
+def counts(scale):
+    return {"horses": scale, "owners": max(1, scale // HORSES_PER_OWNER), "riders": max(1, scale // HORSES_PER_RIDER)}
+
+
+def _schedule(rnd):
+    return {d: rnd.sample(_BLOCKS, rnd.randint(1, 2)) for d in rnd.sample(_DAYS, rnd.randint(1, 4))}
+
+
+def _tag_rows(entity, entity_id, row):
+    return [{"entity": entity, "entity_id": entity_id, "attribute": attribute, "value": value}
+            for attribute, values in extract_tags(entity, row).items() for value in sorted(values)]
+
+
+def seed(engine, scale, chunk=5000):
+    """Vul een lege database; geeft de aantallen terug."""
+    rnd = random.Random(42)
+    n = counts(scale)
+    owners, riders, horses = n["owners"], n["riders"], n["horses"]
+
+    with engine.begin() as conn:
+        # Users: eerst eigenaren (id 1..owners), dan ruiters
+        for start in range(0, owners + riders, chunk):
+            rows = []
+            for uid in range(start + 1, min(owners + riders, start + chunk) + 1):
+                claims = identity(uid)
+                rows.append({
+                    "id": uid, "kinde_id": claims["id"], "email": claims["email"],
+                    "name": f"{claims['given_name']} {claims['family_name']}", "phone": f"06{uid:08d}",
+                    "onboarding_completed": True, "profile_type_chosen": "owner" if uid <= owners else "rider",
+                })
+            conn.execute(insert(User), rows)
+
+        for start in range(0, owners, chunk):
+            rows = []
+            for oid in range(start + 1, min(owners, start + chunk) + 1):
+                city, pc, lat, lon = rnd.choice(_CITIES)
+                schedule = _schedule(rnd)
+                rows.append({
+                    "id": oid, "user_id": oid, "postcode": f"{pc} AB", "house_number": str(rnd.randint(1, 200)),
+                    "city": city, "country_code": "NL", "lat": lat + rnd.uniform(-0.05, 0.05),
+                    "lon": lon + rnd.uniform(-0.05, 0.05), "visible_radius": 10, "available_days": schedule,
+                })
+            conn.execute(insert(OwnerProfile), rows)
+
+        cols = ", ".join(FTS_COLUMNS)
+        params = ", ".join(":" + c for c in FTS_COLUMNS)
+        for start in range(0, horses, chunk):
+            rows, tags = [], []
+            for hid in range(start + 1, min(horses, start + chunk) + 1):
+                city, pc, lat, lon = rnd.choice(_CITIES)
+                schedule = _schedule(rnd)
+                row = {
+                    "id": hid, "owner_profile_id": (hid - 1) % owners + 1, "name": f"Paard {hid}", "type": "horse",
+                    "title": rnd.choice(_TITLES), "description": " ".join(rnd.sample(_DESCRIPTIONS, 2)),
+                    "breed": rnd.choice(_BREEDS), "gender": rnd.choice(("merrie", "ruin")),
+                    "age": rnd.randint(4, 22), "height": rnd.randint(120, 180),
+                    "ad_type": None, "ad_types": [rnd.choice(_AD_TYPES)],
+                    "temperament": rnd.sample(_TEMPERAMENT, 2), "coat_colors": [rnd.choice(_COLORS)],
+                    "disciplines": rnd.sample(_DISCIPLINES, 2), "required_skills": rnd.sample(_SKILLS, 1),
+                    "required_tasks": rnd.sample(_TASKS, 2), "photos": [f"https://cdn.example/h/{hid}.jpg"],
+                    "available_days": schedule, "available_mask": schedule_to_mask(schedule),
+                    "cost_model": "per_maand", "cost_amount": rnd.randint(50, 300), "status": PUBLISHED,
+                    "stable_city": city, "stable_postcode": f"{pc} CD", "stable_country_code": "NL",
+                    "stable_lat": lat + rnd.uniform(-0.05, 0.05), "stable_lon": lon + rnd.uniform(-0.05, 0.05),
+                }
+                rows.append(row)
+                tags.extend(_tag_rows("horse", hid, row))
+            conn.execute(insert(HorseProfile), rows)
+            conn.execute(insert(ProfileTag), tags)
+            conn.execute(text(f"INSERT INTO {FTS_TABLE} (rowid, {cols}) VALUES (:id, {params})"),
+                         [{"id": r["id"], **document(r)} for r in rows])
+            conn.execute(insert(PublishedAd), [ad_values({c: r.get(c) for c in AD_SOURCE_COLUMNS}) for r in rows])
+
+        for start in range(0, riders, chunk):
+            rows, tags = [], []
+            for rid in range(start + 1, min(riders, start + chunk) + 1):
+                city, pc, lat, lon = rnd.choice(_CITIES)
+                schedule = _schedule(rnd)
+                dob = date(rnd.randint(1970, 2008), rnd.randint(1, 12), rnd.randint(1, 28))
+                row = {
+                    "id": rid, "user_id": owners + rid, "postcode": f"{pc} EF", "house_number": str(rnd.randint(1, 200)),
+                    "city": city, "country_code": "NL", "lat": lat, "lon": lon,
+                    "max_travel_distance": rnd.choice((10, 15, 25, 40)), "transport_options": ["auto"],
+                    "available_days": schedule, "available_mask": schedule_to_mask(schedule),
+                    "date_of_birth": dob, "age": date.today().year - dob.year,
+                    "budget_min": 50, "budget_max": rnd.choice((150, 250, 400)), "years_experience": rnd.randint(0, 25),
+                    "general_skills": rnd.sample(_SKILLS, 2), "riding_styles": ["engels"],
+                    "discipline_preferences": rnd.sample(_DISCIPLINES, 1), "willing_tasks": rnd.sample(_TASKS, 2),
+                    "goals": ["recreatie"], "photos": [], "status": PUBLISHED,
+                }
+                rows.append(row)
+                tags.extend(_tag_rows("rider", rid, row))
+            conn.execute(insert(RiderProfile), rows)
+            conn.execute(insert(ProfileTag), tags)
+    return n
+
+
+def describe(engine):
+    """Aantallen en de id-bereiken die het load-script nodig heeft."""
+    with engine.connect() as conn:
+        owners = conn.execute(select(func.count()).select_from(OwnerProfile)).scalar()
+        riders = conn.execute(select(func.count()).select_from(RiderProfile)).scalar()
+        horses = conn.execute(select(func.count()).select_from(HorseProfile)).scalar()
+    return {"owners": owners, "riders": riders, "horses": horses,
+            "owner_user_ids": [1, owners], "rider_user_ids": [owners + 1, owners + riders]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", default="1k", help="1k, 10k, 100k of een aantal paarden")
+    parser.add_argument("--db", help="pad voor de SQLite database (default: tijdelijk bestand)")
+    args = parser.parse_args()
+
+    engine = make_engine(args.db)
+    t0 = time.perf_counter()
+    n = seed(engine, parse_scale(args.scale))
+    print(f"{engine.url.database}: {n} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Stubs voor de externe diensten: Kinde, PDOK, Nominatim en Azure Blob.
+
+Eén `ThreadingHTTPServer` met vaste antwoorden en optionele kunstmatige
+latency per dienst, zodat load-tests geen echte accounts of netwerk nodig
+hebben en reproduceerbaar zijn.
+
+    Kinde      GET  /oauth2/user_profile    Bearer bench-<user_id> -> claims uit seed.identity
+               POST /oauth2/token, PATCH /api/v1/user (M2M sync)
+    PDOK       GET  /pdok/free?q=postcode:3511AB+AND+huisnummer:12
+    Nominatim  GET  /nominatim/search?postalcode=...&countrycodes=be
+    Azure      PUT  /azure/<container>/<blob>   (via `FakeBlobServiceClient`)
+
+Gebruik: python -m bench.stubs --port 8765 [--latency-ms kinde=30,pdok=40]
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from bench.seed import identity
+
+# dienst -> kunstmatige latency in seconden
+LATENCY = {"kinde": 0.0, "pdok": 0.0, "nominatim": 0.0, "azure": 0.0}
+
+_TOKEN = re.compile(r"^Bearer bench-(\d+)$")
+_PDOK_Q = re.compile(r"postcode:(\w+)\+?(?:AND| )\+?huisnummer:(\w+)")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # kleine antwoorden direct versturen (anders Nagle + delayed ACK: ~40 ms per call)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=None):
+        payload = json.dumps(body if body is not None else {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _sleep(self, service):
+        if LATENCY[service]:
+            time.sleep(LATENCY[service])
+
+    def _drain(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/oauth2/user_profile":
+            self._sleep("kinde")
+            match = _TOKEN.match(self.headers.get("Authorization", ""))
+            return self._reply(200, identity(int(match.group(1)))) if match else self._reply(401)
+        if url.path == "/pdok/free":
+            self._sleep("pdok")
+            match = _PDOK_Q.search(url.query)
+            if not match:
+                return self._reply(200, {"response": {"docs": []}})
+            return self._reply(200, {"response": {"docs": [{
+                "straatnaam": "Stubstraat", "woonplaatsnaam": "Utrecht",
+                "postcode": match.group(1), "huisnummer": match.group(2), "centroide_ll": "POINT(5.12 52.09)",
+            }]}})
+        if url.path == "/nominatim/search":
+            self._sleep("nominatim")
+            postcode = (query.get("postalcode") or query.get("q") or [""])[0].split(" ")[0]
+            cc = (query.get("countrycodes") or ["nl"])[0]
+            return self._reply(200, [{
+                "lat": "51.2", "lon": "4.4",
+                "address": {"road": "Stubstraat", "city": "Antwerpen", "postcode": postcode, "country_code": cc},
+            }])
+        return self._reply(404)
+
+    def do_POST(self):
+        self._drain()
+        if self.path.startswith("/oauth2/token"):
+            self._sleep("kinde")
+            return self._reply(200, {"access_token": "stub-m2m", "expires_in": 3600})
+        return self._reply(404)
+
+    def do_PATCH(self):
+        self._drain()
+        if self.path.startswith("/api/v1/user"):
+            self._sleep("kinde")
+            return self._reply(200, {"result": {"updated": True}})
+        return self._reply(404)
+
+    def do_PUT(self):
+        self._drain()
+        if self.path.startswith("/azure/"):
+            self._sleep("azure")
+            return self._reply(201)
+        return self._reply(404)
+
+
+def serve(port=0, latency=None):
+    """Start de stubs in een achtergrondthread; geeft (server, base_url) terug."""
+    LATENCY.update(latency or {})
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def stub_env(base_url):
+    """Env vars waarmee de API tegen de stubs praat (vóór `import main` zetten)."""
+    return {
+        "KINDE_DOMAIN": base_url,
+        "KINDE_M2M_CLIENT_ID": "bench", "KINDE_M2M_CLIENT_SECRET": "bench",
+        "PDOK_SEARCH_URL": f"{base_url}/pdok/free",
+        "NOMINATIM_SEARCH_URL": f"{base_url}/nominatim/search",
+        "AZURE_STORAGE_CONNECTION_STRING": f"BlobEndpoint={base_url}/azure", "AZURE_CONTAINER": "bench",
+        "AZURE_PUBLIC_BASE_URL": f"{base_url}/azure/bench",
+    }
+
+
+# -----------------------------
+# Azure SDK vervanger: praat HTTP met de stub i.p.v. met Blob Storage
+# -----------------------------
+
+class FakeContentSettings:
+    def __init__(self, content_type=None, **kwargs):
+        self.content_type = content_type
+
+
+class _FakeBlobClient:
+    def __init__(self, endpoint, container, blob_name, session):
+        self.url = f"{endpoint}/{container}/{blob_name}"
+        self._session = session
+
+    def upload_blob(self, data, overwrite=False, content_settings=None):
+        headers = {"Content-Type": getattr(content_settings, "content_type", None) or "application/octet-stream"}
+        self._session.put(self.url, data=data, headers=headers, timeout=10).raise_for_status()
+
+
+class _FakeContainerClient:
+    def __init__(self, endpoint, container, session):
+        self.endpoint, self.container, self._session = endpoint, container, session
+
+    def get_blob_client(self, blob_name):
+        return _FakeBlobClient(self.endpoint, self.container, blob_name, self._session)
+
+
+class FakeBlobServiceClient:
+    account_name = "benchstub"
+    _session = requests.Session()
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+
+    @classmethod
+    def from_connection_string(cls, conn_str):
+        return cls(conn_str.split("BlobEndpoint=", 1)[1].split(";")[0])
+
+    def get_container_client(self, container):
+        return _FakeContainerClient(self.endpoint, container, self._session)
+
+
+def parse_latency(value):
+    """"kinde=30,pdok=40" -> {"kinde": 0.03, "pdok": 0.04}"""
+    out = {}
+    for part in filter(None, (value or "").split(",")):
+        service, ms = part.split("=")
+        if service not in LATENCY:
+            raise SystemExit(f"onbekende dienst: {service}")
+        out[service] = float(ms) / 1000
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", default="", help="bv. kinde=30,pdok=40,nominatim=120,azure=50")
+    args = parser.parse_args()
+    server, url = serve(args.port, parse_latency(args.latency_ms))
+    print(f"stubs op {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
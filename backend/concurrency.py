@@ -0,0 +1,49 @@
+"""Optimistic concurrency: `version` kolommen + If-Match.
+
+HorseProfile, RiderProfile en OwnerProfile hebben een `version_id_col`; de ORM
+verhoogt die bij elke flush en zet `WHERE version = <geladen versie>` in de
+UPDATE. Twee tabs die tegelijk opslaan overschrijven elkaar dus niet stil:
+de tweede krijgt een 409 met de actuele versie en kan opnieuw laden.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from sqlalchemy.orm.exc import StaleDataError
+
+
+def parse_if_match(request: Request) -> Optional[int]:
+    """If-Match: `"3"`, `W/"3"` of `3` -> 3; ontbrekend of `*` -> None (geen check)."""
+    header = (request.headers.get("if-match") or "").strip()
+    if not header or header == "*":
+        return None
+    tag = header.split(",")[0].strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ongeldige If-Match header (verwacht een versie)")
+
+
+def conflict(current_version) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={"message": "Versieconflict: iemand anders heeft dit gewijzigd", "current_version": current_version},
+        headers={"ETag": f'"{current_version}"'} if current_version is not None else None,
+    )
+
+
+def check_version(expected: Optional[int], current: Optional[int]):
+    """409 als de client een andere versie heeft dan de database."""
+    if expected is not None and expected != current:
+        raise conflict(current)
+
+
+def commit_versioned(db, model, entity_id):
+    """Commit; een StaleDataError (concurrente write tussen load en flush) wordt een 409."""
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        current = db.query(model.version).filter(model.id == entity_id).scalar()
+        raise conflict(current)
@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+from availability import register_sqlite_functions
 
 # Database URL - SQLite voor development
 SQLALCHEMY_DATABASE_URL = "sqlite:///./horsesharing.db"
@@ -12,6 +13,12 @@ engine = create_engine(
     connect_args={"check_same_thread": False}  # Alleen nodig voor SQLite
 )
 
+# SQL helpers voor beschikbaarheid-bitmasks (popcount/mask_days)
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _register_sqlite_functions(dbapi_connection, connection_record):
+        register_sqlite_functions(dbapi_connection)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,186 @@
+"""SQL statement tellen per blok code (query budgets, N+1 detectie).
+
+    with count_queries(engine) as stats:
+        client.get("/auth/me")
+    assert stats.count <= 2, stats.statements
+
+`track_requests` + `request_query_stats` doen hetzelfde per HTTP request
+(aantal + tijd) voor de metrics middleware en `QueryProfileMiddleware`:
+slow-query log (DB_SLOW_QUERY_MS), budget per request (DB_QUERY_BUDGET) en
+X-DB-Queries / X-DB-Time headers zolang APP_ENV niet `production` is.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __repr__(self):
+        return f"<QueryStats {self.count} statements>"
+
+
+@contextmanager
+def count_queries(engine):
+    """Tel alle statements die via `engine` lopen binnen het with-blok."""
+    stats = QueryStats()
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        stats.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        yield stats
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+
+
+# -----------------------------
+# Per request: metrics, slow-query log, budget, debug headers
+# -----------------------------
+
+log = logging.getLogger("horsesharing.db")
+
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "100"))
+QUERY_BUDGET = int(os.getenv("DB_QUERY_BUDGET", "25"))
+# Debug headers (X-DB-Queries / X-DB-Time) alleen buiten productie
+DEBUG_HEADERS = os.getenv("APP_ENV", "development") != "production"
+
+
+class RequestQueryStats:
+    __slots__ = ("count", "seconds", "by_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.by_statement = {}  # statement -> [aantal, seconden]
+
+    def repeated(self, limit=3):
+        """Vaakst herhaalde statements (N+1 kandidaten) als (aantal, ms, sql)."""
+        items = sorted(self.by_statement.items(), key=lambda kv: kv[1][0], reverse=True)
+        return [(n, round(sec * 1000, 2), _collapse(sql)) for sql, (n, sec) in items[:limit] if n > 1]
+
+
+_current = ContextVar("request_query_stats", default=None)
+
+
+@contextmanager
+def request_query_stats():
+    """Verzamel statements in deze context (request); hergebruikt een al actieve verzameling."""
+    stats = _current.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = RequestQueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _collapse(statement, limit=500):
+    return " ".join(statement.split())[:limit]
+
+
+def param_shape(parameters, executemany=False):
+    """Vorm van de bound parameters (types, geen waarden) voor het slow-query log."""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return {"rows": len(parameters), "row": param_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(v).__name__ for v in parameters]
+    return type(parameters).__name__
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        entry = stats.by_statement.get(statement)
+        if entry is None:
+            stats.by_statement[statement] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        log.warning("slow query", extra={
+            "duration_ms": round(elapsed * 1000, 2),
+            "statement": _collapse(statement),
+            "params": param_shape(parameters, executemany),
+        })
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute komt niet bij een fout; timer van de stack halen
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def track_requests(target=Engine):
+    """Registreer de timing-listeners; standaard op álle engines (ook bench/test)."""
+    if not event.contains(target, "before_cursor_execute", _before_execute):
+        event.listen(target, "before_cursor_execute", _before_execute)
+        event.listen(target, "after_cursor_execute", _after_execute)
+        event.listen(target, "handle_error", _handle_error)
+
+
+class QueryProfileMiddleware:
+    """ASGI middleware: X-DB-Queries/X-DB-Time headers (niet-productie) en budget-waarschuwing.
+
+    Boven DB_QUERY_BUDGET statements wordt de route gelogd met de meest herhaalde
+    statements, zodat N+1 patronen in de logs opvallen.
+    """
+
+    def __init__(self, app, budget: int = None, headers: bool = None):
+        self.app = app
+        self.budget = QUERY_BUDGET if budget is None else budget
+        self.headers = DEBUG_HEADERS if headers is None else headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with request_query_stats() as stats:
+            async def send_with_headers(message):
+                if self.headers and message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", ())) + [
+                        (b"x-db-queries", str(stats.count).encode()),
+                        (b"x-db-time", f"{stats.seconds * 1000:.2f}".encode()),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                if stats.count > self.budget:
+                    route = getattr(scope.get("route"), "path", None) or scope["path"]
+                    log.warning("query budget exceeded", extra={
+                        "route": f"{scope['method']} {route}",
+                        "queries": stats.count,
+                        "budget": self.budget,
+                        "db_ms": round(stats.seconds * 1000, 2),
+                        "repeated": stats.repeated(),
+                    })
@@ -0,0 +1,303 @@
+"""Live updates via Server-Sent Events (`GET /events`), in plaats van pollen.
+
+Kanalen:
+    user:<id>   matches van deze gebruiker (als ruiter of als eigenaar):
+                `match` bij een nieuwe wederzijdse match of statuswijziging,
+                `like` naar de eigenaar bij een nieuwe like van een ruiter
+    ad:<id>     `ad` bij een wijziging aan een advertentie; de client geeft
+                mee welke advertenties hij open heeft (`?ads=12,34`), alleen
+                gepubliceerde of eigen paarden worden gevolgd
+
+Events worden in de sessie verzameld (`emit`) en pas na een geslaagde commit
+gepubliceerd, dus nooit voor een rollback. Match- en paard-wijzigingen via
+de ORM lopen via mapper events; de Core UPDATE van patch_horse roept
+`ad_changed` zelf aan.
+
+De broker is in-process: per verbinding één generator en een kleine
+asyncio.Queue, geen thread of DB-connectie, dus duizenden idle verbindingen
+per worker kosten vooral een paar KB geheugen per stuk. Een keep-alive
+comment (SSE_HEARTBEAT_SECONDS) houdt proxies open. Loopt een client achter
+(queue vol), dan krijgt hij één `resync` en haalt hij zelf opnieuw op.
+
+Streams eindigen niet vanzelf: draai uvicorn met --timeout-graceful-shutdown
+(zie main.py), anders wacht een deploy/herstart op elke open verbinding.
+
+Met meerdere workers, of publicaties vanuit de losse job-worker:
+EVENTS_BACKEND=redis + REDIS_URL (optioneel, vereist de redis package).
+Publiceren gaat dan via Redis pub/sub en elke worker verdeelt lokaal.
+"""
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import object_session
+
+from database import SessionLocal
+from metrics import SSE_EVENTS, Gauge
+from models import HorseProfile, Match, OwnerProfile, RiderProfile
+from responses import dumps
+
+log = logging.getLogger("horsesharing.events")
+
+# Optional Redis (gedeelde pub/sub tussen workers); alleen geïmporteerd met EVENTS_BACKEND=redis
+REDIS_AVAILABLE = importlib.util.find_spec("redis") is not None
+
+HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "25"))
+MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "5000"))
+MAX_ADS = 50
+QUEUE_SIZE = 32
+RETRY_MS = 5000
+REDIS_CHANNEL = "horsesharing:events"
+
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+PING = b": ping\n\n"
+RESYNC = b"event: resync\ndata: {}\n\n"
+
+
+def frame(name, data):
+    """SSE-frame; één keer opgebouwd per event, niet per abonnee."""
+    return b"event: " + name.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class Subscription:
+    __slots__ = ("channels", "queue")
+
+    def __init__(self, channels):
+        self.channels = channels
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Client loopt achter: wachtrij leeg, één resync (of het stop-signaal)
+            self._clear()
+            self.queue.put_nowait(RESYNC if message is not None else None)
+
+    def close(self):
+        self._clear()
+        self.queue.put_nowait(None)
+
+    def _clear(self):
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+
+def backend_from_env():
+    """Sync Redis-client om op te publiceren; None = alleen in-process."""
+    kind = os.getenv("EVENTS_BACKEND", "memory").lower()
+    if kind == "redis":
+        if not REDIS_AVAILABLE:
+            log.warning("EVENTS_BACKEND=redis maar de redis package ontbreekt; alleen in-process")
+            return None
+        import redis
+        return redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    if kind != "memory":
+        raise ValueError(f"onbekende EVENTS_BACKEND: {kind}")
+    return None
+
+
+class Broker:
+    """Kanaal -> abonnees. `dispatch` alleen op de event loop; `publish` vanuit elke thread."""
+
+    def __init__(self, backend=None):
+        self.channels = {}  # kanaal -> set(Subscription)
+        self.count = 0
+        self.loop = None
+        self.backend = backend
+
+    def subscribe(self, channels):
+        self.loop = asyncio.get_running_loop()
+        sub = Subscription(tuple(channels))
+        for channel in sub.channels:
+            self.channels.setdefault(channel, set()).add(sub)
+        self.count += 1
+        return sub
+
+    def unsubscribe(self, sub):
+        for channel in sub.channels:
+            subs = self.channels.get(channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self.channels[channel]
+        self.count -= 1
+
+    def dispatch(self, channel, message):
+        for sub in self.channels.get(channel, ()):
+            sub.put(message)
+
+    def publish(self, channel, name, data):
+        if self.backend is None and channel not in self.channels:
+            return  # niemand luistert in deze worker
+        message = frame(name, data)
+        SSE_EVENTS.inc((name,))
+        if self.backend is not None:
+            try:
+                self.backend.publish(REDIS_CHANNEL, json.dumps({"channel": channel, "frame": message.decode()}))
+                return
+            except Exception:
+                # Redis weg: dan in elk geval de eigen clients bedienen
+                log.warning("event publish via redis failed", exc_info=True)
+        self._dispatch_threadsafe(channel, message)
+
+    def _dispatch_threadsafe(self, channel, message):
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.dispatch(channel, message)
+        else:
+            loop.call_soon_threadsafe(self.dispatch, channel, message)
+
+    def close(self):
+        """Alle streams beëindigen (shutdown), zodat de server niet op idle verbindingen wacht."""
+        for subs in self.channels.values():
+            for sub in subs:
+                sub.close()
+
+    async def listen(self, url):
+        """Redis pub/sub -> lokale abonnees; draait als task tot hij gecanceld wordt."""
+        import redis.asyncio as aioredis
+        self.loop = asyncio.get_running_loop()
+        while True:
+            try:
+                client = aioredis.from_url(url)
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(REDIS_CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            data = json.loads(message["data"])
+                            self.dispatch(data["channel"], data["frame"].encode())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.warning("redis event listener failed, reconnecting", exc_info=True)
+                await asyncio.sleep(RETRY_MS / 1000)
+
+
+broker = Broker(backend_from_env())
+
+SSE_CONNECTIONS = Gauge("sse_connections", "Open SSE-verbindingen in deze worker", collect=lambda: {(): broker.count})
+
+
+def start_listener():
+    """Task voor de Redis listener als die backend aan staat, anders None (aanroepen in de lifespan)."""
+    if broker.backend is None:
+        return None
+    return asyncio.create_task(broker.listen(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+
+
+async def stream(channels):
+    """Body van de StreamingResponse: ready, dan events en keep-alives tot disconnect of shutdown."""
+    sub = broker.subscribe(channels)
+    try:
+        yield f"retry: {RETRY_MS}\n".encode() + frame("ready", {"channels": len(sub.channels)})
+        while True:
+            try:
+                message = await asyncio.wait_for(sub.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                message = PING
+            if message is None:
+                return
+            yield message
+    finally:
+        broker.unsubscribe(sub)
+
+
+def parse_ads(value):
+    """"12,34" -> [12, 34] (uniek, max MAX_ADS); ValueError bij ongeldige invoer."""
+    ids = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if part:
+            ids.append(int(part))
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_ADS:
+        raise ValueError(f"maximaal {MAX_ADS} advertenties per stream")
+    return ids
+
+
+# -----------------------------
+# Publiceren na commit
+# -----------------------------
+
+def emit(db, channel, name, data):
+    """Event klaarzetten; wordt gepubliceerd na de commit van deze sessie."""
+    db.info.setdefault("live_events", []).append((channel, name, data))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _publish_after_commit(session):
+    for channel, name, data in session.info.pop("live_events", None) or ():
+        broker.publish(channel, name, data)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_after_rollback(session):
+    session.info.pop("live_events", None)
+
+
+def ad_changed(db, row):
+    """`row`: dict/rij met id, status, version, updated_at (bv. de RETURNING van patch_horse)."""
+    emit(db, f"ad:{row['id']}", "ad", {
+        "horse_id": row["id"], "status": row["status"], "version": row["version"], "updated_at": row["updated_at"],
+    })
+
+
+def match_changed(db, connection, match, name="match", sides=("rider", "owner")):
+    """Standaard naar ruiter én eigenaar, zonder like-vlaggen, zodat een eenzijdige like niet uitlekt.
+
+    matches.py stuurt een nieuwe like van een ruiter als `like` alleen naar de eigenaar (sides=("owner",)).
+    """
+    owner_user = (
+        select(OwnerProfile.user_id)
+        .join(HorseProfile, HorseProfile.owner_profile_id == OwnerProfile.id)
+        .where(HorseProfile.id == match["horse_profile_id"])
+        .scalar_subquery()
+    )
+    rider_user = select(RiderProfile.user_id).where(RiderProfile.id == match["rider_profile_id"]).scalar_subquery()
+    users = dict(zip(("rider", "owner"), connection.execute(select(rider_user, owner_user)).one()))
+    data = {
+        "match_id": match["id"], "horse_id": match["horse_profile_id"], "rider_profile_id": match["rider_profile_id"],
+        "is_mutual_match": bool(match["is_mutual_match"]), "status": match["status"],
+    }
+    for user_id in {users[side] for side in sides if users[side] is not None}:
+        emit(db, f"user:{user_id}", name, data)
+
+
+MATCH_COLUMNS = ("id", "rider_profile_id", "horse_profile_id", "is_mutual_match", "status")
+
+
+def _match_row(target):
+    return {c: getattr(target, c) for c in MATCH_COLUMNS}
+
+
+@event.listens_for(Match, "after_insert")
+def _match_after_insert(mapper, connection, target):
+    if target.is_mutual_match:
+        match_changed(object_session(target), connection, _match_row(target))
+
+
+@event.listens_for(Match, "after_update")
+def _match_after_update(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if attrs.is_mutual_match.history.has_changes() or attrs.status.history.has_changes():
+        match_changed(object_session(target), connection, _match_row(target))
+
+
+@event.listens_for(HorseProfile, "after_update")
+def _ad_after_update(mapper, connection, target):
+    ad_changed(object_session(target), {c: getattr(target, c) for c in ("id", "status", "version", "updated_at")})
+
+
+@event.listens_for(HorseProfile, "after_delete")
+def _ad_after_delete(mapper, connection, target):
+    emit(object_session(target), f"ad:{target.id}", "ad", {"horse_id": target.id, "deleted": True})
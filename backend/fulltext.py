@@ -0,0 +1,174 @@
+"""Full-text zoeken op advertenties (titel, verhaal, ras, plaats + trefwoorden).
+
+- SQLite (dev): FTS5-tabel `horse_ads_fts` met rowid = horse_profiles.id. FTS5
+  heeft geen Nederlandse stemmer, dus de tekst wordt in Python gestemd
+  (snowballstemmer indien geïnstalleerd, anders een eenvoudige suffix-stripper)
+  en via mapper-events bij elke write bijgewerkt.
+- Postgres (prod): gegenereerde `search_vector` tsvector-kolom met de 'dutch'
+  config en een GIN-index (zie migratie); geen sync in Python nodig.
+
+Ranking: bm25() resp. ts_rank(), met titel en trefwoorden zwaarder dan de tekst.
+"""
+import importlib.util
+import re
+import unicodedata
+from functools import lru_cache
+
+from sqlalchemy import column, event, func, inspect, literal_column, table, text
+
+from models import HorseProfile
+
+# Optional snowball stemmer; laadt al zijn talen, dus pas bij het eerste woord
+SNOWBALL_AVAILABLE = importlib.util.find_spec("snowballstemmer") is not None
+
+FTS_TABLE = "horse_ads_fts"
+# kolom -> bm25 gewicht (volgorde = kolomvolgorde in FTS5)
+FTS_COLUMNS = {
+    "title": 10.0,
+    "description": 1.0,
+    "breed": 5.0,
+    "stable_city": 5.0,
+    "keywords": 8.0,
+}
+# JSON-lijsten die als trefwoorden meegaan (vachtkleur, type advertentie, karakter)
+KEYWORD_COLUMNS = ("ad_types", "coat_colors", "temperament")
+SOURCE_COLUMNS = ("title", "description", "breed", "stable_city", "ad_type") + KEYWORD_COLUMNS
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_fts = table(FTS_TABLE, column("rowid"))
+
+
+def _light_stem(word):
+    # fallback: meervoud/buigings-e en dubbele eindmedeklinker (vossen -> vos)
+    for suffix in ("heden", "en", "e", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            break
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "aeiou":
+        word = word[:-1]
+    return word
+
+
+# Advertenties gebruiken een beperkte woordenschat; de (pure Python) snowball stemmer
+# per woord cachen scheelt het grootste deel van de indexeertijd bij bulk writes
+@lru_cache(maxsize=50_000)
+def _stem(word):
+    return _stemmer()(word)
+
+
+@lru_cache(maxsize=None)
+def _stemmer():
+    if SNOWBALL_AVAILABLE:
+        import snowballstemmer
+        return snowballstemmer.stemmer("dutch").stemWord
+    return _light_stem
+
+
+def tokens(value):
+    """Lowercase, zonder accenten, gestemd."""
+    value = unicodedata.normalize("NFKD", str(value or "").lower())
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    return [_stem(w) for w in _WORD_RE.findall(value)]
+
+
+def _keywords(row):
+    values = []
+    for col in KEYWORD_COLUMNS:
+        values.extend(row.get(col) or [])
+    if row.get("ad_type"):
+        values.append(row["ad_type"])
+    return " ".join(str(v).replace("_", " ") for v in values)
+
+
+def document(row):
+    """Kolomwaarden (dict) -> gestemde tekst per FTS-kolom."""
+    raw = {
+        "title": row.get("title"),
+        "description": row.get("description"),
+        "breed": row.get("breed"),
+        "stable_city": row.get("stable_city"),
+        "keywords": _keywords(row),
+    }
+    return {k: " ".join(tokens(v)) for k, v in raw.items()}
+
+
+def build_match_query(q):
+    """Zoektekst -> FTS5 MATCH expressie (AND van prefix-termen)."""
+    terms = tokens(q)
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+# -----------------------------
+# SQLite index
+# -----------------------------
+
+def install_sqlite(connection):
+    cols = ", ".join(FTS_COLUMNS)
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({cols}, tokenize='unicode61 remove_diacritics 2')"
+    ))
+
+
+def index_horse(connection, horse_id, row):
+    if connection.dialect.name != "sqlite":
+        return
+    doc = document(row)
+    connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": horse_id})
+    connection.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) VALUES (:id, {', '.join(':' + c for c in FTS_COLUMNS)})"),
+        {"id": horse_id, **doc},
+    )
+
+
+def remove_horse(connection, horse_id):
+    if connection.dialect.name != "sqlite":
+        return
+    connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": horse_id})
+
+
+def _row(target):
+    return {c: getattr(target, c) for c in SOURCE_COLUMNS}
+
+
+@event.listens_for(HorseProfile, "after_insert")
+def _fts_after_insert(mapper, connection, target):
+    index_horse(connection, target.id, _row(target))
+
+
+@event.listens_for(HorseProfile, "after_update")
+def _fts_after_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[c].history.has_changes() for c in SOURCE_COLUMNS):
+        index_horse(connection, target.id, _row(target))
+
+
+@event.listens_for(HorseProfile, "after_delete")
+def _fts_after_delete(mapper, connection, target):
+    remove_horse(connection, target.id)
+
+
+# -----------------------------
+# Query
+# -----------------------------
+
+def apply_fulltext(query, q, dialect_name, id_column=HorseProfile.id):
+    """Filter `query` op zoektekst en sorteer op relevantie.
+
+    `id_column` is de paard-id in de query (HorseProfile.id of PublishedAd.horse_id).
+    """
+    if dialect_name == "postgresql":
+        tsquery = func.websearch_to_tsquery("dutch", q)
+        vector = literal_column("horse_profiles.search_vector")
+        if id_column is not HorseProfile.id:
+            query = query.join(HorseProfile, HorseProfile.id == id_column)
+        return query.filter(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc())
+
+    match = build_match_query(q)
+    if not match:
+        return query
+    weights = ", ".join(str(w) for w in FTS_COLUMNS.values())
+    return (
+        query.join(_fts, _fts.c.rowid == id_column)
+        .filter(literal_column(FTS_TABLE).op("MATCH")(match))
+        .order_by(text(f"bm25({FTS_TABLE}, {weights})"))
+    )
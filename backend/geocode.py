@@ -0,0 +1,148 @@
+"""Adres -> coördinaten: PDOK Locatieserver (NL) met Nominatim (OSM) als fallback.
+
+Gebruikt door `GET /geo/lookup` en de `geocode_backfill` job (tasks.py).
+Resultaten staan een uur in een procescache.
+"""
+import logging
+import os
+import time
+
+from metrics import GEO_CACHE, GEO_PROVIDER_ERRORS, GEO_PROVIDER_SECONDS
+
+log = logging.getLogger("horsesharing.geocode")
+
+# Overschrijfbaar voor stubs (bench/load.py)
+PDOK_SEARCH_URL = os.getenv("PDOK_SEARCH_URL", "https://api.pdok.nl/bzk/locatieserver/search/v3_1/free")
+NOMINATIM_SEARCH_URL = os.getenv("NOMINATIM_SEARCH_URL", "https://nominatim.openstreetmap.org/search")
+
+_cache = {}
+
+
+def _cache_get(key: str):
+    item = _cache.get(key)
+    if not item:
+        return None
+    expires, val = item
+    if time.time() > expires:
+        _cache.pop(key, None)
+        return None
+    return val
+
+
+def _cache_set(key: str, val: dict, ttl: int = 3600):
+    _cache[key] = (time.time() + ttl, val)
+
+
+def lookup(country: str, postcode: str, number: str, addition: str = ""):
+    """Adresdict (street, city, postcode, lat, lon, source, confidence, ...) of None als niet gevonden."""
+    country = (country or "").upper()
+    key = f"{country}:{postcode}:{number}:{addition}"
+    cached = _cache_get(key)
+    GEO_CACHE.inc(("hit" if cached else "miss",))
+    if cached:
+        return cached
+    import requests  # pas bij de eerste cache-miss laden (startup)
+
+    # NL via PDOK Locatieserver BAG
+    if country == "NL":
+        try:
+            pc = (postcode or "").replace(" ", "").upper()
+            # Gebruik nieuw PDOK endpoint (oude domein kan DNS-fouten geven)
+            url = f"{PDOK_SEARCH_URL}?q=postcode:{pc}+AND+huisnummer:{number}"
+            with GEO_PROVIDER_SECONDS.time("PDOK"):
+                r = requests.get(url, timeout=5)
+            r.raise_for_status()
+            data = r.json()
+            docs = data.get("response", {}).get("docs", [])
+            doc = docs[0] if docs else None
+            if doc:
+                street = doc.get("straatnaam", "")
+                city = doc.get("woonplaatsnaam", "")
+                # centroide_ll kan "POINT(lon lat)" of "lon lat" zijn
+                ll = doc.get("centroide_ll") or doc.get("geometrie_ll") or ""
+                lat = lon = None
+                if ll.startswith("POINT(") and ll.endswith(")"):
+                    # POINT(lon lat)
+                    coords = ll[len("POINT("):-1].strip().split(" ")
+                    if len(coords) == 2:
+                        lon = float(coords[0]); lat = float(coords[1])
+                elif " " in ll:
+                    parts = ll.split(" ")
+                    lon = float(parts[0]); lat = float(parts[1])
+                res = {
+                    "street": street,
+                    "city": city,
+                    "postcode": f"{pc[:4]} {pc[4:]}" if len(pc) == 6 else postcode,
+                    "house_number": number,
+                    "addition": addition or None,
+                    "country_code": country,
+                    "lat": lat,
+                    "lon": lon,
+                    "source": "PDOK",
+                    "confidence": 0.95 if street and city else 0.7,
+                }
+                _cache_set(key, res)
+                return res
+        except Exception as e:
+            GEO_PROVIDER_ERRORS.inc(("PDOK",))
+            log.warning("PDOK lookup failed", extra={"error": str(e), "country": country})
+
+    # Fallback: Nominatim (OSM)
+    try:
+        cc = (country or "").lower()
+        base = NOMINATIM_SEARCH_URL
+        # 1) Structured query (beperkt op land en postcode)
+        params = {
+            "format": "json",
+            "addressdetails": 1,
+            "limit": 1,
+            "countrycodes": cc,
+            "postalcode": postcode,
+            "street": f"{number} {addition}".strip(),
+        }
+        with GEO_PROVIDER_SECONDS.time("OSM"):
+            resp = requests.get(base, params=params, headers={"User-Agent": "HorseSharing2/1.0"}, timeout=8)
+        resp.raise_for_status()
+        arr = resp.json()
+        if not arr:
+            # 2) Tekst query maar nog steeds met countrycodes
+            q = f"{postcode} {number} {addition}"
+            params2 = {
+                "q": q,
+                "format": "json",
+                "addressdetails": 1,
+                "limit": 1,
+                "countrycodes": cc,
+            }
+            with GEO_PROVIDER_SECONDS.time("OSM"):
+                resp = requests.get(base, params=params2, headers={"User-Agent": "HorseSharing2/1.0"}, timeout=8)
+            resp.raise_for_status()
+            arr = resp.json()
+        if arr:
+            it = arr[0]
+            addr = it.get("address", {})
+            # Validatie: land en postcode moeten overeenkomen
+            match_cc = (addr.get("country_code") or cc).upper() == country
+            norm_postcode_req = (postcode or '').replace(' ', '').upper()
+            norm_postcode_res = (addr.get("postcode") or '').replace(' ', '').upper()
+            if not match_cc or (norm_postcode_res and norm_postcode_res != norm_postcode_req):
+                raise LookupError("Adres niet gevonden (valt buiten land/postcode)")
+            res = {
+                "street": addr.get("road") or addr.get("pedestrian") or "",
+                "city": addr.get("city") or addr.get("town") or addr.get("village") or "",
+                "postcode": addr.get("postcode") or postcode,
+                "house_number": number,
+                "addition": addition or None,
+                "country_code": (addr.get("country_code") or country).upper(),
+                "lat": float(it.get("lat")) if it.get("lat") else None,
+                "lon": float(it.get("lon")) if it.get("lon") else None,
+                "source": "OSM",
+                "confidence": 0.7,
+            }
+            _cache_set(key, res)
+            return res
+    except Exception as e:
+        GEO_PROVIDER_ERRORS.inc(("OSM",))
+        log.warning("OSM lookup failed", extra={"error": str(e), "country": country})
+
+    return None
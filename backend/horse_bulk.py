@@ -0,0 +1,265 @@
+"""Bulk import/export van paarden voor stallen met veel paarden.
+
+Import (`POST /owner/horses/bulk`): NDJSON (één object per regel) of CSV
+(header + één paard per regel; lijsten/objecten als JSON in de cel). De body
+wordt als stream gelezen en per rij gevalideerd met `HorsePayload` en de
+veldkaart van horse_patch; geldige rijen gaan per BATCH_SIZE in één
+transactie de database in. Een rij met `id` werkt dat (eigen) paard bij, met
+`version` erbij alleen als die nog klopt. Lege cellen en `null` betekenen,
+net als bij POST /owner/horses, "niet meegegeven".
+
+Export (`GET /owner/horses/export`): dezelfde kolommen, gestreamd met
+`yield_per`, zodat het geheugen O(batch) blijft; een export kan na bewerken
+direct weer geïmporteerd worden.
+"""
+import csv
+import io
+import json
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
+
+from horse_patch import HorsePayload, PatchError, build_values
+from models import DRAFT, HorseProfile
+from responses import dumps
+
+BATCH_SIZE = 200
+MAX_ROWS = 10_000
+MAX_LINE_BYTES = 256 * 1024
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# id + version voor round-trips, daarna alle HorsePayload velden (zonder de aliassen video_intro_url/is_available)
+EXPORT_COLUMNS = ("id", "version") + tuple(
+    name for name in HorsePayload.model_fields if name not in ("id", "video_intro_url", "is_available")
+)
+
+
+class BulkError(ValueError):
+    """De body als geheel is onbruikbaar (CSV zonder header)."""
+
+
+def detect_format(requested, content_type):
+    """`?format=` of Content-Type -> "ndjson" | "csv"; None als onbekend."""
+    if requested:
+        return requested if requested in FORMATS else None
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json"):
+        return "ndjson"
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    return None
+
+
+# -----------------------------
+# Import
+# -----------------------------
+
+async def _lines(stream):
+    """Async byte-chunks -> regels (bytes, zonder regeleinde); None voor een te lange regel."""
+    tail, skipping = b"", False
+    async for chunk in stream:
+        parts = (tail + chunk).split(b"\n")
+        tail = parts.pop()
+        for line in parts:
+            if skipping:
+                skipping = False
+                continue
+            yield line.rstrip(b"\r")
+        if len(tail) > MAX_LINE_BYTES:
+            if not skipping:
+                yield None
+            tail, skipping = b"", True
+    if tail.strip() and not skipping:
+        yield tail.rstrip(b"\r")
+
+
+def _csv_cell(value):
+    value = value.strip()
+    if value[:1] in ("[", "{"):
+        return json.loads(value)
+    return value
+
+
+async def _rows(stream, fmt):
+    """-> (rijnummer, dict) of (rijnummer, foutmelding); rijnummers tellen vanaf 1, zonder header."""
+    header, pending, row = None, "", 0
+    async for raw in _lines(stream):
+        try:
+            if raw is None:
+                raise ValueError(f"regel langer dan {MAX_LINE_BYTES} bytes")
+            line = raw.decode("utf-8")
+        except ValueError as e:
+            row += 1
+            yield row, "geen geldige UTF-8" if isinstance(e, UnicodeDecodeError) else str(e)
+            continue
+        if header is None and not pending:
+            line = line.lstrip("\ufeff")  # BOM uit Excel
+        if fmt == "ndjson":
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield row, f"ongeldige JSON: {e}"
+                continue
+            yield row, item if isinstance(item, dict) else "verwacht een object"
+            continue
+
+        # CSV: een cel met regeleinde loopt door tot het aantal quotes weer even is
+        line = pending + line
+        if line.count('"') % 2:
+            pending = line + "\n"
+            continue
+        pending = ""
+        if not line.strip():
+            continue
+        cells = next(csv.reader([line]))
+        if header is None:
+            header = [c.strip() for c in cells]
+            continue
+        row += 1
+        if len(cells) != len(header):
+            yield row, f"verwacht {len(header)} kolommen, kreeg {len(cells)}"
+            continue
+        try:
+            yield row, {k: _csv_cell(v) for k, v in zip(header, cells) if v.strip()}
+        except ValueError as e:
+            yield row, f"ongeldige JSON in cel: {e}"
+    if pending:
+        yield row + 1, "niet afgesloten quote"
+    if fmt == "csv" and header is None:
+        raise BulkError("CSV zonder header")
+
+
+def validate_row(item):
+    """Eén rij -> (horse_id, version, kolomwaarden); PatchError met {field, error} bij fouten."""
+    try:
+        payload = HorsePayload.model_validate(item)
+    except ValidationError as e:
+        raise PatchError([{"field": ".".join(str(p) for p in err["loc"]), "error": err["msg"]} for err in e.errors()])
+    version = item.get("version")
+    if version is not None:
+        try:
+            version = int(version)
+        except (TypeError, ValueError):
+            raise PatchError([{"field": "version", "error": "verwacht een geheel getal"}])
+    changes = {k: v for k, v in payload.model_dump(exclude_unset=True, exclude={"id"}).items() if v is not None}
+    return payload.id, version, build_values(changes)
+
+
+def write_batch(db, owner_id, batch):
+    """[(rij, horse_id, version, values)] -> resultaten; één SELECT voor updates en één transactie."""
+    ids = {horse_id for _, horse_id, _, _ in batch if horse_id}
+    existing = {}
+    if ids:
+        existing = {h.id: h for h in db.query(HorseProfile).filter(
+            HorseProfile.owner_profile_id == owner_id, HorseProfile.id.in_(ids))}
+
+    results, written = [], []
+    for row, horse_id, version, values in batch:
+        if horse_id:
+            horse = existing.get(horse_id)
+            if horse is None:
+                results.append({"row": row, "status": "error", "errors": [{"field": "id", "error": "paard niet gevonden"}]})
+                continue
+            if version is not None and version != horse.version:
+                results.append({"row": row, "status": "error", "horse_id": horse_id,
+                                "errors": [{"field": "version", "error": f"versieconflict (actueel: {horse.version})"}]})
+                continue
+            status = "updated"
+        else:
+            # Nieuw paard: zelfde defaults als POST /owner/horses (concept, niet gepubliceerd)
+            horse = HorseProfile(owner_profile_id=owner_id, name="", type="pony", status=DRAFT)
+            db.add(horse)
+            status = "created"
+        for column, value in values.items():
+            setattr(horse, column, value)
+        written.append((row, status, horse))
+
+    try:
+        db.flush()
+        horse_ids = [horse.id for _, _, horse in written]
+        db.commit()
+    except (StaleDataError, SQLAlchemyError) as e:
+        db.rollback()
+        error = "versieconflict" if isinstance(e, StaleDataError) else "opslaan mislukt"
+        results.extend({"row": row, "status": "error", "errors": [{"field": "", "error": error}]}
+                       for row, _, _ in written)
+    else:
+        results.extend({"row": row, "status": status, "horse_id": horse_id}
+                       for (row, status, _), horse_id in zip(written, horse_ids))
+    return results
+
+
+async def import_horses(db, owner_id, stream, fmt):
+    """Lees, valideer en schrijf de stream weg; geeft tellingen + resultaat per rij."""
+    results, batch = [], []
+    async for row, item in _rows(stream, fmt):
+        if row > MAX_ROWS:
+            results.append({"row": row, "status": "error",
+                            "errors": [{"field": "", "error": f"maximaal {MAX_ROWS} rijen per import, rest overgeslagen"}]})
+            break
+        if isinstance(item, str):
+            results.append({"row": row, "status": "error", "errors": [{"field": "", "error": item}]})
+            continue
+        try:
+            batch.append((row, *validate_row(item)))
+        except PatchError as e:
+            results.append({"row": row, "status": "error", "errors": e.errors})
+            continue
+        if len(batch) >= BATCH_SIZE:
+            results.extend(write_batch(db, owner_id, batch))
+            batch = []
+    if batch:
+        results.extend(write_batch(db, owner_id, batch))
+
+    results.sort(key=lambda r: r["row"])
+    totals = {"created": 0, "updated": 0, "error": 0}
+    for r in results:
+        totals[r["status"]] += 1
+    return {"created": totals["created"], "updated": totals["updated"], "failed": totals["error"], "rows": results}
+
+
+# -----------------------------
+# Export
+# -----------------------------
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def export_horses(db, owner_id, fmt):
+    """Generator van bytes-chunks (één per partitie van BATCH_SIZE rijen); owner_id None = leeg."""
+    stmt = (
+        select(*[getattr(HorseProfile, c) for c in EXPORT_COLUMNS])
+        .where(HorseProfile.owner_profile_id == owner_id)
+        .order_by(HorseProfile.id)
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    partitions = db.execute(stmt).partitions() if owner_id is not None else ()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+    for partition in partitions:
+        if fmt == "ndjson":
+            yield b"".join(dumps(dict(zip(EXPORT_COLUMNS, values))) + b"\n" for values in partition)
+            continue
+        writer.writerows([_csv_value(v) for v in values] for values in partition)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if fmt == "csv" and buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
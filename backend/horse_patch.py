@@ -0,0 +1,339 @@
+"""Partiële updates van een paard (wizard per tab) met één UPDATE.
+
+`FIELDS` is de declaratieve veldkaart: payload-key -> (kolom, converter).
+`parse_patch` accepteert een merge-patch (`{"title": "..."}`) of JSON Patch
+(`[{"op": "replace", "path": "/title", "value": "..."}]`); `null` wist een veld.
+
+Omdat de UPDATE buiten de ORM-unit-of-work loopt, worden de afgeleide data
+(available_mask, profile_tags, full-text index, published_ads) hier expliciet
+bijgewerkt op basis van de RETURNING-waarden, zonder extra SELECT.
+"""
+from datetime import date, datetime
+from typing import Optional, Union
+
+from pydantic import BaseModel
+
+from sqlalchemy import select, update
+
+from availability import schedule_to_mask
+from events import ad_changed
+from fulltext import SOURCE_COLUMNS, index_horse
+from models import DRAFT, PUBLISHED, STATUSES, HorseProfile, OwnerProfile
+from published_ads import SOURCE_COLUMNS as AD_SOURCE_COLUMNS, refresh_ad
+from tags import TAGGED, affected_attributes, extract_tags, sync_tags
+
+
+class PatchError(ValueError):
+    """Ongeldige patch; `errors` is een lijst {field, error} voor de 422-response."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(f"{e['field']}: {e['error']}" for e in errors))
+        self.errors = errors
+
+
+# -----------------------------
+# Converters (None = veld wissen, nullable-check volgt later)
+# -----------------------------
+
+def _str(value):
+    if not isinstance(value, str):
+        raise ValueError("verwacht tekst")
+    return value
+
+
+def _int(value):
+    if isinstance(value, bool):
+        raise ValueError("verwacht een geheel getal")
+    if isinstance(value, str):
+        value = value.strip()
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError("verwacht een geheel getal")
+
+
+def _float(value):
+    if isinstance(value, bool):
+        raise ValueError("verwacht een getal")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError("verwacht een getal")
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    if value in (0, 1):
+        return bool(value)
+    raise ValueError("verwacht true/false")
+
+
+def _list(value):
+    if not isinstance(value, list):
+        raise ValueError("verwacht een lijst")
+    return value
+
+
+def _dict(value):
+    if not isinstance(value, dict):
+        raise ValueError("verwacht een object")
+    return value
+
+
+def _dict_or_list(value):
+    # disciplines: wizard stuurt een lijst, oudere clients een mapping
+    if not isinstance(value, (dict, list)):
+        raise ValueError("verwacht een object of lijst")
+    return value
+
+
+def _date(value):
+    if value == "":
+        return None
+    try:
+        return date.fromisoformat(_str(value)[:10])
+    except ValueError:
+        raise ValueError("verwacht een datum (yyyy-mm-dd)")
+
+
+def _country(value):
+    return _str(value).upper()[:2]
+
+
+def _status(value):
+    if value not in STATUSES:
+        raise ValueError(f"verwacht {' of '.join(STATUSES)}")
+    return value
+
+
+def _published(value):
+    # compat: is_available true/false -> status
+    return PUBLISHED if _bool(value) else DRAFT
+
+
+FIELDS = {
+    # Basis
+    "title": ("title", _str),
+    "description": ("description", _str),
+    "ad_type": ("ad_type", _str),
+    "ad_types": ("ad_types", _list),
+    "ad_reason": ("ad_reason", _str),
+    "name": ("name", _str),
+    "type": ("type", _str),
+    "height": ("height", _int),
+    "age": ("age", _int),
+    "gender": ("gender", _str),
+    "breed": ("breed", _str),
+    "start_date": ("start_date", _date),
+    "end_date": ("end_date", _date),
+    "no_end_date": ("no_end_date", _bool),
+    # Media
+    "photos": ("photos", _list),
+    "videos": ("videos", _list),
+    "video": ("video", _str),
+    "video_intro_url": ("video", _str),
+    # Karakter / niveau
+    "disciplines": ("disciplines", _dict_or_list),
+    "level": ("level", _str),
+    "max_jump_height": ("max_jump_height", _int),
+    "temperament": ("temperament", _list),
+    "coat_colors": ("coat_colors", _list),
+    "comfort_flags": ("comfort_flags", _dict),
+    "activity_mode": ("activity_mode", _str),
+    # Verwachtingen
+    "required_tasks": ("required_tasks", _list),
+    "optional_tasks": ("optional_tasks", _list),
+    "task_frequency": ("task_frequency", _str),
+    "required_skills": ("required_skills", _list),
+    "desired_rider_personality": ("desired_rider_personality", _list),
+    "rules": ("rules", _dict),
+    "no_gos": ("no_gos", _list),
+    # Beschikbaarheid / kosten
+    "available_days": ("available_days", _dict),
+    "min_days_per_week": ("min_days_per_week", _int),
+    "session_duration_min": ("session_duration_min", _int),
+    "session_duration_max": ("session_duration_max", _int),
+    "cost_model": ("cost_model", _str),
+    "cost_amount": ("cost_amount", _int),
+    "status": ("status", _status),
+    "is_available": ("status", _published),
+    # Staladres
+    "stable_country_code": ("stable_country_code", _country),
+    "stable_postcode": ("stable_postcode", _str),
+    "stable_house_number": ("stable_house_number", _str),
+    "stable_house_number_addition": ("stable_house_number_addition", _str),
+    "stable_street": ("stable_street", _str),
+    "stable_city": ("stable_city", _str),
+    "stable_lat": ("stable_lat", _float),
+    "stable_lon": ("stable_lon", _float),
+    "stable_geocode_confidence": ("stable_geocode_confidence", _float),
+    "stable_needs_review": ("stable_needs_review", _bool),
+    # Faciliteiten
+    "indoor_arena": ("indoor_arena", _bool),
+    "outdoor_arena": ("outdoor_arena", _bool),
+    "lighting": ("lighting", _bool),
+    "longe_circle": ("longe_circle", _bool),
+    "trail_access": ("trail_access", _bool),
+    "trailer_available": ("trailer_available", _bool),
+    "horse_walker": ("horse_walker", _bool),
+    "toilet_available": ("toilet_available", _bool),
+    "locker_available": ("locker_available", _bool),
+}
+
+# Body van POST /owner/horses en één rij van de bulk import
+class HorsePayload(BaseModel):
+    id: Optional[int] = None  # when provided -> update
+    title: Optional[str] = None
+    description: Optional[str] = None
+    ad_type: Optional[str] = None           # bijrijden/verzorgen/lease
+    ad_types: Optional[list] = None         # multi-select
+    name: Optional[str] = None
+    type: Optional[str] = None           # pony/horse
+    height: Optional[int] = None         # cm
+    age: Optional[int] = None
+    gender: Optional[str] = None
+    breed: Optional[str] = None
+    photos: Optional[list] = None
+    video_intro_url: Optional[str] = None
+    video: Optional[str] = None
+    videos: Optional[list] = None
+    disciplines: Optional[Union[dict, list]] = None   # simple dict or list mapping
+    max_jump_height: Optional[int] = None
+    temperament: Optional[list] = None
+    required_tasks: Optional[list] = None
+    optional_tasks: Optional[list] = None
+    task_frequency: Optional[str] = None
+    available_days: Optional[dict] = None  # same week/dayparts format as riders
+    min_days_per_week: Optional[int] = None
+    session_duration_min: Optional[int] = None
+    session_duration_max: Optional[int] = None
+    cost_model: Optional[str] = None
+    cost_amount: Optional[int] = None
+    coat_colors: Optional[list] = None
+    level: Optional[str] = None
+    comfort_flags: Optional[dict] = None
+    activity_mode: Optional[str] = None
+    required_skills: Optional[list] = None
+    desired_rider_personality: Optional[list] = None
+    rules: Optional[dict] = None
+    no_gos: Optional[list] = None
+    is_available: Optional[bool] = None
+    status: Optional[str] = None         # draft/published (wint van is_available)
+    # New ad meta
+    ad_reason: Optional[str] = None
+    start_date: Optional[str] = None  # ISO yyyy-MM-dd
+    end_date: Optional[str] = None    # ISO yyyy-MM-dd
+    no_end_date: Optional[bool] = None
+    # Stable address (horse location)
+    stable_country_code: Optional[str] = None
+    stable_postcode: Optional[str] = None
+    stable_house_number: Optional[str] = None
+    stable_house_number_addition: Optional[str] = None
+    stable_street: Optional[str] = None
+    stable_city: Optional[str] = None
+    stable_lat: Optional[float] = None
+    stable_lon: Optional[float] = None
+    stable_geocode_confidence: Optional[float] = None
+    stable_needs_review: Optional[bool] = None
+    # Stable facilities
+    indoor_arena: Optional[bool] = None
+    outdoor_arena: Optional[bool] = None
+    longe_circle: Optional[bool] = None
+    horse_walker: Optional[bool] = None
+    toilet_available: Optional[bool] = None
+    locker_available: Optional[bool] = None
+
+
+_PATCH_OPS = ("add", "replace", "remove")
+
+
+def parse_patch(body):
+    """Merge-patch (dict) of JSON Patch (lijst ops) -> {veld: waarde}."""
+    if isinstance(body, dict):
+        return dict(body)
+    if not isinstance(body, list):
+        raise PatchError([{"field": "", "error": "verwacht een object of een JSON Patch lijst"}])
+    changes, errors = {}, []
+    for i, op in enumerate(body):
+        path = op.get("path", "") if isinstance(op, dict) else ""
+        name = path[1:] if path.startswith("/") else ""
+        if not isinstance(op, dict) or op.get("op") not in _PATCH_OPS or not name or "/" in name:
+            errors.append({"field": path or f"[{i}]", "error": "alleen add/replace/remove op een top-level veld"})
+            continue
+        changes[name] = None if op["op"] == "remove" else op.get("value")
+    if errors:
+        raise PatchError(errors)
+    return changes
+
+
+def build_values(changes):
+    """Valideer en vertaal naar kolomwaarden, inclusief afgeleide kolommen."""
+    values, errors = {}, []
+    columns = HorseProfile.__table__.c
+    for key, raw in changes.items():
+        if key not in FIELDS:
+            errors.append({"field": key, "error": "onbekend veld"})
+            continue
+        column, convert = FIELDS[key]
+        try:
+            value = None if raw is None else convert(raw)
+        except ValueError as e:
+            errors.append({"field": key, "error": str(e)})
+            continue
+        if value is None and not columns[column].nullable:
+            errors.append({"field": key, "error": "mag niet leeg zijn"})
+            continue
+        values[column] = value
+    if errors:
+        raise PatchError(errors)
+
+    # status wint van de compat-vlag is_available
+    if "status" in changes and "is_available" in changes and changes["status"] is not None:
+        values["status"] = changes["status"]
+    # Afgeleid (zelfde regels als POST /owner/horses)
+    if "videos" in values and "video" not in values and values["videos"]:
+        values["video"] = values["videos"][0]
+    if values.get("no_end_date"):
+        values["end_date"] = None
+    if "available_days" in values:
+        values["available_mask"] = schedule_to_mask(values["available_days"] or {})
+    return values
+
+
+def patch_horse(db, horse_id, user_id, values, expected_version=None):
+    """Eén UPDATE ... WHERE id AND eigenaar [AND version]; None als er geen rij geraakt is.
+
+    Geeft de RETURNING-rij terug (o.a. `version`, `updated_at`).
+    """
+    tag_attributes = affected_attributes("horse", values)
+    tag_columns = {c for a in tag_attributes for c in TAGGED["horse"][a]}
+    fts_columns = set(SOURCE_COLUMNS) if set(values) & set(SOURCE_COLUMNS) else set()
+    # published_ads hangt ook van updated_at af: altijd de card-bronkolommen terug
+    returning = sorted((tag_columns | fts_columns | set(AD_SOURCE_COLUMNS)) - {"version", "updated_at"})
+
+    owned = select(OwnerProfile.id).where(OwnerProfile.user_id == user_id)
+    criteria = [HorseProfile.id == horse_id, HorseProfile.owner_profile_id.in_(owned)]
+    if expected_version is not None:
+        criteria.append(HorseProfile.version == expected_version)
+    stmt = (
+        update(HorseProfile)
+        .where(*criteria)
+        .values(**values, updated_at=datetime.utcnow(), version=HorseProfile.version + 1)
+        .returning(HorseProfile.version, HorseProfile.updated_at, *[getattr(HorseProfile, c) for c in returning])
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(stmt).mappings().first()
+    if row is None:
+        return None
+
+    connection = db.connection()
+    if tag_attributes:
+        tags = extract_tags("horse", dict(row))
+        sync_tags(connection, "horse", horse_id, {a: tags[a] for a in tag_attributes})
+    if fts_columns:
+        index_horse(connection, horse_id, dict(row))
+    if row["status"] == PUBLISHED or "status" in values:
+        refresh_ad(connection, dict(row))
+    ad_changed(db, {**row, "id": horse_id})
+    return row
@@ -0,0 +1,106 @@
+"""ETag/If-None-Match + kortlevende in-process response cache.
+
+Advertenties veranderen weinig maar worden vaak bekeken. Een handler bepaalt met
+één goedkope query (updated_at, eigenaar) de ETag; bij een match met
+If-None-Match volgt een 304, en anders wordt de gerenderde body uit de cache
+hergebruikt zolang de ETag gelijk is. Pas daarna volgt de volledige load +
+serialisatie.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from responses import FastJSONResponse, dumps
+
+# Privé: de payload hangt af van wie er kijkt (huisnummer alleen voor de eigenaar)
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts):
+    """Weak ETag over de gegeven onderdelen (bv. id, updated_at, rol, velden)."""
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return 'W/"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def _opaque(tag):
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison zoals RFC 9110 voorschrijft voor If-None-Match."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = _opaque(etag)
+    return any(_opaque(t) == wanted for t in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
+
+
+def cached_json(body: bytes, etag: str) -> Response:
+    return Response(content=body, media_type=FastJSONResponse.media_type,
+                    headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+class TTLCache:
+    """Thread-safe LRU met vaste TTL; waarden worden alleen gebruikt bij gelijke ETag."""
+
+    def __init__(self, maxsize=2048, ttl=30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, etag):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != etag or entry[2] < now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, etag, body):
+        with self._lock:
+            self._data[key] = (etag, body, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# (horse_id, is_owner, velden) -> gerenderde detail-body
+ad_detail_cache = TTLCache(maxsize=2048, ttl=30.0)
+
+
+def render_cached(cache, key, etag, build):
+    """Body uit de cache of via `build()` (payload) renderen en opslaan."""
+    body = cache.get(key, etag)
+    if body is None:
+        body = dumps(build())
+        cache.set(key, etag, body)
+    return cached_json(body, etag)
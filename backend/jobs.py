@@ -0,0 +1,337 @@
+"""Achtergrondjobs: duurzame queue (`jobs` tabel) en een worker met thread- en process-pool.
+
+Een job-type is een gewone functie op moduleniveau die een payload (dict)
+krijgt; registreren met `@job` (zie tasks.py):
+
+    @job("kinde_sync", max_attempts=5, backoff=30)
+    def kinde_sync(payload): ...
+
+    @job("image_derivatives", executor="process", concurrency=2)
+    def image_derivatives(payload): ...   # CPU-werk buiten de GIL
+
+In een request: `enqueue(db, "kinde_sync", {...})` vóór de commit, dan gaat de
+job mee in dezelfde transactie als de wijziging waar hij bij hoort.
+
+De worker (`Runner`) claimt klaarstaande jobs met één UPDATE ... RETURNING
+(Postgres: SKIP LOCKED), houdt per type een concurrency-limiet aan en zet een
+mislukte job terug met exponentiële backoff tot `max_attempts`. Jobs van een
+gecrashte worker komen na JOB_LEASE_SECONDS weer vrij.
+
+    python -m jobs [--threads 4] [--processes 2] [--types a,b] [--once] [--metrics-port 9101]
+    python -m jobs --enqueue geocode_backfill --payload '{"limit": 500}'
+
+De API draait standaard een kleine runner in-process voor thread-jobs
+(JOBS_WORKER=inline); met een losse worker zet je JOBS_WORKER=off.
+Metrics: jobs_total, job_duration_seconds, job_wait_seconds en job_queue_depth.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple
+
+from sqlalchemy import func, insert, select, update
+
+from database import SessionLocal
+from metrics import JOB_SECONDS, JOB_WAIT_SECONDS, JOBS_TOTAL, Gauge
+from models import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, Job
+
+log = logging.getLogger("horsesharing.jobs")
+
+POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "900"))
+RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+MAX_BACKOFF_SECONDS = 3600
+RECOVER_EVERY_SECONDS = 60
+
+
+class JobType(NamedTuple):
+    name: str
+    func: Callable
+    executor: str  # thread/process
+    concurrency: int
+    max_attempts: int
+    backoff: float  # seconden voor de eerste retry; verdubbelt per poging
+
+
+REGISTRY = {}
+
+
+def job(name, executor="thread", concurrency=1, max_attempts=3, backoff=10):
+    """Decorator: registreer een functie(payload) als job-type."""
+    if executor not in ("thread", "process"):
+        raise ValueError(f"onbekende executor: {executor}")
+
+    def register(func):
+        REGISTRY[name] = JobType(name, func, executor, concurrency, max_attempts, backoff)
+        return func
+    return register
+
+
+def enqueue(db, job_type, payload=None, delay=0):
+    """Zet een job in de queue (binnen de lopende transactie; de caller commit)."""
+    now = datetime.utcnow()
+    db.execute(insert(Job).values(
+        type=job_type, payload=payload or {}, status=JOB_QUEUED, attempts=0,
+        run_at=now + timedelta(seconds=delay), created_at=now,
+    ))
+
+
+def _queue_depth():
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(Job.type, Job.status, func.count())
+            .where(Job.status.in_((JOB_QUEUED, JOB_RUNNING)))
+            .group_by(Job.type, Job.status)
+        ).all()
+    return {(job_type, status): n for job_type, status, n in rows}
+
+
+JOB_QUEUE_DEPTH = Gauge("job_queue_depth", "Jobs in de queue per type en status", ("type", "status"),
+                        collect=_queue_depth)
+
+
+def backoff_delay(job_type, attempts):
+    """Seconden tot de volgende poging: backoff * 2^(poging-1), ±20% jitter, met plafond."""
+    delay = min(job_type.backoff * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class Runner:
+    """Claimt en draait jobs; `run(stop)` tot `stop` (threading.Event) gezet is."""
+
+    def __init__(self, threads=4, processes=0, types=None, session_factory=SessionLocal):
+        self.types = {n: t for n, t in REGISTRY.items() if types is None or n in types}
+        self.session_factory = session_factory
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.pools = {"thread": ThreadPoolExecutor(threads, thread_name_prefix="job")}
+        self.capacity = {"thread": threads, "process": processes}
+        if processes and any(t.executor == "process" for t in self.types.values()):
+            self.pools["process"] = ProcessPoolExecutor(processes)
+        self.running = {}  # future -> (job_id, type, attempts, started)
+        self._last_recover = 0.0
+
+    # -- claimen --
+
+    def _free_slots(self):
+        busy_types, busy_pools = {}, {}
+        for _, job_type, _, _ in self.running.values():
+            busy_types[job_type] = busy_types.get(job_type, 0) + 1
+            executor = self.types[job_type].executor
+            busy_pools[executor] = busy_pools.get(executor, 0) + 1
+        free_pools = {e: self.capacity[e] - busy_pools.get(e, 0) for e in self.pools}
+        slots = {}
+        for name, jt in self.types.items():
+            free = min(jt.concurrency - busy_types.get(name, 0), free_pools.get(jt.executor, 0))
+            if free > 0:
+                slots[name] = free
+        return slots, free_pools
+
+    def _claim(self, db, job_type, limit):
+        now = datetime.utcnow()
+        ready = (
+            select(Job.id)
+            .where(Job.type == job_type, Job.status == JOB_QUEUED, Job.run_at <= now)
+            .order_by(Job.run_at, Job.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        rows = db.execute(
+            update(Job)
+            .where(Job.id.in_(ready), Job.status == JOB_QUEUED)
+            .values(status=JOB_RUNNING, locked_by=self.worker_id, locked_at=now, attempts=Job.attempts + 1)
+            .returning(Job.id, Job.payload, Job.attempts, Job.run_at)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+        return rows
+
+    def claim_and_submit(self):
+        """Claim per type tot de vrije slots vol zijn; geeft het aantal gestarte jobs terug."""
+        slots, free_pools = self._free_slots()
+        started = 0
+        if not slots:
+            return 0
+        with self.session_factory() as db:
+            for name, free in slots.items():
+                executor = self.types[name].executor
+                free = min(free, free_pools[executor])
+                if free <= 0:
+                    continue
+                for job_id, payload, attempts, run_at in self._claim(db, name, free):
+                    JOB_WAIT_SECONDS.observe((name,), max(0.0, (datetime.utcnow() - run_at).total_seconds()))
+                    future = self.pools[executor].submit(self.types[name].func, payload or {})
+                    self.running[future] = (job_id, name, attempts, time.perf_counter())
+                    free_pools[executor] -= 1
+                    started += 1
+        return started
+
+    # -- afronden --
+
+    def collect(self, timeout):
+        """Wacht max `timeout` seconden op lopende jobs en verwerk wat klaar is."""
+        if not self.running:
+            return 0
+        done, _ = wait(list(self.running), timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            return 0
+        with self.session_factory() as db:
+            for future in done:
+                self._finish(db, future)
+            db.commit()
+        return len(done)
+
+    def _finish(self, db, future):
+        job_id, name, attempts, started = self.running.pop(future)
+        elapsed = time.perf_counter() - started
+        JOB_SECONDS.observe((name,), elapsed)
+        error = future.exception()
+        now = datetime.utcnow()
+        if error is None:
+            values, outcome = {"status": JOB_DONE, "finished_at": now, "last_error": None}, "done"
+        elif attempts < self.types[name].max_attempts:
+            delay = backoff_delay(self.types[name], attempts)
+            values = {"status": JOB_QUEUED, "run_at": now + timedelta(seconds=delay), "last_error": repr(error)[:2000]}
+            outcome = "retry"
+            log.warning("job failed, retrying", extra={"job_id": job_id, "job_type": name, "attempts": attempts,
+                                                        "retry_in": round(delay, 1), "error": repr(error)})
+        else:
+            values, outcome = {"status": JOB_FAILED, "finished_at": now, "last_error": repr(error)[:2000]}, "failed"
+            log.error("job failed permanently", extra={"job_id": job_id, "job_type": name, "attempts": attempts,
+                                                       "error": repr(error)})
+        JOBS_TOTAL.inc((name, outcome))
+        db.execute(update(Job).where(Job.id == job_id).values(locked_by=None, locked_at=None, **values))
+
+    # -- onderhoud --
+
+    def recover(self):
+        """Jobs van gecrashte workers (lease verlopen) terug in de queue; oude afgeronde jobs opruimen."""
+        now = datetime.utcnow()
+        with self.session_factory() as db:
+            stale = db.execute(
+                update(Job)
+                .where(Job.status == JOB_RUNNING, Job.locked_at < now - timedelta(seconds=LEASE_SECONDS))
+                .values(status=JOB_QUEUED, locked_by=None, locked_at=None, run_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            pruned = db.execute(
+                Job.__table__.delete().where(
+                    Job.status.in_((JOB_DONE, JOB_FAILED)), Job.finished_at < now - timedelta(days=RETENTION_DAYS)
+                )
+            ).rowcount
+            db.commit()
+        if stale or pruned:
+            log.info("jobs recovered", extra={"stale": stale, "pruned": pruned})
+        self._last_recover = time.monotonic()
+
+    def run(self, stop, once=False):
+        """Hoofdlus; met `once` stoppen zodra er niets meer klaarstaat en alles af is."""
+        try:
+            while not stop.is_set():
+                if time.monotonic() - self._last_recover > RECOVER_EVERY_SECONDS:
+                    self.recover()
+                try:
+                    started = self.claim_and_submit()
+                except Exception:
+                    log.exception("job claim failed")
+                    started = 0
+                if once and not started and not self.running:
+                    break
+                if self.running:
+                    self.collect(0 if started else POLL_SECONDS)
+                elif not started:
+                    stop.wait(POLL_SECONDS)
+            # Netjes stoppen: lopende jobs afmaken, niets nieuws claimen
+            while self.running:
+                self.collect(None)
+        finally:
+            for pool in self.pools.values():
+                pool.shutdown(wait=True)
+
+
+def start_inline(threads=2):
+    """Runner voor thread-jobs in een achtergrondthread van het API-proces; geeft stop() terug."""
+    import tasks  # noqa: F401  (registreert de job-types)
+
+    stop = threading.Event()
+    runner = Runner(threads=threads, processes=0)
+    thread = threading.Thread(target=runner.run, args=(stop,), name="jobs-inline", daemon=True)
+    thread.start()
+
+    def shutdown(timeout=10):
+        stop.set()
+        thread.join(timeout)
+    return shutdown
+
+
+def _serve_metrics(port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    import metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", metrics.CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def main():
+    from applog import setup_logging
+    import tasks  # noqa: F401  (registreert de job-types)
+
+    parser = argparse.ArgumentParser(description="Achtergrondjobs verwerken")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--types", help="alleen deze job-types (komma-gescheiden)")
+    parser.add_argument("--once", action="store_true", help="stoppen zodra de queue leeg is")
+    parser.add_argument("--metrics-port", type=int, help="Prometheus /metrics voor deze worker")
+    parser.add_argument("--enqueue", metavar="TYPE", help="alleen een job klaarzetten (bv. vanuit cron) en stoppen")
+    parser.add_argument("--payload", default="{}", help="JSON payload voor --enqueue")
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.enqueue:
+        if args.enqueue not in REGISTRY:
+            raise SystemExit(f"onbekend job-type: {args.enqueue}")
+        with SessionLocal() as db:
+            enqueue(db, args.enqueue, json.loads(args.payload))
+            db.commit()
+        print(f"{args.enqueue} klaargezet")
+        return
+
+    types = set(args.types.split(",")) if args.types else None
+    unknown = (types or set()) - set(REGISTRY)
+    if unknown:
+        raise SystemExit(f"onbekende job-types: {', '.join(sorted(unknown))}")
+    if args.metrics_port:
+        _serve_metrics(args.metrics_port)
+    runner = Runner(threads=args.threads, processes=args.processes, types=types)
+    stop = threading.Event()
+    log.info("job worker started", extra={"worker": runner.worker_id, "types": sorted(runner.types)})
+    try:
+        runner.run(stop, once=args.once)
+    except KeyboardInterrupt:
+        stop.set()
+
+
+if __name__ == "__main__":
+    # Via de geïmporteerde module, anders registreert tasks.py in een andere REGISTRY dan __main__
+    import jobs
+    jobs.main()
@@ -1,1880 +1,114 @@
-from fastapi import FastAPI, Depends, HTTPException, Request, UploadFile, File, Query
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Optional
+from typing import Optional
 from fastapi.staticfiles import StaticFiles
-import json
 import os
-import requests
-from database import get_db
-from models import User, RiderProfile, OwnerProfile, HorseProfile
-from auth import get_current_user, get_optional_user
-import uvicorn
-import uuid
-import time
-
-# Optional Azure imports
-AZURE_AVAILABLE = False
-try:
-    from azure.storage.blob import BlobServiceClient, ContentSettings
-    AZURE_AVAILABLE = True
-except Exception:
-    AZURE_AVAILABLE = False
-
-app = FastAPI(title="HorseSharing API", version="1.0.0")
-
-# Ensure uploads directory exists and mount static files
-UPLOAD_ROOT = os.path.join(os.path.dirname(__file__), 'uploads')
-os.makedirs(UPLOAD_ROOT, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=UPLOAD_ROOT), name="uploads")
-
-# CORS middleware voor frontend communicatie
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"],  # Vite default port
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/")
+from responses import FastJSONResponse
+from applog import RequestIdMiddleware, setup_logging
+import metrics
+from dbstats import QueryProfileMiddleware, track_requests
+from ratelimit import RateLimitMiddleware
+from moderation import run_worker as run_moderation_worker
+from jobs import start_inline as start_inline_jobs
+import events
+from routers import ROUTERS
+from settings import Settings, get_settings
+from contextlib import asynccontextmanager
+import asyncio
+
+@asynccontextmanager
+async def lifespan(app):
+    """Moderatie-worker en een kleine job-runner (thread-jobs) in het API-proces.
+
+    Met losse workers: MODERATION_WORKER=off en JOBS_WORKER=off (zie moderation.py, jobs.py).
+    Plus de Redis listener voor live events als EVENTS_BACKEND=redis.
+    """
+    settings = app.state.settings
+    stop, task, stop_jobs = asyncio.Event(), None, None
+    if settings.moderation_worker:
+        task = asyncio.create_task(run_moderation_worker(stop))
+    if settings.jobs_worker:
+        stop_jobs = start_inline_jobs()
+    listener = events.start_listener()
+    yield
+    # Streams die er nog zijn beëindigen (uvicorn wacht daar eerst op tot timeout_graceful_shutdown)
+    events.broker.close()
+    if listener:
+        listener.cancel()
+    stop.set()
+    if task:
+        await task
+    if stop_jobs:
+        await asyncio.to_thread(stop_jobs)
+
+# Alleen root/health/metrics; de API zelf staat per domein in routers/
+router = APIRouter()
+
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """API met `settings` (default: `get_settings()`) en alle routers uit routers/.
+
+    Niets hiervan gebeurt bij `import main`: `main.app` / `main:app` bouwt de
+    app pas bij het eerste gebruik (zie `__getattr__` onderaan).
+    """
+    settings = settings or get_settings()
+    setup_logging()
+    # orjson voor alle responses; brede payloads geven FastJSONResponse direct terug
+    app = FastAPI(title="HorseSharing API", version="1.0.0", default_response_class=FastJSONResponse, lifespan=lifespan)
+    app.state.settings = settings
+
+    # Ensure uploads directory exists and mount static files
+    os.makedirs(settings.upload_root, exist_ok=True)
+    app.mount("/uploads", StaticFiles(directory=settings.upload_root), name="uploads")
+
+    # Rate limiting op dure routes (geo lookup, uploads); binnen CORS zodat een 429 CORS-headers krijgt
+    app.add_middleware(RateLimitMiddleware)
+    # CORS middleware voor frontend communicatie
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=list(settings.cors_origins),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Request-ID", "X-DB-Queries", "X-DB-Time", "Retry-After"],
+    )
+    # SQL profiling: slow-query log, budget per request, X-DB-* headers (niet in productie)
+    track_requests()
+    app.add_middleware(QueryProfileMiddleware)
+    # Route metrics (count/latency/DB per request) binnen de request-id laag
+    app.add_middleware(metrics.MetricsMiddleware)
+    # Request-id correlatie + access log (buitenste laag)
+    app.add_middleware(RequestIdMiddleware)
+
+    app.include_router(router)
+    for api_router in ROUTERS:
+        app.include_router(api_router)
+    return app
+
+@router.get("/")
 async def root():
     return {"message": "HorseSharing API is running!"}
 
-@app.get("/health")
+@router.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "horsesharing-api"}
 
-# -----------------------------
-# Geo lookup (PDOK NL + Nominatim fallback)
-# -----------------------------
-_geo_cache = {}
-
-def _geo_cache_get(key: str):
-    item = _geo_cache.get(key)
-    if not item:
-        return None
-    expires, val = item
-    if time.time() > expires:
-        _geo_cache.pop(key, None)
-        return None
-    return val
-
-def _geo_cache_set(key: str, val: dict, ttl: int = 3600):
-    _geo_cache[key] = (time.time() + ttl, val)
-
-@app.get("/geo/lookup")
-async def geo_lookup(
-    country: str = Query("NL", min_length=2, max_length=2),
-    postcode: str = Query(...),
-    number: str = Query(...),
-    addition: str = Query(""),
-):
-    country = (country or "").upper()
-    key = f"{country}:{postcode}:{number}:{addition}"
-    cached = _geo_cache_get(key)
-    if cached:
-        return cached
-
-    # NL via PDOK Locatieserver BAG
-    if country == "NL":
-        try:
-            pc = (postcode or "").replace(" ", "").upper()
-            # Gebruik nieuw PDOK endpoint (oude domein kan DNS-fouten geven)
-            url = (
-                "https://api.pdok.nl/bzk/locatieserver/search/v3_1/free"
-                f"?q=postcode:{pc}+AND+huisnummer:{number}"
-            )
-            r = requests.get(url, timeout=5)
-            r.raise_for_status()
-            data = r.json()
-            docs = data.get("response", {}).get("docs", [])
-            doc = docs[0] if docs else None
-            if doc:
-                street = doc.get("straatnaam", "")
-                city = doc.get("woonplaatsnaam", "")
-                # centroide_ll kan "POINT(lon lat)" of "lon lat" zijn
-                ll = doc.get("centroide_ll") or doc.get("geometrie_ll") or ""
-                lat = lon = None
-                if ll.startswith("POINT(") and ll.endswith(")"):
-                    # POINT(lon lat)
-                    coords = ll[len("POINT("):-1].strip().split(" ")
-                    if len(coords) == 2:
-                        lon = float(coords[0]); lat = float(coords[1])
-                elif " " in ll:
-                    parts = ll.split(" ")
-                    lon = float(parts[0]); lat = float(parts[1])
-                res = {
-                    "street": street,
-                    "city": city,
-                    "postcode": f"{pc[:4]} {pc[4:]}" if len(pc) == 6 else postcode,
-                    "house_number": number,
-                    "addition": addition or None,
-                    "country_code": country,
-                    "lat": lat,
-                    "lon": lon,
-                    "source": "PDOK",
-                    "confidence": 0.95 if street and city else 0.7,
-                }
-                _geo_cache_set(key, res)
-                return res
-        except Exception as e:
-            print(f"PDOK lookup failed: {e}")
-
-    # Fallback: Nominatim (OSM)
-    try:
-        cc = (country or "").lower()
-        base = "https://nominatim.openstreetmap.org/search"
-        # 1) Structured query (beperkt op land en postcode)
-        params = {
-            "format": "json",
-            "addressdetails": 1,
-            "limit": 1,
-            "countrycodes": cc,
-            "postalcode": postcode,
-            "street": f"{number} {addition}".strip(),
-        }
-        resp = requests.get(base, params=params, headers={"User-Agent": "HorseSharing2/1.0"}, timeout=8)
-        resp.raise_for_status()
-        arr = resp.json()
-        if not arr:
-            # 2) Tekst query maar nog steeds met countrycodes
-            q = f"{postcode} {number} {addition}"
-            params2 = {
-                "q": q,
-                "format": "json",
-                "addressdetails": 1,
-                "limit": 1,
-                "countrycodes": cc,
-            }
-            resp = requests.get(base, params=params2, headers={"User-Agent": "HorseSharing2/1.0"}, timeout=8)
-            resp.raise_for_status()
-            arr = resp.json()
-        if arr:
-            it = arr[0]
-            addr = it.get("address", {})
-            # Validatie: land en postcode moeten overeenkomen
-            match_cc = (addr.get("country_code") or cc).upper() == country
-            norm_postcode_req = (postcode or '').replace(' ', '').upper()
-            norm_postcode_res = (addr.get("postcode") or '').replace(' ', '').upper()
-            if not match_cc or (norm_postcode_res and norm_postcode_res != norm_postcode_req):
-                raise HTTPException(status_code=404, detail="Adres niet gevonden (valt buiten land/postcode)")
-            res = {
-                "street": addr.get("road") or addr.get("pedestrian") or "",
-                "city": addr.get("city") or addr.get("town") or addr.get("village") or "",
-                "postcode": addr.get("postcode") or postcode,
-                "house_number": number,
-                "addition": addition or None,
-                "country_code": (addr.get("country_code") or country).upper(),
-                "lat": float(it.get("lat")) if it.get("lat") else None,
-                "lon": float(it.get("lon")) if it.get("lon") else None,
-                "source": "OSM",
-                "confidence": 0.7,
-            }
-            _geo_cache_set(key, res)
-            return res
-    except Exception as e:
-        print(f"OSM lookup failed: {e}")
-
-    raise HTTPException(status_code=404, detail="Adres niet gevonden")
-
-@app.get("/auth/me")
-async def get_me(request: Request, current_user: User = Depends(get_current_user)):
-    """Get current authenticated user info"""
-    # Probeer Kinde claims op te halen voor leading weergave
-    kinde_claims = {}
-    try:
-        auth_header = request.headers.get("authorization") or request.headers.get("Authorization")
-        if auth_header and auth_header.lower().startswith("bearer "):
-            token = auth_header.split(" ", 1)[1]
-            # Lazy import to avoid circular
-            from auth import verify_kinde_token
-            kinde_claims = verify_kinde_token(token) or {}
-    except Exception:
-        kinde_claims = {}
-
-    # Haal mogelijke naamvelden uit claims
-    given = (kinde_claims.get("given_name") or kinde_claims.get("first_name") or "").strip()
-    family = (kinde_claims.get("family_name") or kinde_claims.get("last_name") or "").strip()
-    full_claim_name = (given + (" " + family if family else "")).strip() or (kinde_claims.get("name") or "").strip()
-
-    return {
-        "id": current_user.id,
-        "kinde_id": current_user.kinde_id,
-        "email": current_user.email,
-        "name": current_user.name,
-        "phone": current_user.phone,
-        "owner_photo_url": (current_user.owner_profile.photo_url if current_user.owner_profile else None),
-        # Extra: wat Kinde zelf zegt (leading)
-        "kinde_given_name": given,
-        "kinde_family_name": family,
-        "kinde_full_name": full_claim_name,
-        "onboarding_completed": current_user.onboarding_completed,
-        "profile_type_chosen": current_user.profile_type_chosen,
-        "has_rider_profile": current_user.rider_profile is not None,
-        "has_owner_profile": current_user.owner_profile is not None,
-        "created_at": current_user.created_at
-    }
-
-class SetRolePayload(BaseModel):
-    role: str  # 'rider' or 'owner'
-
-@app.post("/auth/set-role")
-async def set_role(payload: SetRolePayload, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    role = (payload.role or '').strip().lower()
-    if role not in ("rider", "owner"):
-        raise HTTPException(status_code=400, detail="Invalid role")
-
-    if role == "owner":
-        has_owner = db.query(OwnerProfile).filter(OwnerProfile.user_id == current_user.id).first() is not None
-        if not has_owner:
-            raise HTTPException(status_code=400, detail="Owner profile not found")
-    else:
-        has_rider = db.query(RiderProfile).filter(RiderProfile.user_id == current_user.id).first() is not None
-        if not has_rider:
-            raise HTTPException(status_code=400, detail="Rider profile not found")
-
-    current_user.profile_type_chosen = role
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-    # Return same shape as /auth/me
-    return await get_me(Request(scope={"type": "http", "headers": []}), current_user)
-
-class ProfileTypeRequest(BaseModel):
-    profile_type: str
-
-@app.post("/auth/set-profile-type")
-async def set_profile_type(
-    request: ProfileTypeRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Set profile type choice (rider/owner)"""
-    current_user.profile_type_chosen = request.profile_type
-    db.commit()
-    db.refresh(current_user)
-    
-    return {"message": "Profile type set", "profile_type": request.profile_type}
-
-@app.post("/auth/reset-profile")
-async def reset_profile(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Reset user profile - delete rider/owner profiles and reset onboarding"""
-    # Delete rider profile if exists
-    rider_profile = db.query(RiderProfile).filter(RiderProfile.user_id == current_user.id).first()
-    if rider_profile:
-        db.delete(rider_profile)
-    
-    # TODO: Delete owner profile when implemented
-    # owner_profile = db.query(OwnerProfile).filter(OwnerProfile.user_id == current_user.id).first()
-    # if owner_profile:
-    #     db.delete(owner_profile)
-    
-    # Reset user onboarding status
-    current_user.onboarding_completed = False
-    current_user.profile_type_chosen = None
-    
-    db.commit()
-    db.refresh(current_user)
-    
-    return {"message": "Profile reset successfully"}
-
-@app.post("/auth/complete-onboarding")
-async def complete_onboarding(
-    profile_type: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Mark onboarding as completed and set profile type"""
-    current_user.onboarding_completed = True
-    current_user.profile_type_chosen = profile_type
-    db.commit()
-    db.refresh(current_user)
-    
-    return {"message": "Onboarding completed", "profile_type": profile_type}
-
-
-@app.post("/auth/set-published")
-async def set_published(
-    published: bool,
-    profile_type: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Zet publicatiestatus (onboarding_completed) aan/uit. Optioneel profile_type updaten.
-    Dit is een eenvoudige vlag voor zichtbaarheid tot we een aparte is_published veld introduceren.
-    """
-    current_user.onboarding_completed = bool(published)
-    if profile_type:
-        current_user.profile_type_chosen = profile_type
-    db.commit()
-    db.refresh(current_user)
-    return {"message": "Published status updated", "published": current_user.onboarding_completed,
-            "profile_type": current_user.profile_type_chosen}
-
-# Pydantic models voor request/response
-class RiderProfileCreate(BaseModel):
-    # Basis informatie - allemaal optioneel voor tussentijds opslaan
-    first_name: Optional[str] = None
-    last_name: Optional[str] = None
-    phone: Optional[str] = None
-    date_of_birth: Optional[str] = None
-    postcode: Optional[str] = None
-    house_number: Optional[str] = None
-    house_number_addition: Optional[str] = None
-    street: Optional[str] = None
-    city: Optional[str] = None
-    country_code: Optional[str] = None
-    lat: Optional[float] = None
-    lon: Optional[float] = None
-    geocode_confidence: Optional[float] = None
-    needs_review: Optional[bool] = None
-    max_travel_distance_km: Optional[int] = 25
-    transport_options: List[str] = []
-    
-    # Beschikbaarheid
-    available_days: List[str] = []
-    available_time_blocks: List[str] = []
-    available_schedule: Optional[dict] = None  # nieuw: { 'maandag': ['ochtend','avond'], ... }
-    session_duration_min: Optional[int] = 60
-    session_duration_max: Optional[int] = 120
-    start_date: Optional[str] = None
-    arrangement_duration: Optional[str] = 'ongoing'
-    
-    # Budget
-    budget_min_euro: Optional[int] = None
-    budget_max_euro: Optional[int] = None
-    budget_type: Optional[str] = 'monthly'
-    
-    # Ervaring
-    experience_years: Optional[int] = None
-    certification_level: Optional[str] = None  # legacy, kept for compatibility
-    certifications: List[str] = []  # new multi-select
-    comfort_levels: dict = {}
-    riding_styles: List[str] = []  # new: styles & tack experience
-    
-    # Doelen
-    riding_goals: List[str] = []
-    discipline_preferences: List[str] = []
-    personality_style: List[str] = []
-    # Activiteiten
-    activity_mode: Optional[str] = None  # care_only | ride_or_care | ride_only
-    activity_preferences: List[str] = []
-    mennen_experience: Optional[str] = None
-    
-    # Taken
-    willing_tasks: List[str] = []
-    task_frequency: Optional[str] = None
-    
-    # Voorkeuren
-    material_preferences: dict = {}
-    health_restrictions: List[str] = []
-    insurance_coverage: bool = False
-    no_gos: List[str] = []
-    
-    # Media
-    photos: List[str] = []
-    video_intro_url: Optional[str] = None
-
-# ---------------- Owner & Horses -----------------
-
-class OwnerProfilePayload(BaseModel):
-    # User fields (sync with Kinde like rider)
-    first_name: Optional[str] = None
-    last_name: Optional[str] = None
-    phone: Optional[str] = None
-    # Owner profile fields
-    postcode: Optional[str] = None
-    visible_radius: Optional[int] = None
-    house_number: Optional[str] = None
-    house_number_addition: Optional[str] = None
-    street: Optional[str] = None
-    city: Optional[str] = None
-    country_code: Optional[str] = None
-    lat: Optional[float] = None
-    lon: Optional[float] = None
-    geocode_confidence: Optional[float] = None
-    needs_review: Optional[bool] = None
-    date_of_birth: Optional[str] = None # optional, if we later want to compute age
-    # Guardian consent (if under 18)
-    parent_consent: Optional[bool] = None
-    parent_name: Optional[str] = None
-    parent_email: Optional[str] = None
-    # Profile photo
-    photo_url: Optional[str] = None
-
-class HorsePayload(BaseModel):
-    id: Optional[int] = None  # when provided -> update
-    title: Optional[str] = None
-    description: Optional[str] = None
-    ad_type: Optional[str] = None           # bijrijden/verzorgen/lease
-    ad_types: Optional[list] = None         # multi-select
-    name: Optional[str] = None
-    type: Optional[str] = None           # pony/horse
-    height: Optional[int] = None         # cm
-    age: Optional[int] = None
-    gender: Optional[str] = None
-    breed: Optional[str] = None
-    photos: Optional[list] = None
-    video_intro_url: Optional[str] = None
-    video: Optional[str] = None
-    videos: Optional[list] = None
-    disciplines: Optional[dict] = None   # simple dict or list mapping
-    max_jump_height: Optional[int] = None
-    temperament: Optional[list] = None
-    required_tasks: Optional[list] = None
-    optional_tasks: Optional[list] = None
-    task_frequency: Optional[str] = None
-    available_days: Optional[dict] = None  # same week/dayparts format as riders
-    min_days_per_week: Optional[int] = None
-    session_duration_min: Optional[int] = None
-    session_duration_max: Optional[int] = None
-    cost_model: Optional[str] = None
-    cost_amount: Optional[int] = None
-    coat_colors: Optional[list] = None
-    level: Optional[str] = None
-    comfort_flags: Optional[dict] = None
-    activity_mode: Optional[str] = None
-    required_skills: Optional[list] = None
-    desired_rider_personality: Optional[list] = None
-    rules: Optional[dict] = None
-    no_gos: Optional[list] = None
-    is_available: Optional[bool] = None
-    # New ad meta
-    ad_reason: Optional[str] = None
-    start_date: Optional[str] = None  # ISO yyyy-MM-dd
-    end_date: Optional[str] = None    # ISO yyyy-MM-dd
-    no_end_date: Optional[bool] = None
-    # Stable address (horse location)
-    stable_country_code: Optional[str] = None
-    stable_postcode: Optional[str] = None
-    stable_house_number: Optional[str] = None
-    stable_house_number_addition: Optional[str] = None
-    stable_street: Optional[str] = None
-    stable_city: Optional[str] = None
-    stable_lat: Optional[float] = None
-    stable_lon: Optional[float] = None
-    stable_geocode_confidence: Optional[float] = None
-    stable_needs_review: Optional[bool] = None
-    # Stable facilities
-    indoor_arena: Optional[bool] = None
-    outdoor_arena: Optional[bool] = None
-    longe_circle: Optional[bool] = None
-    horse_walker: Optional[bool] = None
-    toilet_available: Optional[bool] = None
-    locker_available: Optional[bool] = None
-
-@app.get("/owner-profile")
-async def get_owner_profile(
-    request: Request,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    # Try to get latest Kinde claims for immediate reflection
-    kinde_claims = {}
-    try:
-        auth_header = request.headers.get("authorization") or request.headers.get("Authorization")
-        if auth_header and auth_header.lower().startswith("bearer "):
-            token = auth_header.split(" ", 1)[1]
-            from auth import verify_kinde_token
-            kinde_claims = verify_kinde_token(token) or {}
-    except Exception:
-        kinde_claims = {}
-
-    # Extract possible latest name/phone from claims
-    given = (kinde_claims.get("given_name") or kinde_claims.get("first_name") or "").strip()
-    family = (kinde_claims.get("family_name") or kinde_claims.get("last_name") or "").strip()
-    full_claim_name = (given + (" " + family if family else "")).strip() or (kinde_claims.get("name") or "").strip()
-    claim_phone = (kinde_claims.get("phone_number") or "").strip()
-
-    # Best-effort: sync local user record if claims provide fresher values
-    updated = False
-    if full_claim_name and (current_user.name or "").strip() != full_claim_name:
-        current_user.name = full_claim_name
-        updated = True
-    if claim_phone and (current_user.phone or "").strip() != claim_phone:
-        current_user.phone = claim_phone
-        updated = True
-    if updated:
-        db.add(current_user)
-        db.commit()
-        db.refresh(current_user)
-
-    owner = db.query(OwnerProfile).filter(OwnerProfile.user_id == current_user.id).first()
-    if not owner:
-        return {
-            "exists": False,
-            "user": {
-                "name": full_claim_name or current_user.name,
-                "email": current_user.email,
-                "phone": claim_phone or current_user.phone,
-                "kinde_given_name": given,
-                "kinde_family_name": family,
-            },
-            "profile": {}
-        }
-    # Compute age and minor flag for convenience
-    computed_age = None
-    computed_is_minor = None
-    try:
-        if owner.date_of_birth:
-            from datetime import date as _date
-            dob = owner.date_of_birth
-            today = _date.today()
-            computed_age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-            computed_is_minor = (computed_age is not None) and (computed_age < 18)
-    except Exception:
-        computed_age = None
-        computed_is_minor = None
-
-    return {
-        "exists": True,
-        "user": {
-            "name": full_claim_name or current_user.name,
-            "email": current_user.email,
-            "phone": claim_phone or current_user.phone,
-            "kinde_given_name": given,
-            "kinde_family_name": family,
-        },
-        "profile": {
-            "postcode": owner.postcode,
-            "house_number": owner.house_number,
-            "house_number_addition": owner.house_number_addition,
-            "street": owner.street,
-            "city": owner.city,
-            "country_code": owner.country_code,
-            "lat": owner.lat,
-            "lon": owner.lon,
-            "geocode_confidence": owner.geocode_confidence,
-            "needs_review": owner.needs_review,
-            "visible_radius": owner.visible_radius,
-            "available_days": owner.available_days or {},
-            "duration": owner.duration,
-            "date_of_birth": owner.date_of_birth.isoformat() if owner.date_of_birth else None,
-            "age": computed_age,
-            "is_minor": computed_is_minor,
-            "parent_consent": owner.parent_consent,
-            "parent_name": owner.parent_name,
-            "parent_email": owner.parent_email,
-            "photo_url": owner.photo_url,
-        }
-    }
-
-@app.post("/owner-profile")
-async def create_or_update_owner_profile(
-    payload: OwnerProfilePayload,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    owner = db.query(OwnerProfile).filter(OwnerProfile.user_id == current_user.id).first()
-    if not owner:
-        owner = OwnerProfile(
-            user_id=current_user.id,
-            postcode=payload.postcode or "",
-            visible_radius=(payload.visible_radius if payload.visible_radius is not None else 10),
-            available_days={},
-            duration=None,
-        )
-        db.add(owner)
-    else:
-        # payload-gedreven updates
-        if payload.postcode is not None:
-            owner.postcode = payload.postcode
-        if payload.visible_radius is not None:
-            try:
-                owner.visible_radius = int(payload.visible_radius)
-            except Exception:
-                pass
-    # New fields now supported
-    if hasattr(payload, 'house_number') and payload.house_number is not None:
-        owner.house_number = payload.house_number
-    if hasattr(payload, 'house_number_addition') and payload.house_number_addition is not None:
-        owner.house_number_addition = payload.house_number_addition
-    if hasattr(payload, 'street') and payload.street is not None:
-        owner.street = payload.street
-    if hasattr(payload, 'city') and payload.city is not None:
-        owner.city = payload.city
-    if hasattr(payload, 'country_code') and payload.country_code is not None:
-        owner.country_code = (payload.country_code or '').upper()[:2]
-    if hasattr(payload, 'lat') and payload.lat is not None:
-        owner.lat = float(payload.lat)
-    if hasattr(payload, 'lon') and payload.lon is not None:
-        owner.lon = float(payload.lon)
-    if hasattr(payload, 'geocode_confidence') and payload.geocode_confidence is not None:
-        owner.geocode_confidence = float(payload.geocode_confidence)
-    if hasattr(payload, 'needs_review') and payload.needs_review is not None:
-        owner.needs_review = bool(payload.needs_review)
-    # photo_url: ook leegmaken toestaan (null vanuit frontend)
-    try:
-        if 'photo_url' in getattr(payload, '__fields_set__', set()):
-            owner.photo_url = payload.photo_url or None
-    except Exception:
-        if hasattr(payload, 'photo_url'):
-            owner.photo_url = payload.photo_url or None
-    # Enforce required date_of_birth
-    if payload.date_of_birth is None or str(payload.date_of_birth).strip() == "":
-        raise HTTPException(status_code=422, detail="Geboortedatum is verplicht")
-    if hasattr(payload, 'date_of_birth') and payload.date_of_birth is not None:
-        try:
-            # Accept YYYY-MM-DD
-            from datetime import datetime
-            owner.date_of_birth = datetime.strptime(payload.date_of_birth, "%Y-%m-%d").date()
-        except Exception:
-            pass
-
-    # Basic validation
-    # Phone: allow +, digits, spaces and hyphens; require at least 10 digits
-    if payload.phone is not None:
-        import re
-        digits = re.sub(r"\D", "", payload.phone)
-        if len(digits) < 10:
-            raise HTTPException(status_code=422, detail="Telefoonnummer ongeldig (minimaal 10 cijfers)")
-
-    # Date of birth -> set and compute minor flag
-    is_minor = False
-    if hasattr(payload, 'date_of_birth') and payload.date_of_birth is not None:
-        try:
-            from datetime import datetime, date
-            try:
-                dob = datetime.strptime(payload.date_of_birth, "%Y-%m-%d").date()
-            except ValueError:
-                dob = datetime.strptime(payload.date_of_birth, "%d-%m-%Y").date()
-            owner.date_of_birth = dob
-            today = date.today()
-            age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-            is_minor = age < 18
-        except Exception:
-            pass
-
-    # Guardian consent: required if minor
-    if is_minor:
-        if not payload.parent_consent or not (payload.parent_name or '').strip() or not (payload.parent_email or '').strip():
-            raise HTTPException(status_code=422, detail="Ouder/voogd toestemming vereist voor minderjarige (naam en e-mail verplicht)")
-        # basic email check
-        import re
-        if not re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", payload.parent_email.strip()):
-            raise HTTPException(status_code=422, detail="E-mailadres ouder/voogd ongeldig")
-        owner.parent_consent = True
-        owner.parent_name = payload.parent_name.strip()
-        owner.parent_email = payload.parent_email.strip()
-        from datetime import datetime as _dt
-        owner.parent_consent_timestamp = _dt.utcnow()
-
-    # Update User fields (name/phone) and sync to Kinde like rider flow
-    name_updated = False
-    if (payload.first_name or payload.last_name):
-        parts = []
-        if payload.first_name: parts.append(payload.first_name)
-        if payload.last_name: parts.append(payload.last_name)
-        new_name = " ".join(parts).strip()
-        if new_name:
-            current_user.name = new_name
-            name_updated = True
-    if payload.phone is not None:
-        current_user.phone = payload.phone
-
-    # Best-effort Kinde Management API sync
-    try:
-        m2m_client_id = os.getenv("KINDE_M2M_CLIENT_ID")
-        m2m_client_secret = os.getenv("KINDE_M2M_CLIENT_SECRET")
-        kinde_domain = os.getenv("KINDE_DOMAIN")
-        kinde_audience = os.getenv("KINDE_AUDIENCE")
-        kinde_scope = os.getenv("KINDE_M2M_SCOPE")
-        if m2m_client_id and m2m_client_secret and kinde_domain:
-            token_resp = requests.post(
-                f"{kinde_domain}/oauth2/token",
-                data={
-                    "grant_type": "client_credentials",
-                    "client_id": m2m_client_id,
-                    "client_secret": m2m_client_secret,
-                    **({"audience": kinde_audience} if kinde_audience else {}),
-                    **({"scope": kinde_scope} if kinde_scope else {}),
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-                timeout=10,
-            )
-            if token_resp.ok:
-                access_token = token_resp.json().get("access_token")
-                base_endpoint = f"{kinde_domain}/api/v1/user"
-                # sync name
-                if name_updated and current_user.name:
-                    parts = current_user.name.strip().split(" ", 1)
-                    given = parts[0] if parts else ""
-                    family = parts[1] if len(parts) > 1 else ""
-                    requests.patch(
-                        base_endpoint,
-                        json={
-                            "first_name": given,
-                            "last_name": family,
-                            "given_name": given,
-                            "family_name": family,
-                            "name": current_user.name,
-                        },
-                        params={"id": current_user.kinde_id},
-                        headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
-                        timeout=10,
-                    )
-                # sync phone
-                if payload.phone is not None:
-                    requests.patch(
-                        base_endpoint,
-                        json={"phone_number": current_user.phone},
-                        params={"id": current_user.kinde_id},
-                        headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
-                        timeout=10,
-                    )
-    except Exception:
-        pass
-
-    db.commit()
-    db.refresh(owner)
-    return {"message": "Owner profile saved", "owner_profile_id": owner.id}
-
-@app.get("/owner/horses")
-async def list_owner_horses(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    owner = db.query(OwnerProfile).filter(OwnerProfile.user_id == current_user.id).first()
-    if not owner:
-        return {"horses": []}
-    horses = db.query(HorseProfile).filter(HorseProfile.owner_profile_id == owner.id).all()
-    return {
-        "horses": [
-            {
-                "id": h.id,
-                "title": h.title,
-                "description": h.description,
-                "ad_type": h.ad_type,
-                "ad_types": h.ad_types or [],
-                "name": h.name,
-                "type": h.type,
-                "height": h.height,
-                "age": h.age,
-                "gender": h.gender,
-                "breed": h.breed,
-                "photos": h.photos or [],
-                "video": h.video,
-                "video_intro_url": h.video,  # compat
-                "videos": (h.videos if h.videos is not None else ([h.video] if h.video else [])),
-                "disciplines": h.disciplines or {},
-                "max_jump_height": h.max_jump_height,
-                "level": h.level,
-                "coat_colors": h.coat_colors or [],
-                "temperament": h.temperament or [],
-                "required_tasks": h.required_tasks or [],
-                "optional_tasks": h.optional_tasks or [],
-                "task_frequency": h.task_frequency,
-                "available_days": h.available_days or {},
-                "min_days_per_week": h.min_days_per_week,
-                "session_duration_min": h.session_duration_min,
-                "session_duration_max": h.session_duration_max,
-                "comfort_flags": h.comfort_flags or {},
-                "activity_mode": h.activity_mode,
-                "cost_model": h.cost_model,
-                "cost_amount": h.cost_amount,
-                "rules": h.rules or {},
-                "no_gos": (json.loads(h.no_gos) if isinstance(h.no_gos, str) and h.no_gos else []),
-                "is_available": h.is_available,
-                # Stable address
-                "stable_country_code": h.stable_country_code,
-                "stable_postcode": h.stable_postcode,
-                "stable_house_number": h.stable_house_number,
-                "stable_house_number_addition": h.stable_house_number_addition,
-                "stable_street": h.stable_street,
-                "stable_city": h.stable_city,
-                "stable_lat": h.stable_lat,
-                "stable_lon": h.stable_lon,
-                "stable_geocode_confidence": h.stable_geocode_confidence,
-                "stable_needs_review": h.stable_needs_review,
-                # Stable facilities
-                "indoor_arena": h.indoor_arena,
-                "outdoor_arena": h.outdoor_arena,
-                "longe_circle": h.longe_circle,
-                "horse_walker": h.horse_walker,
-                "toilet_available": h.toilet_available,
-                "locker_available": h.locker_available,
-                # Ad meta
-                "ad_reason": h.ad_reason,
-                "start_date": (h.start_date.isoformat() if h.start_date else None),
-                "end_date": (h.end_date.isoformat() if h.end_date else None),
-                "no_end_date": bool(h.no_end_date),
-            } for h in horses
-        ]
-    }
-
-@app.get("/ads/{horse_id}")
-async def get_ad_detail(
-    horse_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Public-ish ad read: visible if published, or always for the owner."""
-    # Find horse by id
-    h = db.query(HorseProfile).filter(HorseProfile.id == horse_id).first()
-    if not h:
-        raise HTTPException(status_code=404, detail="Ad not found")
-
-    # Determine if current user is owner
-    is_owner = False
-    try:
-        if h.owner_profile and h.owner_profile.user_id == current_user.id:
-            is_owner = True
-    except Exception:
-        is_owner = False
-
-    # Gate: must be available unless owner
-    if not is_owner and not bool(h.is_available):
-        raise HTTPException(status_code=403, detail="Ad not available")
-
-    # Shape like list_owner_horses item
-    item = {
-        "id": h.id,
-        "title": h.title,
-        "description": h.description,
-        "ad_type": h.ad_type,
-        "ad_types": h.ad_types or [],
-        "name": h.name,
-        "type": h.type,
-        "height": h.height,
-        "age": h.age,
-        "gender": h.gender,
-        "breed": h.breed,
-        "photos": h.photos or [],
-        "video": h.video,
-        "video_intro_url": h.video,  # compat
-        "videos": (h.videos if h.videos is not None else ([h.video] if h.video else [])),
-        "disciplines": h.disciplines or {},
-        "max_jump_height": h.max_jump_height,
-        "level": h.level,
-        "coat_colors": h.coat_colors or [],
-        "temperament": h.temperament or [],
-        "required_tasks": h.required_tasks or [],
-        "optional_tasks": h.optional_tasks or [],
-        "task_frequency": h.task_frequency,
-        "available_days": h.available_days or {},
-        "min_days_per_week": h.min_days_per_week,
-        "session_duration_min": h.session_duration_min,
-        "session_duration_max": h.session_duration_max,
-        "comfort_flags": h.comfort_flags or {},
-        "activity_mode": h.activity_mode,
-        "cost_model": h.cost_model,
-        "cost_amount": h.cost_amount,
-        "rules": h.rules or {},
-        "no_gos": (json.loads(h.no_gos) if isinstance(h.no_gos, str) and h.no_gos else []),
-        "is_available": h.is_available,
-        # Ad meta
-        "ad_reason": h.ad_reason,
-        "start_date": (h.start_date.isoformat() if h.start_date else None),
-        "end_date": (h.end_date.isoformat() if h.end_date else None),
-        "no_end_date": bool(h.no_end_date),
-        # Stable address
-        "stable_country_code": h.stable_country_code,
-        "stable_postcode": h.stable_postcode,
-        "stable_house_number": h.stable_house_number if is_owner else None,  # privacy
-        "stable_house_number_addition": h.stable_house_number_addition if is_owner else None,
-        "stable_street": h.stable_street,
-        "stable_city": h.stable_city,
-        "stable_lat": h.stable_lat,
-        "stable_lon": h.stable_lon,
-        "stable_geocode_confidence": h.stable_geocode_confidence,
-        "stable_needs_review": h.stable_needs_review,
-        # Facilities
-        "indoor_arena": h.indoor_arena,
-        "outdoor_arena": h.outdoor_arena,
-        "longe_circle": h.longe_circle,
-        "horse_walker": h.horse_walker,
-        "toilet_available": h.toilet_available,
-        "locker_available": h.locker_available,
-    }
-    return item
-
-@app.post("/media/upload")
-async def upload_media(
-    request: Request,
-    files: List[UploadFile] = File(...),
-    current_user: User = Depends(get_current_user),
-):
-    """Uploads images either to Azure Blob Storage (if configured) or locally (/uploads)."""
-    allowed_ext = [".jpg", ".jpeg", ".png", ".webp", ".mp4", ".mov", ".webm"]
-    use_azure = os.getenv("AZURE_STORAGE_CONNECTION_STRING") and os.getenv("AZURE_CONTAINER") and AZURE_AVAILABLE
-    try:
-        # Debug: log incoming request details
-        print(f"[upload_media] user_id={current_user.id} email={current_user.email}")
-        print(f"[upload_media] azure_enabled={bool(use_azure)}")
-        print(f"[upload_media] received_files_count={len(files) if files else 0}")
-        for idx, f in enumerate(files or []):
-            try:
-                name = f.filename or "(no-name)"
-                ext = os.path.splitext(name)[1].lower()
-                print(f"[upload_media] file[{idx}] name={name} ext={ext} content_type={getattr(f, 'content_type', None)}")
-            except Exception as _e:
-                print(f"[upload_media] file[{idx}] meta read error: {_e}")
-    except Exception as e:
-        print(f"[upload_media] pre-log error: {e}")
-
-    urls: List[str] = []
-    if use_azure:
-        try:
-            conn_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
-            container = os.getenv("AZURE_CONTAINER")
-            public_base = os.getenv("AZURE_PUBLIC_BASE_URL")  # e.g. https://<account>.blob.core.windows.net/<container>
-            bsc = BlobServiceClient.from_connection_string(conn_str)
-            container_client = bsc.get_container_client(container)
-            for f in files:
-                filename = f.filename or "upload"
-                ext = os.path.splitext(filename)[1].lower()
-                if ext not in allowed_ext:
-                    print(f"[upload_media] skip disallowed ext (azure) name={filename} ext={ext}")
-                    continue
-                blob_name = f"{uuid.uuid4().hex}{ext}"
-                blob_client = container_client.get_blob_client(blob_name)
-                data = await f.read()
-                print(f"[upload_media] azure upload name={filename} -> blob={blob_name} size={len(data)}")
-                # Determine proper content type
-                if ext == ".mp4":
-                    content_type = "video/mp4"
-                elif ext == ".mov":
-                    content_type = "video/quicktime"
-                elif ext == ".webm":
-                    content_type = "video/webm"
-                elif ext == ".png":
-                    content_type = "image/png"
-                elif ext == ".webp":
-                    content_type = "image/webp"
-                else:
-                    content_type = "image/jpeg"
-                blob_client.upload_blob(data, overwrite=True, content_settings=ContentSettings(content_type=content_type))
-                if public_base:
-                    urls.append(f"{public_base.rstrip('/')}/{blob_name}")
-                else:
-                    # Default Azure URL format
-                    account = bsc.account_name
-                    urls.append(f"https://{account}.blob.core.windows.net/{container}/{blob_name}")
-            return {"urls": urls}
-        except Exception as e:
-            # Fallback to local if Azure fails
-            print(f"Azure upload failed, falling back to local: {e}")
-
-    # Local fallback
-    saved_files: List[str] = []
-    for f in files:
-        filename = f.filename or "upload"
-        ext = os.path.splitext(filename)[1].lower()
-        if ext not in allowed_ext:
-            print(f"[upload_media] skip disallowed ext (local) name={filename} ext={ext}")
-            continue
-        unique = f"{uuid.uuid4().hex}{ext}"
-        dest_path = os.path.join(UPLOAD_ROOT, unique)
-        data = await f.read()
-        print(f"[upload_media] local save name={filename} -> {dest_path} size={len(data)}")
-        with open(dest_path, "wb") as out:
-            out.write(data)
-        saved_files.append(unique)
-    base = str(request.base_url).rstrip('/')
-    urls = [f"{base}/uploads/{name}" for name in saved_files]
-    return {"urls": urls}
-@app.post("/owner/horses")
-async def create_or_update_horse(
-    payload: HorsePayload,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    owner = db.query(OwnerProfile).filter(OwnerProfile.user_id == current_user.id).first()
-    if not owner:
-        # maak owner profiel minimaal als het nog niet bestaat
-        owner = OwnerProfile(user_id=current_user.id, postcode="", visible_radius=10, available_days={})
-        db.add(owner)
-        db.commit()
-        db.refresh(owner)
-
-    if payload.id:
-        horse = db.query(HorseProfile).filter(HorseProfile.id == payload.id, HorseProfile.owner_profile_id == owner.id).first()
-        if not horse:
-            raise HTTPException(status_code=404, detail="Horse not found")
-    else:
-        # Nieuw paard: standaard als concept (niet gepubliceerd)
-        horse = HorseProfile(owner_profile_id=owner.id, name=payload.name or "", type=payload.type or "pony")
-        horse.is_available = False
-        db.add(horse)
-
-    # payload-gedreven updates
-    if payload.title is not None:
-        horse.title = payload.title
-    if payload.description is not None:
-        horse.description = payload.description
-    if payload.ad_type is not None:
-        horse.ad_type = payload.ad_type
-    if payload.ad_types is not None:
-        horse.ad_types = payload.ad_types
-    if payload.name is not None:
-        horse.name = payload.name
-    if payload.type is not None:
-        horse.type = payload.type
-    if payload.height is not None:
-        try:
-            horse.height = int(payload.height)
-        except Exception:
-            pass
-    if payload.age is not None:
-        try:
-            horse.age = int(payload.age)
-        except Exception:
-            pass
-    if payload.gender is not None:
-        horse.gender = payload.gender
-    if payload.breed is not None:
-        horse.breed = payload.breed
-    if payload.disciplines is not None:
-        horse.disciplines = payload.disciplines
-    if payload.level is not None:
-        horse.level = payload.level
-    if payload.max_jump_height is not None:
-        try:
-            horse.max_jump_height = int(payload.max_jump_height)
-        except Exception:
-            pass
-    if payload.coat_colors is not None:
-        horse.coat_colors = payload.coat_colors
-    if payload.temperament is not None:
-        horse.temperament = payload.temperament
-    if payload.photos is not None:
-        horse.photos = payload.photos
-    if payload.videos is not None:
-        # persist array and keep first as legacy field for compatibility
-        horse.videos = payload.videos
-        if isinstance(payload.videos, list) and payload.videos:
-            horse.video = payload.videos[0]
-    if payload.video_intro_url is not None:
-        horse.video = payload.video_intro_url
-    if payload.video is not None:
-        horse.video = payload.video
-    if payload.required_tasks is not None:
-        horse.required_tasks = payload.required_tasks
-    if payload.optional_tasks is not None:
-        horse.optional_tasks = payload.optional_tasks
-    if payload.task_frequency is not None:
-        horse.task_frequency = payload.task_frequency
-    if payload.available_days is not None and isinstance(payload.available_days, dict):
-        horse.available_days = payload.available_days
-    if payload.min_days_per_week is not None:
-        try:
-            horse.min_days_per_week = int(payload.min_days_per_week)
-        except Exception:
-            pass
-    if payload.session_duration_min is not None:
-        horse.session_duration_min = payload.session_duration_min
-    if payload.session_duration_max is not None:
-        horse.session_duration_max = payload.session_duration_max
-    if payload.cost_model is not None:
-        horse.cost_model = payload.cost_model
-    if payload.cost_amount is not None:
-        try:
-            horse.cost_amount = int(payload.cost_amount)
-        except Exception:
-            pass
-    if payload.comfort_flags is not None:
-        horse.comfort_flags = payload.comfort_flags
-    if payload.activity_mode is not None:
-        horse.activity_mode = payload.activity_mode
-    if payload.required_skills is not None:
-        horse.required_skills = payload.required_skills
-    if payload.desired_rider_personality is not None:
-        horse.desired_rider_personality = payload.desired_rider_personality
-    if payload.rules is not None:
-        horse.rules = payload.rules
-    if payload.no_gos is not None:
-        horse.no_gos = json.dumps(payload.no_gos)
-    if payload.is_available is not None:
-        horse.is_available = bool(payload.is_available)
-    # Stable address
-    if payload.stable_country_code is not None:
-        horse.stable_country_code = (payload.stable_country_code or '').upper()[:2]
-    if payload.stable_postcode is not None:
-        horse.stable_postcode = payload.stable_postcode
-    if payload.stable_house_number is not None:
-        horse.stable_house_number = payload.stable_house_number
-    if payload.stable_house_number_addition is not None:
-        horse.stable_house_number_addition = payload.stable_house_number_addition
-    if payload.stable_street is not None:
-        horse.stable_street = payload.stable_street
-    if payload.stable_city is not None:
-        horse.stable_city = payload.stable_city
-    if payload.stable_lat is not None:
-        try:
-            horse.stable_lat = float(payload.stable_lat)
-        except Exception:
-            pass
-    if payload.stable_lon is not None:
-        try:
-            horse.stable_lon = float(payload.stable_lon)
-        except Exception:
-            pass
-    if payload.stable_geocode_confidence is not None:
-        try:
-            horse.stable_geocode_confidence = float(payload.stable_geocode_confidence)
-        except Exception:
-            pass
-    if payload.stable_needs_review is not None:
-        horse.stable_needs_review = bool(payload.stable_needs_review)
-    # Facilities flags
-    if payload.indoor_arena is not None:
-        horse.indoor_arena = bool(payload.indoor_arena)
-    if payload.outdoor_arena is not None:
-        horse.outdoor_arena = bool(payload.outdoor_arena)
-    if payload.longe_circle is not None:
-        horse.longe_circle = bool(payload.longe_circle)
-    if payload.horse_walker is not None:
-        horse.horse_walker = bool(payload.horse_walker)
-    if payload.toilet_available is not None:
-        horse.toilet_available = bool(payload.toilet_available)
-    if payload.locker_available is not None:
-        horse.locker_available = bool(payload.locker_available)
-    # Ad meta
-    if payload.ad_reason is not None:
-        horse.ad_reason = payload.ad_reason
-    # Dates handling
-    from datetime import datetime
-    if payload.no_end_date is not None:
-        horse.no_end_date = bool(payload.no_end_date)
-        if horse.no_end_date:
-            horse.end_date = None
-    if payload.start_date is not None:
-        try:
-            horse.start_date = datetime.strptime(payload.start_date, "%Y-%m-%d").date()
-        except Exception:
-            horse.start_date = None
-    if payload.end_date is not None and not bool(payload.no_end_date):
-        try:
-            horse.end_date = datetime.strptime(payload.end_date, "%Y-%m-%d").date()
-        except Exception:
-            horse.end_date = None
-
-    db.commit()
-    db.refresh(horse)
-    return {"message": "Horse saved", "horse_id": horse.id}
-
-@app.delete("/owner/horses/{horse_id}")
-async def delete_horse(
-    horse_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    owner = db.query(OwnerProfile).filter(OwnerProfile.user_id == current_user.id).first()
-    if not owner:
-        raise HTTPException(status_code=404, detail="Owner profile not found")
-    horse = db.query(HorseProfile).filter(HorseProfile.id == horse_id, HorseProfile.owner_profile_id == owner.id).first()
-    if not horse:
-        raise HTTPException(status_code=404, detail="Horse not found")
-    db.delete(horse)
-    db.commit()
-    return {"message": "Horse deleted", "horse_id": horse_id}
-# Let only one GET endpoint exist (frontend-shaped response)
-
-@app.post("/rider-profile")
-async def create_or_update_rider_profile(
-    request: Request,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Create or update rider profile"""
-    # Defensief: zorg dat 'payload' altijd bestaat in deze scope
-    payload = {}
-    try:
-        # Lees raw body om te zien wat er wordt verzonden
-        body = await request.body()
-        print(f"Raw request body: {body}")
-        
-        # Parse JSON manually
-        import json
-        raw_data = json.loads(body)
-        print(f"Parsed JSON data: {raw_data}")
-        payload = raw_data if isinstance(raw_data, dict) else {}
-        
-        # Probeer Pydantic model
-        profile_data = RiderProfileCreate(**raw_data)
-        print(f"Pydantic model created successfully: {profile_data.dict()}")
-        
-    except Exception as e:
-        print(f"Error parsing request: {e}")
-        raise HTTPException(status_code=422, detail=f"Validation error: {str(e)}")
-    
-    print(f"Current user: {current_user.id}, {current_user.email}")
-    
-    # Check if rider profile already exists
-    existing_profile = db.query(RiderProfile).filter(RiderProfile.user_id == current_user.id).first()
-    print(f"Existing profile found: {existing_profile is not None}")
-
-    # CREATE path: if no profile yet, create one now (including DOB -> age)
-    if not existing_profile:
-        data = profile_data.dict()
-        # Compose availability dict from arrays or per-day schedule
-        availability_dict = {}
-        if isinstance(data.get('available_schedule'), dict):
-            availability_dict = data.get('available_schedule') or {}
-        else:
-            availability_dict = {d: (data.get('available_time_blocks') or []) for d in (data.get('available_days') or [])}
-
-        new_profile = RiderProfile(
-            user_id=current_user.id,
-            postcode=data.get('postcode', '') or '',
-            house_number=data.get('house_number') or '',
-            house_number_addition=data.get('house_number_addition') or None,
-            street=data.get('street') or None,
-            city=data.get('city') or '',
-            country_code=(data.get('country_code') or None),
-            lat=(float(data.get('lat')) if data.get('lat') is not None else None),
-            lon=(float(data.get('lon')) if data.get('lon') is not None else None),
-            geocode_confidence=(float(data.get('geocode_confidence')) if data.get('geocode_confidence') is not None else None),
-            needs_review=(bool(data.get('needs_review')) if data.get('needs_review') is not None else None),
-            max_travel_distance=data.get('max_travel_distance_km', 25) or 25,
-            transport_options=data.get('transport_options', []) or [],
-            available_days=availability_dict,
-            session_duration_min=data.get('session_duration_min'),
-            session_duration_max=data.get('session_duration_max'),
-            min_days_per_week=data.get('min_days_per_week'),
-            budget_min=data.get('budget_min_euro'),
-            budget_max=data.get('budget_max_euro'),
-            years_experience=data.get('experience_years'),
-            goals=data.get('riding_goals', []) or [],
-            discipline_preferences=data.get('discipline_preferences', []) or [],
-            riding_styles=data.get('riding_styles', []) or [],
-            general_skills=data.get('general_skills', []) or [],
-            lease_preferences=data.get('lease_preferences') or None,
-            personality_style=data.get('personality_style', []) or [],
-            activity_mode=data.get('activity_mode'),
-            activity_preferences=data.get('activity_preferences', []) or [],
-            mennen_experience=data.get('mennen_experience'),
-            willing_tasks=data.get('willing_tasks', []) or [],
-            task_frequency=data.get('task_frequency') or '',
-            photos=data.get('photos', []) or [],
-            video_intro=data.get('video_intro_url') or '',
-            videos=(data.get('videos') or None),
-            has_insurance=bool(data.get('insurance_coverage')),
-            no_gos=json.dumps(data.get('no_gos', [])),
-            health_limitations=json.dumps(data.get('health_restrictions', [])),
-            parent_consent=data.get('parent_consent') if 'parent_consent' in data else None,
-            parent_contact=data.get('parent_contact') if 'parent_contact' in data else None,
-            rider_height_cm=(int(data['rider_height_cm']) if str(data.get('rider_height_cm') or '').strip() != '' else None),
-            rider_weight_kg=(int(data['rider_weight_kg']) if str(data.get('rider_weight_kg') or '').strip() != '' else None),
-            rider_bio=data.get('rider_bio') or None,
-        )
-
-        # Comfort levels mapping
-        comfort = data.get('comfort_levels') or {}
-        if 'traffic' in comfort:
-            new_profile.comfortable_with_traffic = bool(comfort['traffic'])
-        if 'outdoor_solo' in comfort:
-            new_profile.comfortable_solo_outside = bool(comfort['outdoor_solo'])
-        if 'jumping_height' in comfort and comfort['jumping_height'] is not None:
-            try:
-                new_profile.max_jump_height = int(comfort['jumping_height'])
-            except Exception:
-                pass
-        if 'nervous_horses' in comfort:
-            new_profile.comfortable_with_nervous_horses = bool(comfort['nervous_horses'])
-        if 'young_horses' in comfort:
-            new_profile.comfortable_with_young_horses = bool(comfort['young_horses'])
-        if 'stallions' in comfort:
-            new_profile.comfortable_with_stallions = bool(comfort['stallions'])
-
-        # Dedicated comfort flag for trail rides (no coupling to discipline)
-        if 'trail_rides' in comfort:
-            try:
-                new_profile.comfortable_with_trail_rides = bool(comfort['trail_rides'])
-            except Exception:
-                new_profile.comfortable_with_trail_rides = False
-
-        # Desired horse JSON (incl. size_categories) direct opslaan indien meegegeven
-        if isinstance(data.get('desired_horse'), dict):
-            new_profile.desired_horse = data.get('desired_horse')
-
-        # Certifications mapping
-        certifications = data.get('certifications', [])
-        new_profile.certifications = certifications
-
-        # Material preferences mapping
-        material = data.get('material_preferences', {})
-        if 'bitless_ok' in material:
-            new_profile.bitless_ok = bool(material['bitless_ok'])
-        if 'auxiliary_reins' in material and material['auxiliary_reins'] is not None:
-            new_profile.training_aids_ok = bool(material['auxiliary_reins'])
-        if 'spurs' in material and material['spurs'] is not None:
-            new_profile.spurs_ok = bool(material['spurs'])
-
-        # Date of birth -> date + age
-        dob_str = data.get('date_of_birth')
-        if dob_str:
-            try:
-                from datetime import datetime, date
-                try:
-                    dob = datetime.strptime(dob_str, "%d-%m-%Y").date()
-                except ValueError:
-                    dob = datetime.strptime(dob_str, "%Y-%m-%d").date()
-                new_profile.date_of_birth = dob
-                today = date.today()
-                age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-                new_profile.age = max(age, 0)
-            except Exception as e:
-                print(f"Failed to parse date_of_birth on create '{dob_str}': {e}")
-        else:
-            # fallback age if unknown
-            new_profile.age = 25
-
-        # If first/last provided, update User.name too
-        name_parts = []
-        if data.get('first_name'): name_parts.append(data['first_name'])
-        if data.get('last_name'): name_parts.append(data['last_name'])
-        if name_parts:
-            current_user.name = ' '.join(name_parts)
-
-        db.add(current_user)
-        db.add(new_profile)
-        print("About to commit changes to database (create)...")
-        db.commit()
-        db.refresh(new_profile)
-        return {"message": "Rider profile created", "profile_id": new_profile.id}
-    
-    # Map Pydantic fields naar database fields
-    field_mapping = {
-        'first_name': None,  # Niet in database - zit in User.name
-        'last_name': None,   # Niet in database - zit in User.name  
-        'phone': None,       # Niet in database - zit in User.phone
-        'date_of_birth': None, # Speciaal: mappen naar date_of_birth + age
-        'postcode': 'postcode',
-        'house_number': 'house_number',
-        'house_number_addition': 'house_number_addition',
-        'street': 'street',
-        'city': 'city',
-        'country_code': 'country_code',
-        'lat': 'lat',
-        'lon': 'lon',
-        'geocode_confidence': 'geocode_confidence',
-        'needs_review': 'needs_review',
-        'max_travel_distance_km': 'max_travel_distance',
-        'transport_options': 'transport_options',
-        'available_days': None,  # Speciaal: combineren met available_time_blocks
-        'available_time_blocks': None,  # Speciaal
-        'session_duration_min': 'session_duration_min',
-        'session_duration_max': 'session_duration_max',
-        'start_date': 'start_date',
-        'arrangement_duration': 'duration_preference',
-        'budget_min_euro': 'budget_min',
-        'budget_max_euro': 'budget_max',
-        'budget_type': None,  # Niet in database
-        'experience_years': 'years_experience',
-        'certification_level': 'fnrs_level',  # legacy mapping to fnrs_level
-        'certifications': 'certifications',
-        'comfort_levels': None,  # Mapping naar meerdere boolean velden
-        'riding_goals': 'goals',
-        'discipline_preferences': 'discipline_preferences',
-        'riding_styles': 'riding_styles',
-        'personality_style': 'personality_style',
-        'willing_tasks': 'willing_tasks',
-        'task_frequency': 'task_frequency',
-        'material_preferences': None,  # Mapping naar meerdere boolean velden
-        'health_restrictions': 'health_limitations',
-        'insurance_coverage': 'has_insurance',
-        'no_gos': 'no_gos',
-        'photos': 'photos',
-        'video_intro_url': 'video_intro',
-        'videos': 'videos',
-    }
-
-    if existing_profile:
-        # Update existing profile met field mapping
-        data = profile_data.dict()
-
-        # Update User fields
-        if data.get('first_name') or data.get('last_name'):
-            name_parts = []
-            if data.get('first_name'): name_parts.append(data['first_name'])
-            if data.get('last_name'): name_parts.append(data['last_name'])
-            if name_parts:
-                new_name = ' '.join(name_parts)
-                current_user.name = new_name
-                # Best-effort: sync naam naar Kinde via Management API (indien M2M creds aanwezig)
-                try:
-                    m2m_client_id = os.getenv("KINDE_M2M_CLIENT_ID")
-                    m2m_client_secret = os.getenv("KINDE_M2M_CLIENT_SECRET")
-                    kinde_domain = os.getenv("KINDE_DOMAIN")
-                    kinde_audience = os.getenv("KINDE_AUDIENCE")
-                    kinde_scope = os.getenv("KINDE_M2M_SCOPE")
-                    if m2m_client_id and m2m_client_secret and kinde_domain:
-                        print(f"Kinde M2M token: audience={kinde_audience}, scope={kinde_scope}")
-                        token_resp = requests.post(
-                            f"{kinde_domain}/oauth2/token",
-                            data={
-                                "grant_type": "client_credentials",
-                                "client_id": m2m_client_id,
-                                "client_secret": m2m_client_secret,
-                                **({"audience": kinde_audience} if kinde_audience else {}),
-                                **({"scope": kinde_scope} if kinde_scope else {}),
-                            },
-                            headers={"Content-Type": "application/x-www-form-urlencoded"},
-                            timeout=10,
-                        )
-                        if not token_resp.ok:
-                            print(f"Kinde M2M token FAILED status={token_resp.status_code} body={token_resp.text}")
-                        if token_resp.ok:
-                            access_token = token_resp.json().get("access_token")
-                            # Split voor- en achternaam indien mogelijk
-                            parts = new_name.strip().split(" ", 1)
-                            given = parts[0] if parts else ""
-                            family = parts[1] if len(parts) > 1 else ""
-                            # Kinde Management API: update user profiel
-                            # API pad kan per versie verschillen; we proberen generiek endpoint
-                            # Gebruik query-param endpoint volgens docs: /api/v1/user?id=<user_id>
-                            base_endpoint = f"{kinde_domain}/api/v1/user"
-                            # Probe met GET en params
-                            try:
-                                probe = requests.get(base_endpoint, params={"id": current_user.kinde_id}, headers={"Authorization": f"Bearer {access_token}"}, timeout=10)
-                                print(f"Kinde GET probe {base_endpoint}?id=... -> {probe.status_code}")
-                            except Exception as _:
-                                probe = None
-                            print(f"Kinde name PATCH endpoint: {base_endpoint}?id={current_user.kinde_id}")
-                            print(f"Kinde name PATCH for user={current_user.kinde_id} given_name='{given}' family_name='{family}' name='{new_name}'")
-                            patch_resp = requests.patch(
-                                base_endpoint,
-                                json={
-                                    # Stuur beide varianten voor maximale compatibiliteit
-                                    "first_name": given,
-                                    "last_name": family,
-                                    "given_name": given,
-                                    "family_name": family,
-                                    "name": new_name,
-                                },
-                                params={"id": current_user.kinde_id},
-                                headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
-                                timeout=10,
-                            )
-                            print(f"Kinde name PATCH status={patch_resp.status_code} body={patch_resp.text}")
-                    else:
-                        print("Skipping Kinde name sync: missing M2M env variables or KINDE_DOMAIN")
-                except Exception as _:
-                    # Niet fatal; doorgaan met lokale update
-                    pass
-
-        if data.get('phone'):
-            current_user.phone = data['phone']
-            # Best-effort: sync telefoon naar Kinde (indien M2M creds aanwezig)
-            try:
-                m2m_client_id = os.getenv("KINDE_M2M_CLIENT_ID")
-                m2m_client_secret = os.getenv("KINDE_M2M_CLIENT_SECRET")
-                kinde_domain = os.getenv("KINDE_DOMAIN")
-                kinde_audience = os.getenv("KINDE_AUDIENCE")
-                kinde_scope = os.getenv("KINDE_M2M_SCOPE")
-                if m2m_client_id and m2m_client_secret and kinde_domain:
-                    print(f"Kinde M2M token (phone): audience={kinde_audience}, scope={kinde_scope}")
-                    token_resp = requests.post(
-                        f"{kinde_domain}/oauth2/token",
-                        data={
-                            "grant_type": "client_credentials",
-                            "client_id": m2m_client_id,
-                            "client_secret": m2m_client_secret,
-                            **({"audience": kinde_audience} if kinde_audience else {}),
-                            **({"scope": kinde_scope} if kinde_scope else {}),
-                        },
-                        headers={"Content-Type": "application/x-www-form-urlencoded"},
-                        timeout=10,
-                    )
-                    if not token_resp.ok:
-                        print(f"Kinde M2M token FAILED status={token_resp.status_code} body={token_resp.text}")
-                    if token_resp.ok:
-                        access_token = token_resp.json().get("access_token")
-                        # Endpoint met query param
-                        base_endpoint = f"{kinde_domain}/api/v1/user"
-                        try:
-                            probe = requests.get(base_endpoint, params={"id": current_user.kinde_id}, headers={"Authorization": f"Bearer {access_token}"}, timeout=10)
-                            print(f"Kinde GET probe {base_endpoint}?id=... -> {probe.status_code}")
-                        except Exception as _:
-                            probe = None
-                        print(f"Kinde phone PATCH endpoint: {base_endpoint}?id={current_user.kinde_id}")
-                        print(f"Kinde phone PATCH for user={current_user.kinde_id} phone='{current_user.phone}'")
-                        patch_resp = requests.patch(
-                            base_endpoint,
-                            json={
-                                "phone_number": current_user.phone,
-                            },
-                            params={"id": current_user.kinde_id},
-                            headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
-                            timeout=10,
-                        )
-                        print(f"Kinde phone PATCH status={patch_resp.status_code} body={patch_resp.text}")
-                else:
-                    print("Skipping Kinde phone sync: missing M2M env variables or KINDE_DOMAIN")
-            except Exception:
-                pass
-
-    if data.get('phone'):
-        current_user.phone = data['phone']
-        # Best-effort: sync telefoon naar Kinde (indien M2M creds aanwezig)
-        try:
-            m2m_client_id = os.getenv("KINDE_M2M_CLIENT_ID")
-            m2m_client_secret = os.getenv("KINDE_M2M_CLIENT_SECRET")
-            kinde_domain = os.getenv("KINDE_DOMAIN")
-            kinde_audience = os.getenv("KINDE_AUDIENCE")
-            kinde_scope = os.getenv("KINDE_M2M_SCOPE")
-            if m2m_client_id and m2m_client_secret and kinde_domain:
-                print(f"Kinde M2M token (phone): audience={kinde_audience}, scope={kinde_scope}")
-                token_resp = requests.post(
-                    f"{kinde_domain}/oauth2/token",
-                    data={
-                        "grant_type": "client_credentials",
-                        "client_id": m2m_client_id,
-                        "client_secret": m2m_client_secret,
-                        **({"audience": kinde_audience} if kinde_audience else {}),
-                        **({"scope": kinde_scope} if kinde_scope else {}),
-                    },
-                    headers={"Content-Type": "application/x-www-form-urlencoded"},
-                    timeout=10,
-                )
-                if not token_resp.ok:
-                    print(f"Kinde M2M token FAILED status={token_resp.status_code} body={token_resp.text}")
-                if token_resp.ok:
-                    access_token = token_resp.json().get("access_token")
-                    # Endpoint met query param
-                    base_endpoint = f"{kinde_domain}/api/v1/user"
-                    try:
-                        probe = requests.get(base_endpoint, params={"id": current_user.kinde_id}, headers={"Authorization": f"Bearer {access_token}"}, timeout=10)
-                        print(f"Kinde GET probe {base_endpoint}?id=... -> {probe.status_code}")
-                    except Exception as _:
-                        probe = None
-                    print(f"Kinde phone PATCH endpoint: {base_endpoint}?id={current_user.kinde_id}")
-                    print(f"Kinde phone PATCH for user={current_user.kinde_id} phone='{current_user.phone}'")
-                    patch_resp = requests.patch(
-                        base_endpoint,
-                        json={
-                            "phone_number": current_user.phone,
-                        },
-                        params={"id": current_user.kinde_id},
-                        headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"},
-                        timeout=10,
-                    )
-                    print(f"Kinde phone PATCH status={patch_resp.status_code} body={patch_resp.text}")
-            else:
-                print("Skipping Kinde phone sync: missing M2M env variables or KINDE_DOMAIN")
-        except Exception:
-            pass
-
-        # 1) Basisvelden direct uit payload mappen (alleen als meegegeven)
-        direct_map = {
-            'postcode': 'postcode',
-            'house_number': 'house_number',
-            'house_number_addition': 'house_number_addition',
-            'street': 'street',
-            'city': 'city',
-            'country_code': 'country_code',
-            'lat': 'lat',
-            'lon': 'lon',
-            'geocode_confidence': 'geocode_confidence',
-            'needs_review': 'needs_review',
-            'max_travel_distance_km': 'max_travel_distance',
-            'transport_options': 'transport_options',
-            'session_duration_min': 'session_duration_min',
-            'session_duration_max': 'session_duration_max',
-            'min_days_per_week': 'min_days_per_week',
-            'start_date': 'start_date',
-            'arrangement_duration': 'duration_preference',
-            'budget_min_euro': 'budget_min',
-            'budget_max_euro': 'budget_max',
-            'experience_years': 'years_experience',
-            'certifications': 'certifications',
-            'riding_styles': 'riding_styles',
-            'personality_style': 'personality_style',
-            'willing_tasks': 'willing_tasks',
-            'task_frequency': 'task_frequency',
-            'photos': 'photos',
-            'video_intro_url': 'video_intro',
-            'videos': 'videos',
-            'insurance_coverage': 'has_insurance',
-            'health_restrictions': 'health_limitations',
-            'no_gos': 'no_gos',
-            'parent_consent': 'parent_consent',
-            'parent_contact': 'parent_contact',
-            'rider_height_cm': 'rider_height_cm',
-            'rider_weight_kg': 'rider_weight_kg',
-            'rider_bio': 'rider_bio',
-        }
-        for src, dest in direct_map.items():
-            if src in payload:
-                val = payload.get(src)
-                # type conversies
-                if dest in ('max_travel_distance', 'session_duration_min', 'session_duration_max', 'min_days_per_week', 'budget_min', 'budget_max', 'years_experience'):
-                    try:
-                        val = int(val) if val is not None else None
-                    except Exception:
-                        pass
-                if dest in ('rider_height_cm','rider_weight_kg'):
-                    try:
-                        val = int(val) if (val is not None and str(val).strip() != '') else None
-                    except Exception:
-                        val = None
-                if dest in ('has_insurance',):
-                    val = bool(val)
-                # floats voor geo
-                if dest in ('lat','lon','geocode_confidence'):
-                    try:
-                        val = float(val) if val is not None else None
-                    except Exception:
-                        val = None
-                # bool voor review-flag
-                if dest in ('needs_review',):
-                    try:
-                        val = bool(val) if val is not None else None
-                    except Exception:
-                        val = None
-                # normaliseer landcode naar 2-letter upper
-                if dest == 'country_code' and isinstance(val, str):
-                    val = (val or '').upper()[:2]
-                if dest in ('health_limitations', 'no_gos') and isinstance(val, list):
-                    val = json.dumps(val)
-                setattr(existing_profile, dest, val)
-
-        # Speciaal: geboortedatum en leeftijd bijwerken indien meegegeven
-        if 'date_of_birth' in payload:
-            dob_str = payload.get('date_of_birth')
-            if dob_str:
-                try:
-                    from datetime import datetime, date
-                    try:
-                        dob = datetime.strptime(dob_str, "%d-%m-%Y").date()
-                    except ValueError:
-                        dob = datetime.strptime(dob_str, "%Y-%m-%d").date()
-                    existing_profile.date_of_birth = dob
-                    today = date.today()
-                    age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-                    existing_profile.age = max(age, 0)
-                except Exception as e:
-                    print(f"Failed to parse date_of_birth on update '{dob_str}': {e}")
-
-        # 1b) Lease preferences (JSON dict)
-        if 'lease_preferences' in payload and isinstance(payload.get('lease_preferences'), dict):
-            existing_profile.lease_preferences = payload.get('lease_preferences')
-        # 1c) Desired horse (JSON dict)
-        if 'desired_horse' in payload and isinstance(payload.get('desired_horse'), dict):
-            existing_profile.desired_horse = payload.get('desired_horse')
-
-        # 2) Availability
-        if 'available_schedule' in payload and isinstance(payload.get('available_schedule'), dict):
-            # prefer per-day schedule if provided
-            existing_profile.available_days = payload.get('available_schedule') or {}
-        else:
-            # fallback to arrays -> same blocks for all selected days
-            days_arr = payload.get('available_days') if 'available_days' in payload else (data.get('available_days') or [])
-            blocks_arr = payload.get('available_time_blocks') if 'available_time_blocks' in payload else (data.get('available_time_blocks') or [])
-            if isinstance(days_arr, list) and isinstance(blocks_arr, list) and (days_arr or blocks_arr):
-                existing_profile.available_days = {d: blocks_arr for d in days_arr}
-
-        # 2b) Goals/Discipline/Personality explicit updates if provided
-        if 'riding_goals' in payload and isinstance(payload.get('riding_goals'), list):
-            existing_profile.goals = payload.get('riding_goals')
-        if 'discipline_preferences' in payload and isinstance(payload.get('discipline_preferences'), list):
-            existing_profile.discipline_preferences = payload.get('discipline_preferences')
-        if 'personality_style' in payload and isinstance(payload.get('personality_style'), list):
-            existing_profile.personality_style = payload.get('personality_style')
-        if 'general_skills' in payload and isinstance(payload.get('general_skills'), list):
-            existing_profile.general_skills = payload.get('general_skills')
-
-        # 3) Comfort: map booleans and trail_rides discipline toggle
-        comfort = payload.get('comfort_levels') if 'comfort_levels' in payload else (data.get('comfort_levels') or {})
-        if 'traffic' in comfort:
-            existing_profile.comfortable_with_traffic = bool(comfort['traffic'])
-        if 'outdoor_solo' in comfort:
-            existing_profile.comfortable_solo_outside = bool(comfort['outdoor_solo'])
-        if 'jumping_height' in comfort and comfort['jumping_height'] is not None:
-            try:
-                existing_profile.max_jump_height = int(comfort['jumping_height'])
-            except Exception:
-                pass
-        if 'nervous_horses' in comfort:
-            existing_profile.comfortable_with_nervous_horses = bool(comfort['nervous_horses'])
-        if 'young_horses' in comfort:
-            existing_profile.comfortable_with_young_horses = bool(comfort['young_horses'])
-        if 'stallions' in comfort:
-            existing_profile.comfortable_with_stallions = bool(comfort['stallions'])
-        if 'trail_rides' in comfort:
-            try:
-                existing_profile.comfortable_with_trail_rides = bool(comfort['trail_rides'])
-            except Exception:
-                pass
-
-        # 4) Activities on UPDATE (use payload keys only)
-        if 'activity_mode' in payload:
-            existing_profile.activity_mode = payload.get('activity_mode')
-        if 'activity_preferences' in payload and isinstance(payload.get('activity_preferences'), list):
-            existing_profile.activity_preferences = payload.get('activity_preferences')
-        if 'mennen_experience' in payload:
-            existing_profile.mennen_experience = payload.get('mennen_experience')
-
-        # 4b) Normalize by activity_mode to keep data consistent
-        mode = existing_profile.activity_mode
-        care_keys = ['verzorging','grondwerk','longeren','hand_walking','pasture_turnout','medical_assist']
-        ride_keys = ['buitenritten','dressuur_training','springen_training']
-        if mode == 'care_only':
-            # Keep only care subitems; clear ride-related meta
-            prefs = existing_profile.activity_preferences or []
-            existing_profile.activity_preferences = [k for k in prefs if k in care_keys]
-            existing_profile.mennen_experience = None
-            # Goals/discipline not applicable
-            existing_profile.goals = []
-            existing_profile.discipline_preferences = []
-        elif mode == 'ride_only':
-            # No subactivities; no mennen
-            existing_profile.activity_preferences = []
-            existing_profile.mennen_experience = None
-            # Goals/discipline remain as selected by user
-        elif mode == 'drive_only':
-            # Only mennen path; no subactivities, no riding goals/discipline
-            existing_profile.activity_preferences = []
-            existing_profile.goals = []
-            existing_profile.discipline_preferences = []
-        elif mode == 'ride_or_care':
-            # Allow both care and ride subactivities, but drop anything unknown
-            prefs = existing_profile.activity_preferences or []
-            allowed = set(care_keys + ride_keys)
-            existing_profile.activity_preferences = [k for k in prefs if k in allowed]
-            existing_profile.mennen_experience = None
-
-        # 5) Material preferences on UPDATE
-        material = payload.get('material_preferences') if 'material_preferences' in payload else (data.get('material_preferences') or {})
-        if 'bitless_ok' in material:
-            existing_profile.bitless_ok = bool(material['bitless_ok'])
-        if 'auxiliary_reins' in material and material['auxiliary_reins'] is not None:
-            existing_profile.training_aids_ok = bool(material['auxiliary_reins'])
-        if 'spurs' in material and material['spurs'] is not None:
-            existing_profile.spurs_ok = bool(material['spurs'])
-
-        # Commit changes
-        db.add(current_user)
-        db.add(existing_profile)
-        print("About to commit changes to database...")
-        db.commit()
-        db.refresh(existing_profile)
-        return {"message": "Profile updated successfully", "id": existing_profile.id}
-@app.get("/rider-profile")
-async def get_rider_profile(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get current user's rider profile"""
-    
-    profile = db.query(RiderProfile).filter(RiderProfile.user_id == current_user.id).first()
-    
-    if not profile:
-        raise HTTPException(status_code=404, detail="Rider profile not found")
-    
-    # Bepaal voor/achternaam: eerste deel = voornaam, rest = achternaam
-    first = ""
-    last = ""
-    if current_user.name:
-        parts = current_user.name.split(" ", 1)
-        first = parts[0]
-        last = parts[1] if len(parts) > 1 else ""
-
-    # Flatten availability for frontend expectations
-    flat_days = []
-    flat_blocks = []
-    if isinstance(profile.available_days, dict):
-        flat_days = list(profile.available_days.keys())
-        # Union of all blocks
-        seen = set()
-        for arr in profile.available_days.values():
-            for b in (arr or []):
-                seen.add(b)
-        flat_blocks = list(seen)
-    else:
-        flat_days = profile.available_days if profile.available_days else []
-        flat_blocks = []
-
-    # Format DOB
-    dob_str = ""
-    try:
-        if profile.date_of_birth:
-            dob_str = profile.date_of_birth.strftime("%Y-%m-%d")
-    except Exception:
-        dob_str = ""
-
-    return {
-        "id": profile.id,
-        "user_id": profile.user_id,
-        "first_name": first,
-        "last_name": last,
-        "phone": current_user.phone,
-        "date_of_birth": dob_str,
-        "age": profile.age,
-        "postcode": profile.postcode,
-        "house_number": profile.house_number,
-        "house_number_addition": profile.house_number_addition,
-        "street": profile.street,
-        "city": profile.city,
-        "country_code": profile.country_code,
-        "lat": profile.lat,
-        "lon": profile.lon,
-        "geocode_confidence": profile.geocode_confidence,
-        "needs_review": profile.needs_review,
-        "max_travel_distance_km": profile.max_travel_distance,
-        "transport_options": profile.transport_options if profile.transport_options else [],
-        "available_days": flat_days,
-        "available_time_blocks": flat_blocks,
-        "available_schedule": profile.available_days or {},
-        "session_duration_min": profile.session_duration_min if profile.session_duration_min is not None else 60,
-        "session_duration_max": profile.session_duration_max if profile.session_duration_max is not None else 120,
-        "start_date": profile.start_date,
-        "arrangement_duration": profile.duration_preference,
-        "budget_min_euro": profile.budget_min,
-        "budget_max_euro": profile.budget_max,
-        "experience_years": profile.years_experience,
-        "certification_level": profile.fnrs_level or profile.knhs_level or "",
-        "certifications": profile.certifications or [],
-        "comfort_levels": {
-            "traffic": profile.comfortable_with_traffic,
-            "outdoor_solo": profile.comfortable_solo_outside,
-            "nervous_horses": bool(profile.comfortable_with_nervous_horses),
-            "young_horses": bool(profile.comfortable_with_young_horses),
-            "stallions": bool(profile.comfortable_with_stallions),
-            "trail_rides": bool(getattr(profile, 'comfortable_with_trail_rides', False)),
-            "jumping_height": profile.max_jump_height or 0
-        },
-        "min_days_per_week": profile.min_days_per_week,
-        "riding_goals": profile.goals if profile.goals else [],
-        "discipline_preferences": profile.discipline_preferences if profile.discipline_preferences else [],
-        "general_skills": profile.general_skills or [],
-        "riding_styles": profile.riding_styles if profile.riding_styles else [],
-        "activity_mode": profile.activity_mode,
-        "activity_preferences": profile.activity_preferences if profile.activity_preferences else [],
-        "mennen_experience": profile.mennen_experience,
-        "personality_style": profile.personality_style if profile.personality_style else [],
-        "willing_tasks": profile.willing_tasks if profile.willing_tasks else [],
-        "task_frequency": profile.task_frequency,
-        "lease_preferences": profile.lease_preferences or {},
-        "material_preferences": {
-            "bitless_ok": profile.bitless_ok,
-            "spurs": bool(getattr(profile, 'spurs_ok', False)),
-            "auxiliary_reins": profile.training_aids_ok,
-            "own_helmet": True  # UI-only default
-        },
-        # health_limitations/no_gos are TEXT that may contain JSON string; parse to list if possible
-        "health_restrictions": (json.loads(profile.health_limitations) if isinstance(profile.health_limitations, str) and profile.health_limitations else []),
-        "insurance_coverage": profile.has_insurance,
-        "no_gos": (json.loads(profile.no_gos) if isinstance(profile.no_gos, str) and profile.no_gos else []),
-        "photos": profile.photos if profile.photos else [],
-        "videos": (profile.videos if getattr(profile, 'videos', None) is not None else ([] if not profile.video_intro else [profile.video_intro])),
-        "video_intro_url": profile.video_intro,
-        "parent_consent": profile.parent_consent,
-        "parent_contact": profile.parent_contact,
-        "rider_height_cm": profile.rider_height_cm,
-        "rider_weight_kg": profile.rider_weight_kg,
-        "rider_bio": profile.rider_bio,
-        "desired_horse": profile.desired_horse or {},
-        "created_at": profile.created_at,
-        "updated_at": profile.updated_at
-    }
+@router.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    """Prometheus scrape endpoint; met METRICS_TOKEN gezet is een Bearer token verplicht."""
+    token = request.app.state.settings.metrics_token
+    if token and request.headers.get("authorization") != f"Bearer {token}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+def __getattr__(name):
+    # `main.app` / `uvicorn main:app`: één app met de standaard settings, bij het eerste gebruik
+    global app
+    if name == "app":
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Open SSE-streams eindigen nooit vanzelf: na 5 s bij een shutdown afbreken (clients reconnecten)
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000, timeout_graceful_shutdown=5)
@@ -0,0 +1,100 @@
+"""Likes en wederzijdse matches, elk in één atomair statement.
+
+Een like zet de eigen vlag en berekent `is_mutual_match` in SQL uit de vlag
+van de andere kant, zoals die op dat moment in de rij staat. Er is geen
+read-modify-write in Python, dus twee gelijktijdige likes (ruiter en
+eigenaar, of een dubbele klik over twee workers) kunnen elkaar niet
+overschrijven:
+
+- ruiter: INSERT ... SELECT (alleen een gepubliceerd paard) ON CONFLICT
+  (rider_profile_id, horse_profile_id) DO UPDATE. De unique constraint
+  `uq_matches_rider_horse` voorkomt dubbele rijen.
+- eigenaar: UPDATE ... WHERE id AND het paard is van deze eigenaar.
+
+Postgres evalueert SET en WHERE opnieuw op de nieuwste rijversie als een
+ander statement dezelfde rij net wijzigde; SQLite serialiseert writers.
+Een herhaalde like raakt geen rij (`WHERE <vlag> IS NOT true`) en geeft dus
+ook geen dubbele events; de caller leest dan de huidige stand.
+"""
+from datetime import datetime
+
+from sqlalchemy import false, func, literal, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from events import match_changed
+from models import PUBLISHED, HorseProfile, Match, OwnerProfile
+
+_INSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
+RETURNING = (Match.id, Match.rider_profile_id, Match.horse_profile_id, Match.rider_liked, Match.owner_liked,
+             Match.is_mutual_match, Match.status)
+
+
+def _state(db, *criteria):
+    return db.execute(select(*RETURNING).where(*criteria)).mappings().first()
+
+
+def rider_like(db, rider_profile_id, horse_id):
+    """(rij, gewijzigd); rij None als het paard niet bestaat of niet gepubliceerd is. De caller commit."""
+    now = datetime.utcnow()
+    source = select(
+        literal(rider_profile_id), HorseProfile.id, true(), false(), false(), literal("pending"),
+        literal(now), literal(now),
+    ).where(HorseProfile.id == horse_id, HorseProfile.status == PUBLISHED)
+    stmt = _INSERTS[db.get_bind().dialect.name](Match).from_select(
+        ["rider_profile_id", "horse_profile_id", "rider_liked", "owner_liked", "is_mutual_match", "status",
+         "created_at", "updated_at"],
+        source,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Match.rider_profile_id, Match.horse_profile_id],
+        set_={
+            "rider_liked": True,
+            "is_mutual_match": func.coalesce(Match.owner_liked, False),
+            "updated_at": now,
+        },
+        where=Match.rider_liked.isnot(True),
+    ).returning(*RETURNING)
+    row = db.execute(stmt).mappings().first()
+    if row is None:
+        # Al geliket (geen wijziging) of paard niet beschikbaar
+        return _state(db, Match.rider_profile_id == rider_profile_id, Match.horse_profile_id == horse_id), False
+    if row["is_mutual_match"]:
+        match_changed(db, db.connection(), row)
+    else:
+        match_changed(db, db.connection(), row, name="like", sides=("owner",))
+    return row, True
+
+
+def owner_like(db, match_id, user_id):
+    """(rij, gewijzigd); rij None als de match niet bij een paard van deze gebruiker hoort. De caller commit."""
+    owned = (
+        select(HorseProfile.id)
+        .join(OwnerProfile, HorseProfile.owner_profile_id == OwnerProfile.id)
+        .where(OwnerProfile.user_id == user_id)
+    )
+    stmt = (
+        update(Match)
+        .where(Match.id == match_id, Match.horse_profile_id.in_(owned), Match.owner_liked.isnot(True))
+        .values(owner_liked=True, is_mutual_match=func.coalesce(Match.rider_liked, False), updated_at=datetime.utcnow())
+        .returning(*RETURNING)
+        .execution_options(synchronize_session=False)
+    )
+    row = db.execute(stmt).mappings().first()
+    if row is None:
+        return _state(db, Match.id == match_id, Match.horse_profile_id.in_(owned)), False
+    if row["is_mutual_match"]:
+        match_changed(db, db.connection(), row)
+    return row, True
+
+
+def like_response(row, changed):
+    """API-vorm van een like. Geen like-vlag van de andere kant: die blijft verborgen tot het wederzijds is."""
+    return {
+        "match_id": row["id"],
+        "horse_id": row["horse_profile_id"],
+        "liked": True,
+        "is_mutual_match": bool(row["is_mutual_match"]),
+        "changed": changed,
+    }
@@ -0,0 +1,199 @@
+"""Prometheus metrics zonder extra dependency (text exposition format 0.0.4).
+
+`MetricsMiddleware` meet per route (het pad-template, niet de concrete URL)
+aantal requests en latency, plus het aantal SQL statements en de DB-tijd per
+request (via `dbstats.track_requests`). Losse metrics voor geocoding, Kinde en
+uploads worden op de plek zelf bijgewerkt:
+
+    with GEO_PROVIDER_SECONDS.time("PDOK"):
+        ...
+    UPLOAD_BYTES.inc(("azure",), len(data))
+
+Geweigerde requests (429) telt `ratelimit.RateLimitMiddleware` in RATE_LIMITED.
+
+`GET /metrics` rendert alles met `render()`.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from dbstats import request_query_stats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconden (API requests, externe calls)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+BYTES_BUCKETS = (16_384, 131_072, 1_048_576, 4_194_304, 16_777_216, 67_108_864)
+
+REGISTRY = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in sorted(items):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, labels, value):
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(labels, time.perf_counter() - started)
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(state)) for labels, state in self._values.items()]
+        names = self.labelnames + ("le",)
+        for labels, state in sorted(items):
+            cumulative = 0
+            for bound, n in zip(self.buckets, state):
+                cumulative += n
+                yield f"{self.name}_bucket{_labels(names, labels + (bound,))} {cumulative}"
+            yield f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {state[-1]}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {state[-2]}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {state[-1]}"
+
+
+class Gauge:
+    """Momentopname; `collect()` levert bij elke scrape {labels: waarde} (bv. uit de database)."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=(), collect=None):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.collect = collect
+        REGISTRY.append(self)
+
+    def samples(self):
+        try:
+            values = self.collect() if self.collect else {}
+        except Exception:
+            # Scrape mag niet falen op één bron (bv. tabel nog niet gemigreerd)
+            values = {}
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests per route en status", ("method", "route", "status"))
+HTTP_SECONDS = Histogram("http_request_duration_seconds", "Request latency per route", ("method", "route"))
+DB_QUERIES = Histogram("http_request_db_queries", "SQL statements per request", ("method", "route"),
+                       buckets=QUERY_COUNT_BUCKETS)
+DB_SECONDS = Histogram("http_request_db_seconds", "Tijd in SQL statements per request", ("method", "route"))
+
+GEO_CACHE = Counter("geocode_cache_total", "Geocode cache lookups", ("result",))
+GEO_PROVIDER_SECONDS = Histogram("geocode_provider_duration_seconds", "Latency van PDOK/OSM lookups", ("provider",))
+GEO_PROVIDER_ERRORS = Counter("geocode_provider_errors_total", "Mislukte PDOK/OSM lookups", ("provider",))
+
+KINDE_VERIFY_SECONDS = Histogram("kinde_verify_duration_seconds", "Latency van Kinde token verificatie", ("outcome",))
+
+UPLOAD_FILES = Counter("upload_files_total", "Geüploade bestanden", ("backend",))
+UPLOAD_BYTES = Counter("upload_bytes_total", "Geüploade bytes", ("backend",))
+UPLOAD_FILE_BYTES = Histogram("upload_file_bytes", "Bestandsgrootte per upload", ("backend",), buckets=BYTES_BUCKETS)
+UPLOAD_SECONDS = Histogram("upload_duration_seconds", "Opslaan per bestand", ("backend",))
+
+MODERATION_REPORTS = Counter("moderation_reports_total", "Verwerkte abuse reports per uitkomst", ("outcome",))
+# Jobs: queue-diepte komt uit de database (Gauge met collect, zie jobs.py)
+JOBS_TOTAL = Counter("jobs_total", "Afgeronde job-pogingen per type en uitkomst", ("type", "outcome"))
+JOB_SECONDS = Histogram("job_duration_seconds", "Looptijd per job", ("type",))
+JOB_WAIT_SECONDS = Histogram("job_wait_seconds", "Tijd tussen run_at en start", ("type",),
+                             buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600))
+
+SSE_EVENTS = Counter("sse_events_total", "Gepubliceerde live events per type", ("event",))
+
+RATE_LIMITED = Counter("rate_limited_total", "Requests geweigerd door rate limiting (429)", ("method", "route", "scope"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware: count/latency/DB-statements per route-template (latency niet voor SSE-streams)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        streaming = False
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(k == b"content-type" and v.startswith(b"text/event-stream") for k, v in message.get("headers", ()))
+            await send(message)
+
+        with request_query_stats() as db:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+                labels = (scope["method"], route)
+                HTTP_REQUESTS.inc(labels + (str(status),))
+                if not streaming:
+                    HTTP_SECONDS.observe(labels, time.perf_counter() - started)
+                DB_QUERIES.observe(labels, db.count)
+                DB_SECONDS.observe(labels, db.seconds)
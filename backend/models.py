@@ -1,7 +1,27 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Float, JSON, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Float, JSON, Date, Index, UniqueConstraint
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship, validates
 from database import Base
 from datetime import datetime
+from availability import schedule_to_mask
+
+# Publicatiestatus van paarden en ruiterprofielen
+DRAFT = "draft"
+PUBLISHED = "published"
+STATUSES = (DRAFT, PUBLISHED)
+
+
+class AvailabilityMaskMixin:
+    """Houdt `available_mask` (zie availability.py) gelijk met de JSON `available_days`."""
+
+    # 7 dagen x 3 dagdelen; afgeleid bij elke write van available_days
+    available_mask = Column(Integer, nullable=True)
+
+    @validates("available_days")
+    def _sync_available_mask(self, key, value):
+        self.available_mask = schedule_to_mask(value)
+        return value
+
 
 class User(Base):
     __tablename__ = "users"
@@ -22,7 +42,7 @@ class User(Base):
     rider_profile = relationship("RiderProfile", back_populates="user", uselist=False)
     owner_profile = relationship("OwnerProfile", back_populates="user", uselist=False)
 
-class RiderProfile(Base):
+class RiderProfile(AvailabilityMaskMixin, Base):
     __tablename__ = "rider_profiles"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -100,7 +120,7 @@ class RiderProfile(Base):
     spurs_ok = Column(Boolean, default=False)
     
     # Health & Limitations
-    health_limitations = Column(Text, nullable=True)
+    health_limitations = Column(JSON, nullable=True)  # ["rug", "knie"]
     fears_anxieties = Column(Text, nullable=True)
     
     # Age & Consent
@@ -120,16 +140,21 @@ class RiderProfile(Base):
     insurance_details = Column(Text, nullable=True)
     
     # No-gos
-    no_gos = Column(Text, nullable=True)
+    no_gos = Column(JSON, nullable=True)  # ["sporen", "springen"]
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Optimistic concurrency (If-Match / 409), zie concurrency.py
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    # Publicatie van het ruiterprofiel (POST /auth/set-published)
+    status = Column(String(10), nullable=False, default=DRAFT, server_default=DRAFT)
     
     # Relationships
     user = relationship("User", back_populates="rider_profile")
     matches_as_rider = relationship("Match", foreign_keys="Match.rider_profile_id", back_populates="rider_profile")
 
-class OwnerProfile(Base):
+class OwnerProfile(AvailabilityMaskMixin, Base):
     __tablename__ = "owner_profiles"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -182,6 +207,9 @@ class OwnerProfile(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Optimistic concurrency (If-Match / 409), zie concurrency.py
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
     # Guardian consent (for minors, owner context)
     parent_consent = Column(Boolean, nullable=True)
     parent_name = Column(String(255), nullable=True)
@@ -194,7 +222,7 @@ class OwnerProfile(Base):
     user = relationship("User", back_populates="owner_profile")
     horse_profiles = relationship("HorseProfile", back_populates="owner_profile")
 
-class HorseProfile(Base):
+class HorseProfile(AvailabilityMaskMixin, Base):
     __tablename__ = "horse_profiles"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -275,8 +303,8 @@ class HorseProfile(Base):
     trail_access = Column(Boolean, default=False)
     trailer_available = Column(Boolean, default=False)
     
-    # Availability Status
-    is_available = Column(Boolean, default=True)
+    # Publicatie: draft/published (zie published_ads.py voor het leesmodel)
+    status = Column(String(10), nullable=False, default=DRAFT, server_default=DRAFT)
     # Availability details for ads
     available_days = Column(JSON, nullable=True)
     min_days_per_week = Column(Integer, nullable=True)
@@ -287,7 +315,7 @@ class HorseProfile(Base):
     cost_amount = Column(Integer, nullable=True)
     
     # No-gos
-    no_gos = Column(Text, nullable=True)
+    no_gos = Column(JSON, nullable=True)  # ["roken", "harde_handen"]
     
     # Stable location (horse-specific address)
     stable_country_code = Column(String(2), nullable=True)
@@ -303,6 +331,13 @@ class HorseProfile(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Optimistic concurrency (If-Match / 409), zie concurrency.py
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": version}
+    # "Mijn paarden": keyset-paginatie op id en count/ETag-aggregaat zonder de rijen te lezen
+    __table_args__ = (
+        Index("ix_horse_profiles_owner", "owner_profile_id", "id", "updated_at"),
+    )
     
     # Stable facilities
     horse_walker = Column(Boolean, default=False)
@@ -313,6 +348,19 @@ class HorseProfile(Base):
     owner_profile = relationship("OwnerProfile", back_populates="horse_profiles")
     matches = relationship("Match", back_populates="horse_profile")
 
+    # Compat: API en wizard spreken nog `is_available` (true = gepubliceerd)
+    @hybrid_property
+    def is_available(self):
+        return self.status == PUBLISHED
+
+    @is_available.setter
+    def is_available(self, value):
+        self.status = PUBLISHED if value else DRAFT
+
+    @is_available.expression
+    def is_available(cls):
+        return cls.status == PUBLISHED
+
 class Match(Base):
     __tablename__ = "matches"
     
@@ -342,3 +390,137 @@ class Match(Base):
     # Relationships
     rider_profile = relationship("RiderProfile", foreign_keys=[rider_profile_id], back_populates="matches_as_rider")
     horse_profile = relationship("HorseProfile", back_populates="matches")
+
+    # Eén match per ruiter/paard; ook het conflict-doel van de like-UPSERT (matches.py)
+    __table_args__ = (
+        UniqueConstraint("rider_profile_id", "horse_profile_id", name="uq_matches_rider_horse"),
+    )
+
+class ProfileTag(Base):
+    """Genormaliseerde waarden uit JSON-lijstvelden (zie tags.py) voor geïndexeerd filteren.
+
+    De JSON-kolommen op de profielen blijven de API-bron; deze tabel wordt bij
+    elke write bijgewerkt.
+    """
+    __tablename__ = "profile_tags"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(10), nullable=False)  # horse/rider
+    entity_id = Column(Integer, nullable=False)
+    attribute = Column(String(50), nullable=False)  # bv. temperament, ad_types
+    value = Column(String(100), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("entity", "entity_id", "attribute", "value", name="uq_profile_tags_entity_attr_value"),
+        Index("ix_profile_tags_lookup", "entity", "attribute", "value", "entity_id"),
+    )
+
+
+class PublishedAd(Base):
+    """Leesmodel voor zoeken en lijsten: één smalle rij per gepubliceerd paard (zie published_ads.py)."""
+    __tablename__ = "published_ads"
+
+    horse_id = Column(Integer, ForeignKey("horse_profiles.id", ondelete="CASCADE"), primary_key=True)
+    owner_profile_id = Column(Integer, nullable=False)
+    card = Column(Text, nullable=False)  # voorgerenderde card view (JSON)
+    available_mask = Column(Integer, nullable=False, default=0)
+    min_days_per_week = Column(Integer, nullable=True)
+    geo_cell = Column(String(16), nullable=True)  # raster van 0.1 graad, zie published_ads.geo_cell
+    lat = Column(Float, nullable=True)
+    lon = Column(Float, nullable=True)
+    cost_model = Column(String(20), nullable=True)
+    cost_amount = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_published_ads_recent", "updated_at", "horse_id"),
+        Index("ix_published_ads_geo_cell", "geo_cell"),
+    )
+
+
+# Moderatie: meldingen (queue) en geaggregeerde zaken, zie moderation.py
+REPORT_TARGETS = ("horse", "media")
+REPORT_REASONS = ("spam", "scam", "inappropriate", "animal_welfare", "wrong_info", "other")
+
+
+class AbuseReport(Base):
+    """Binnengekomen melding; append-only queue die de moderatie-worker in batches verwerkt.
+
+    Verwerkte rijen blijven staan als audit trail (case_id + outcome).
+    """
+    __tablename__ = "abuse_reports"
+
+    id = Column(Integer, primary_key=True)
+    target_type = Column(String(10), nullable=False)  # horse/media
+    target_key = Column(String(500), nullable=False)  # horse id of media-URL
+    reason = Column(String(30), nullable=False)
+    comment = Column(Text, nullable=True)
+    reporter_key = Column(String(40), nullable=False)  # "user:<id>", voor deduplicatie
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Gezet door de worker
+    processed_at = Column(DateTime, nullable=True)
+    case_id = Column(Integer, ForeignKey("moderation_cases.id", ondelete="SET NULL"), nullable=True)
+    outcome = Column(String(10), nullable=True)  # counted/duplicate/invalid
+
+    __table_args__ = (
+        Index("ix_abuse_reports_queue", "processed_at", "id"),
+        Index("ix_abuse_reports_case_reporter", "case_id", "reporter_key"),
+    )
+
+
+class ModerationCase(Base):
+    """Eén rij per gemeld paard of media-URL; meldingen tellen hierop op."""
+    __tablename__ = "moderation_cases"
+
+    id = Column(Integer, primary_key=True)
+    target_type = Column(String(10), nullable=False)
+    target_key = Column(String(500), nullable=False)
+    horse_id = Column(Integer, ForeignKey("horse_profiles.id", ondelete="SET NULL"), nullable=True)
+    status = Column(String(10), nullable=False, default="open")  # open/resolved/dismissed
+    report_count = Column(Integer, nullable=False, default=0)  # unieke melders
+    reasons = Column(JSON, nullable=True)  # reden -> aantal
+    flags = Column(JSON, nullable=True)  # uitkomst content checks
+    first_reported_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_reported_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("target_type", "target_key", name="uq_moderation_cases_target"),
+        Index("ix_moderation_cases_status", "status", "report_count"),
+    )
+
+
+# Achtergrondjobs, zie jobs.py
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class Job(Base):
+    """Duurzame job-queue; `jobs.Runner` claimt rijen met een atomische UPDATE ... RETURNING."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    type = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=True)
+    status = Column(String(10), nullable=False, default=JOB_QUEUED)  # queued/running/done/failed
+    attempts = Column(Integer, nullable=False, default=0)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # niet eerder starten (backoff)
+    locked_by = Column(String(100), nullable=True)  # worker (host:pid)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_jobs_ready", "status", "type", "run_at"),
+    )
+
+
+# Leesmodellen (profile_tags, published_ads, FTS-index) volgen HorseProfile/RiderProfile
+# via mapper events. Hier registreren, zodat elk proces dat via de ORM schrijft (API,
+# python -m jobs, python -m moderation, scripts) ze bijwerkt, niet alleen de API.
+import fulltext  # noqa: E402,F401
+import published_ads  # noqa: E402,F401
+import tags  # noqa: E402,F401
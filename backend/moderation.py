@@ -0,0 +1,261 @@
+"""Meldingen van misbruik: snelle queue in de request, verwerking in een worker.
+
+`POST /abuse/report` doet één INSERT in `abuse_reports` en is klaar. De
+worker pakt per batch (BATCH_SIZE) de onverwerkte meldingen en:
+
+- telt ze op bij de `moderation_cases` rij van het doel (paard of media-URL),
+  zodat een veelgemelde advertentie één zaak blijft met een teller;
+- ontdubbelt per melder: dezelfde gebruiker telt per zaak één keer;
+- draait content checks alleen bij een nieuwe zaak (niet per melding);
+- logt één audit-regel per zaak per batch en markeert de meldingen
+  (`processed_at`, `case_id`, `outcome`).
+
+De worker draait standaard in het API-proces (MODERATION_WORKER=inline) of
+los: `python -m moderation [--once]` (dan MODERATION_WORKER=off in de API).
+Met Postgres kunnen meerdere workers naast elkaar draaien (SKIP LOCKED).
+
+Content checks (optioneel): MODERATION_KEYWORDS (komma-gescheiden woorden
+in titel/omschrijving) en Azure Content Safety met CONTENT_SAFETY_ENDPOINT +
+CONTENT_SAFETY_KEY als de SDK geïnstalleerd is.
+"""
+import argparse
+import asyncio
+import importlib.util
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import and_, insert, or_, select, update
+
+from database import SessionLocal
+from metrics import MODERATION_REPORTS
+from models import AbuseReport, HorseProfile, ModerationCase
+
+log = logging.getLogger("horsesharing.moderation")
+
+BATCH_SIZE = 500
+POLL_SECONDS = float(os.getenv("MODERATION_POLL_SECONDS", "2"))
+
+def _has_module(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
+
+# Optional Azure Content Safety; de SDK pas bij de eerste check importeren
+CONTENT_SAFETY_AVAILABLE = _has_module("azure.ai.contentsafety")
+
+
+def enqueue(db, reporter_key, target_type, target_key, reason, comment=None):
+    """Melding in de queue; één INSERT, geen lookups."""
+    db.execute(insert(AbuseReport).values(
+        target_type=target_type, target_key=target_key, reason=reason, comment=comment,
+        reporter_key=reporter_key, created_at=datetime.utcnow(),
+    ))
+    db.commit()
+
+
+# -----------------------------
+# Content checks (alleen voor nieuwe zaken)
+# -----------------------------
+
+def _horse_text(db, horse_id):
+    row = db.execute(
+        select(HorseProfile.name, HorseProfile.title, HorseProfile.description).where(HorseProfile.id == horse_id)
+    ).first()
+    return " ".join(filter(None, row)) if row else ""
+
+
+def keyword_check(db, case):
+    words = [w.strip().lower() for w in os.getenv("MODERATION_KEYWORDS", "").split(",") if w.strip()]
+    if not words or case.target_type != "horse":
+        return {}
+    text = _horse_text(db, case.horse_id).lower()
+    hits = sorted(w for w in words if w in text)
+    return {"keywords": hits} if hits else {}
+
+
+def content_safety_check(db, case):
+    endpoint, key = os.getenv("CONTENT_SAFETY_ENDPOINT"), os.getenv("CONTENT_SAFETY_KEY")
+    if not (endpoint and key and CONTENT_SAFETY_AVAILABLE):
+        return {}
+    from azure.ai.contentsafety import ContentSafetyClient
+    from azure.ai.contentsafety.models import AnalyzeImageOptions, AnalyzeTextOptions, ImageData
+    from azure.core.credentials import AzureKeyCredential
+    client = ContentSafetyClient(endpoint, AzureKeyCredential(key))
+    if case.target_type == "horse":
+        text = _horse_text(db, case.horse_id)
+        if not text:
+            return {}
+        result = client.analyze_text(AnalyzeTextOptions(text=text[:10_000]))
+    elif case.target_key.startswith("https://"):
+        result = client.analyze_image(AnalyzeImageOptions(image=ImageData(blob_url=case.target_key)))
+    else:
+        return {}
+    severities = {str(c.category): c.severity for c in result.categories_analysis if c.severity}
+    return {"content_safety": severities} if severities else {}
+
+
+CONTENT_CHECKS = [keyword_check, content_safety_check]
+
+
+def run_checks(db, case):
+    flags = {}
+    for check in CONTENT_CHECKS:
+        try:
+            flags.update(check(db, case))
+        except Exception:
+            # Een check die faalt mag de verwerking van de batch niet blokkeren
+            log.warning("content check failed", exc_info=True, extra={"check": check.__name__, "case_id": case.id})
+    return flags
+
+
+# -----------------------------
+# Worker
+# -----------------------------
+
+def _load_cases(db, targets):
+    by_type = {}
+    for target_type, target_key in targets:
+        by_type.setdefault(target_type, set()).add(target_key)
+    clauses = [and_(ModerationCase.target_type == t, ModerationCase.target_key.in_(keys)) for t, keys in by_type.items()]
+    return {(c.target_type, c.target_key): c for c in db.scalars(select(ModerationCase).where(or_(*clauses)))}
+
+
+def process_batch(db):
+    """Verwerk maximaal BATCH_SIZE meldingen in één transactie; geeft het aantal terug."""
+    reports = db.execute(
+        select(AbuseReport.id, AbuseReport.target_type, AbuseReport.target_key, AbuseReport.reason,
+               AbuseReport.reporter_key, AbuseReport.created_at)
+        .where(AbuseReport.processed_at.is_(None))
+        .order_by(AbuseReport.id)
+        .limit(BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not reports:
+        return 0
+    now = datetime.utcnow()
+
+    targets = {(r.target_type, r.target_key) for r in reports}
+    horse_ids = {int(key) for t, key in targets if t == "horse" and key.isdigit()}
+    live_horses = set(db.scalars(select(HorseProfile.id).where(HorseProfile.id.in_(horse_ids)))) if horse_ids else set()
+
+    def valid(target_type, target_key):
+        return target_type != "horse" or (target_key.isdigit() and int(target_key) in live_horses)
+
+    cases = _load_cases(db, targets)
+    new_cases = []
+    for target_type, target_key in targets - set(cases):
+        if not valid(target_type, target_key):
+            continue
+        case = ModerationCase(
+            target_type=target_type, target_key=target_key, status="open", report_count=0, reasons={},
+            horse_id=int(target_key) if target_type == "horse" else None,
+            first_reported_at=min(r.created_at for r in reports if (r.target_type, r.target_key) == (target_type, target_key)),
+        )
+        db.add(case)
+        cases[(target_type, target_key)] = case
+        new_cases.append(case)
+    db.flush()
+
+    # Eerder getelde melders voor deze zaken
+    reporters = {r.reporter_key for r in reports}
+    seen = set(db.execute(
+        select(AbuseReport.case_id, AbuseReport.reporter_key).where(
+            AbuseReport.case_id.in_([c.id for c in cases.values()]),
+            AbuseReport.reporter_key.in_(reporters),
+            AbuseReport.outcome == "counted",
+        )
+    ).all())
+
+    updates, per_case = [], {}
+    for r in reports:
+        case = cases.get((r.target_type, r.target_key))
+        if case is None:
+            outcome = "invalid"
+        elif (case.id, r.reporter_key) in seen:
+            outcome = "duplicate"
+        else:
+            outcome = "counted"
+            seen.add((case.id, r.reporter_key))
+            case.report_count += 1
+            reasons = dict(case.reasons or {})
+            reasons[r.reason] = reasons.get(r.reason, 0) + 1
+            case.reasons = reasons
+            case.last_reported_at = max(case.last_reported_at or r.created_at, r.created_at)
+        if case is not None:
+            stats = per_case.setdefault(case.id, {"case": case, "counted": 0, "duplicate": 0})
+            stats[outcome] += 1
+        MODERATION_REPORTS.inc((outcome,))
+        updates.append({"id": r.id, "processed_at": now, "outcome": outcome, "case_id": case.id if case else None})
+
+    for case in new_cases:
+        flags = run_checks(db, case)
+        if flags:
+            case.flags = flags
+
+    db.execute(update(AbuseReport), updates)
+    db.commit()
+
+    for case_id, stats in per_case.items():
+        case = stats["case"]
+        log.info("abuse reports processed", extra={
+            "case_id": case_id, "target_type": case.target_type, "target_key": case.target_key,
+            "new_reports": stats["counted"], "duplicates": stats["duplicate"],
+            "report_count": case.report_count, "flags": case.flags or {},
+        })
+    invalid = sum(1 for u in updates if u["outcome"] == "invalid")
+    if invalid:
+        log.info("abuse reports invalid", extra={"count": invalid})
+    return len(reports)
+
+
+def process_pending(session_factory=SessionLocal):
+    """Verwerk batches tot de queue leeg is; geeft het totaal terug."""
+    total = 0
+    with session_factory() as db:
+        while True:
+            n = process_batch(db)
+            total += n
+            if n < BATCH_SIZE:
+                return total
+
+
+async def run_worker(stop, session_factory=SessionLocal):
+    """Pollt de queue tot `stop` (asyncio.Event) gezet is, en maakt hem dan nog één keer leeg.
+
+    DB-werk draait in een thread, zodat de event loop vrij blijft.
+    """
+    while True:
+        stopping = stop.is_set()
+        try:
+            await asyncio.to_thread(process_pending, session_factory)
+        except Exception:
+            log.exception("moderation worker failed")
+        if stopping:
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def main():
+    from applog import setup_logging
+
+    parser = argparse.ArgumentParser(description="Verwerk de abuse_reports queue")
+    parser.add_argument("--once", action="store_true", help="queue één keer leegmaken en stoppen")
+    args = parser.parse_args()
+    setup_logging()
+    if args.once:
+        print(f"{process_pending()} meldingen verwerkt")
+        return
+    try:
+        asyncio.run(run_worker(asyncio.Event()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Keyset-paginatie met een opaque cursor.
+
+De cursor is base64url(JSON) van de sorteersleutel van het laatste item op
+de pagina; de client stuurt `next_cursor` ongewijzigd terug als `cursor=`.
+Anders dan bij offset blijft elke pagina één range-scan op de index, ook
+diep in de lijst, en verschuiven items niet als er tussendoor iets bijkomt.
+"""
+import base64
+import json
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(*key) -> str:
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int = 1) -> tuple:
+    """Cursor -> sleutel-tuple van `size` waarden; InvalidCursorError bij geknoei."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise InvalidCursorError("Ongeldige cursor")
+    if not isinstance(key, list) or len(key) != size:
+        raise InvalidCursorError("Ongeldige cursor")
+    return tuple(key)
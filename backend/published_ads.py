@@ -0,0 +1,97 @@
+"""Leesmodel `published_ads`: één smalle rij per gepubliceerd paard.
+
+Zoeken en lijsten lezen alleen deze tabel (plus profile_tags en de FTS-index
+op horse_id). De card view staat er voorgerenderd als JSON in en gaat
+ongewijzigd de response in; schedule-mask, geo-cel en prijs zijn gewone
+kolommen voor filters, dus geen JSON-decodering en geen brede rijen.
+
+De rij volgt `HorseProfile.status`: published -> upsert, draft/verwijderd ->
+weg. ORM writes (POST /owner/horses, bulk import, delete) lopen via mapper
+events; de Core UPDATE van patch_horse roept `refresh_ad` zelf aan met de
+RETURNING-waarden.
+"""
+import math
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import delete, event, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import PUBLISHED, HorseProfile, PublishedAd
+from responses import dumps
+from serializers import compile_horse_serializer, horse_columns
+
+# ~11 x 7 km in Nederland; een radius-zoekopdracht kan eerst op de omliggende cellen filteren
+GEO_CELL_DEGREES = 0.1
+
+SOURCE_COLUMNS = tuple(sorted(set(horse_columns("card")) | {
+    "owner_profile_id", "available_mask", "min_days_per_week",
+    "stable_lat", "stable_lon", "cost_model", "cost_amount", "updated_at",
+}))
+
+_render_card = compile_horse_serializer("card", is_owner=False)
+_INSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
+
+def geo_cell(lat, lon):
+    """(52.09, 5.12) -> "520:51"; None zonder coördinaten."""
+    if lat is None or lon is None:
+        return None
+    return f"{math.floor(lat / GEO_CELL_DEGREES)}:{math.floor(lon / GEO_CELL_DEGREES)}"
+
+
+def ad_values(row):
+    """Bronkolommen van een paard (dict met SOURCE_COLUMNS) -> rij voor published_ads."""
+    return {
+        "horse_id": row["id"],
+        "owner_profile_id": row["owner_profile_id"],
+        "card": dumps(_render_card(SimpleNamespace(**row))).decode(),
+        "available_mask": row["available_mask"] or 0,
+        "min_days_per_week": row["min_days_per_week"],
+        "geo_cell": geo_cell(row["stable_lat"], row["stable_lon"]),
+        "lat": row["stable_lat"],
+        "lon": row["stable_lon"],
+        "cost_model": row["cost_model"],
+        "cost_amount": row["cost_amount"],
+        "updated_at": row["updated_at"] or datetime.utcnow(),
+    }
+
+
+def refresh_ad(connection, row):
+    """Upsert voor een gepubliceerd paard, anders de rij verwijderen."""
+    if row["status"] != PUBLISHED:
+        remove_ad(connection, row["id"])
+        return
+    values = ad_values(row)
+    stmt = _INSERTS[connection.dialect.name](PublishedAd).values(values)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[PublishedAd.horse_id],
+        set_={k: stmt.excluded[k] for k in values if k != "horse_id"},
+    ))
+
+
+def remove_ad(connection, horse_id):
+    connection.execute(delete(PublishedAd).where(PublishedAd.horse_id == horse_id))
+
+
+def _row(target):
+    return {c: getattr(target, c) for c in SOURCE_COLUMNS}
+
+
+@event.listens_for(HorseProfile, "after_insert")
+def _ads_after_insert(mapper, connection, target):
+    if target.status == PUBLISHED:
+        refresh_ad(connection, _row(target))
+
+
+@event.listens_for(HorseProfile, "after_update")
+def _ads_after_update(mapper, connection, target):
+    # updated_at (sortering) wijzigt bij elke update, dus een gepubliceerd paard altijd verversen
+    if target.status == PUBLISHED or inspect(target).attrs.status.history.has_changes():
+        refresh_ad(connection, _row(target))
+
+
+@event.listens_for(HorseProfile, "after_delete")
+def _ads_after_delete(mapper, connection, target):
+    remove_ad(connection, target.id)
@@ -0,0 +1,290 @@
+"""Rate limiting per gebruiker en per IP met token buckets (ASGI middleware).
+
+Alleen routes in `RULES` worden begrensd: dure endpoints die externe quota
+opmaken (PDOK/OSM bij /geo/lookup), workers bezet houden (uploads, de
+SSE-stream) of zich lenen voor spam (/abuse/report). Elke regel heeft een bucket per gebruiker
+en een ruimere per IP, omdat een NAT of kantoor één adres deelt. Een request
+kost pas een token als alle buckets het toelaten; is er één leeg, dan volgt 429
+met `Retry-After` (seconden tot er weer een token is).
+
+De middleware draait vóór de auth-dependency en kan een token niet zelf
+verifiëren (dat is een Kinde-call). `auth.get_current_user` onthoudt daarom
+per geverifieerd token (gehasht) de user id; de user-bucket gebruikt die id.
+Een onbekend of verzonnen token telt alleen in de IP-bucket, dus een nieuw
+token per request levert geen nieuwe bucket op.
+
+Backends:
+    memory  per proces; genoeg voor één worker (default)
+    sqlite  gedeeld bestand (RATE_LIMIT_DB), voor meerdere workers op één host
+
+Configuratie via env: RATE_LIMIT_ENABLED (1), RATE_LIMIT_BACKEND (memory),
+RATE_LIMIT_DB (rate_limits.db naast de app), RATE_LIMIT_TRUST_PROXY (0; met 1
+telt het laatste adres uit X-Forwarded-For, gezet door de eigen proxy).
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from metrics import RATE_LIMITED
+from responses import dumps
+
+log = logging.getLogger("horsesharing.ratelimit")
+
+
+class Limit(NamedTuple):
+    per_minute: float
+    burst: int
+
+    @property
+    def rate(self):
+        return self.per_minute / 60
+
+
+# (methode, pad) -> {"user": Limit, "ip": Limit}
+RULES = {
+    ("GET", "/geo/lookup"): {"user": Limit(30, 10), "ip": Limit(120, 30)},
+    ("POST", "/media/upload"): {"user": Limit(20, 10), "ip": Limit(60, 20)},
+    ("POST", "/abuse/report"): {"user": Limit(10, 5), "ip": Limit(30, 10)},
+    # Reconnect-stormen (bv. na een deploy) afvlakken; de client wacht dan Retry-After
+    ("GET", "/events"): {"user": Limit(20, 10), "ip": Limit(120, 60)},
+}
+
+
+def take(tokens, updated, now, limit):
+    """Token bucket: (toegestaan, nieuwe stand, wachttijd in seconden).
+
+    `tokens`/`updated` None = nieuwe (volle) bucket.
+    """
+    if tokens is None:
+        tokens = float(limit.burst)
+    else:
+        tokens = min(float(limit.burst), tokens + (now - updated) * limit.rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / limit.rate
+
+
+def _take_all(states, buckets, now):
+    """[(tokens, updated)] per bucket -> [(toegestaan, nieuwe stand, wachttijd)]."""
+    return [take(tokens, updated, now, limit) for (tokens, updated), (_, limit) in zip(states, buckets)]
+
+
+class MemoryBackend:
+    """Buckets in een dict; bij MAX_KEYS worden buckets die al weer vol zijn opgeruimd."""
+
+    MAX_KEYS = 100_000
+    blocking = False
+
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated, limit)
+        self._lock = threading.Lock()
+
+    def hit(self, buckets, now):
+        """[(key, Limit)] -> wachttijd per bucket (0.0 = toegestaan).
+
+        Alleen als alle buckets het toelaten wordt er uit elk een token genomen.
+        """
+        with self._lock:
+            results = _take_all([self._buckets.get(key, (None, None))[:2] for key, _ in buckets], buckets, now)
+            if all(allowed for allowed, _, _ in results):
+                for (key, limit), (_, tokens, _) in zip(buckets, results):
+                    self._buckets[key] = (tokens, now, limit)
+                if len(self._buckets) > self.MAX_KEYS:
+                    self._sweep(now)
+        return [wait for _, _, wait in results]
+
+    def _sweep(self, now):
+        self._buckets = {
+            key: state for key, state in self._buckets.items()
+            if state[0] + (now - state[1]) * state[2].rate < state[2].burst
+        }
+
+
+class SQLiteBackend:
+    """Buckets in een SQLite-bestand, gedeeld tussen worker-processen.
+
+    Eén connectie per thread; lezen + schrijven in één `BEGIN IMMEDIATE`
+    transactie, zodat twee workers dezelfde token niet allebei uitgeven.
+    Blokkeert (busy timeout), dus de middleware roept `hit` in een thread aan.
+
+    Net als MemoryBackend._sweep ruimt `hit` zelf op: hooguit eens per
+    PRUNE_EVERY_SECONDS, in dezelfde transactie, gaan buckets weg die
+    IDLE_SECONDS niet gebruikt zijn (die zijn voor elke regel in RULES
+    allang weer vol, dus weghalen verandert niets aan de limieten).
+    """
+
+    blocking = True
+    IDLE_SECONDS = 3600
+    PRUNE_EVERY_SECONDS = 60
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._next_prune = 0.0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, buckets, now):
+        """Zie MemoryBackend.hit."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            states = [
+                conn.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone() or (None, None)
+                for key, _ in buckets
+            ]
+            results = _take_all(states, buckets, now)
+            if all(allowed for allowed, _, _ in results):
+                conn.executemany(
+                    "INSERT INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    [(key, tokens, now) for (key, _), (_, tokens, _) in zip(buckets, results)],
+                )
+            if now >= self._next_prune:
+                self._next_prune = now + self.PRUNE_EVERY_SECONDS
+                self.prune(now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return [wait for _, _, wait in results]
+
+    def prune(self, now=None):
+        """Verwijder buckets die IDLE_SECONDS niet gebruikt zijn (`hit` doet dit zelf periodiek)."""
+        now = time.time() if now is None else now
+        self._connection().execute("DELETE FROM rate_buckets WHERE updated < ?", (now - self.IDLE_SECONDS,))
+
+
+def backend_from_env():
+    kind = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    if kind == "sqlite":
+        path = os.getenv("RATE_LIMIT_DB") or os.path.join(os.path.dirname(__file__), "rate_limits.db")
+        return SQLiteBackend(path)
+    if kind != "memory":
+        raise ValueError(f"onbekende RATE_LIMIT_BACKEND: {kind}")
+    return MemoryBackend()
+
+
+def _header(scope, name):
+    for key, value in scope.get("headers") or ():
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_ip(scope, trust_proxy=False):
+    if trust_proxy:
+        forwarded = _header(scope, b"x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[-1].strip()
+    client = scope.get("client")
+    return client[0] if client else "-"
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.strip().encode()).hexdigest()[:24]
+
+
+class VerifiedTokens:
+    """Token-hash -> user id van tokens die de auth-dependency geverifieerd heeft (LRU met TTL, per proces)."""
+
+    MAX_TOKENS = 50_000
+    TTL_SECONDS = 3600
+
+    def __init__(self):
+        self._data = OrderedDict()  # hash -> (user id, tot)
+        self._lock = threading.Lock()
+
+    def remember(self, token, user_id):
+        key = _token_hash(token)
+        with self._lock:
+            self._data[key] = (user_id, time.monotonic() + self.TTL_SECONDS)
+            self._data.move_to_end(key)
+            while len(self._data) > self.MAX_TOKENS:
+                self._data.popitem(last=False)
+
+    def user_id(self, token):
+        with self._lock:
+            entry = self._data.get(_token_hash(token))
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+
+verified_tokens = VerifiedTokens()
+
+
+def user_key(scope, tokens=verified_tokens):
+    """User id achter het Bearer token; None zonder token of als het (nog) niet geverifieerd is."""
+    auth = _header(scope, b"authorization") or ""
+    if not auth.lower().startswith("bearer "):
+        return None
+    user_id = tokens.user_id(auth[7:])
+    return None if user_id is None else str(user_id)
+
+
+class RateLimitMiddleware:
+    """ASGI middleware: 429 + Retry-After als de user- of IP-bucket voor de route leeg is."""
+
+    def __init__(self, app, backend=None, rules=None):
+        self.app = app
+        self.enabled = os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+        self.backend = backend or (backend_from_env() if self.enabled else None)
+        self.rules = RULES if rules is None else rules
+        self.trust_proxy = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            return await self.app(scope, receive, send)
+        route = (scope["method"], scope["path"])
+        rules = self.rules.get(route)
+        if not rules:
+            return await self.app(scope, receive, send)
+
+        keys = (("user", user_key(scope)), ("ip", client_ip(scope, self.trust_proxy)))
+        kinds = [kind for kind, key in keys if key is not None and kind in rules]
+        buckets = [(f"{kind}:{route[0]} {route[1]}:{key}", rules[kind]) for kind, key in keys if kind in kinds]
+        try:
+            if self.backend.blocking:
+                waits = await asyncio.to_thread(self.backend.hit, buckets, time.time())
+            else:
+                waits = self.backend.hit(buckets, time.time())
+        except sqlite3.Error:
+            # Backend stuk (lock timeout, schijf vol): liever doorlaten dan de API platleggen
+            log.warning("rate limit backend error", exc_info=True)
+            return await self.app(scope, receive, send)
+        wait, limited_by = max(zip(waits, kinds), default=(0.0, None))
+        if wait <= 0:
+            return await self.app(scope, receive, send)
+
+        RATE_LIMITED.inc((route[0], route[1], limited_by))
+        body = dumps({"detail": "Te veel verzoeken, probeer het later opnieuw"})
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
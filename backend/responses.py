@@ -0,0 +1,59 @@
+"""Snelle JSON responses.
+
+`FastJSONResponse` rendert met orjson (dates/datetimes native) en valt terug op
+stdlib json als orjson niet geïnstalleerd is. Handlers die een brede payload
+teruggeven (paarden, ruiterprofiel) geven de response direct terug, zodat
+FastAPI's `jsonable_encoder` helemaal wordt overgeslagen.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+
+# Optional orjson
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj):
+    """Types die orjson/json niet zelf kennen (en date/datetime voor de stdlib fallback)."""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def splice_json(content: dict, key: str, fragments) -> bytes:
+    """`content` plus `key: [...]` uit vooraf geserialiseerde JSON-objecten (bytes), zonder die te decoderen."""
+    head = dumps(content)
+    items = b"[" + b",".join(fragments) + b"]"
+    return head[:-1] + (b"," if len(head) > 2 else b"") + dumps(key) + b":" + items + b"}"
+
+
+def with_field(fragment: bytes, key: str, value) -> bytes:
+    """Voeg één veld toe aan een geserialiseerd JSON-object."""
+    return fragment[:-1] + (b"," if len(fragment) > 2 else b"") + dumps(key) + b":" + dumps(value) + b"}"
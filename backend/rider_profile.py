@@ -0,0 +1,303 @@
+"""POST /rider-profile: getypeerd schema + declaratieve mapping naar RiderProfile.
+
+`RiderProfileCreate` wordt door FastAPI één keer geparsed en gevalideerd.
+`FIELDS` (payload-key -> (kolom, converter)) wordt door create en update
+gedeeld; alleen de semantiek verschilt:
+
+- create: alle velden inclusief schema-defaults (+ `CREATE_FALLBACKS` voor
+  verplichte/lege kolommen), zoals de wizard bij de eerste stap verwacht;
+- update: alleen velden die de client echt meestuurt (`model_fields_set`),
+  zodat tussentijds opslaan van één tab de rest niet overschrijft.
+"""
+from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, field_validator
+
+from models import RiderProfile
+
+
+class RiderProfileCreate(BaseModel):
+    # Basis informatie - allemaal optioneel voor tussentijds opslaan
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    phone: Optional[str] = None
+    date_of_birth: Optional[str] = None  # dd-mm-yyyy of yyyy-mm-dd
+    postcode: Optional[str] = None
+    house_number: Optional[str] = None
+    house_number_addition: Optional[str] = None
+    street: Optional[str] = None
+    city: Optional[str] = None
+    country_code: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    geocode_confidence: Optional[float] = None
+    needs_review: Optional[bool] = None
+    max_travel_distance_km: Optional[int] = 25
+    transport_options: List[str] = []
+
+    # Beschikbaarheid
+    available_days: List[str] = []
+    available_time_blocks: List[str] = []
+    available_schedule: Optional[dict] = None  # { 'maandag': ['ochtend','avond'], ... }, wint van de arrays
+    session_duration_min: Optional[int] = 60
+    session_duration_max: Optional[int] = 120
+    min_days_per_week: Optional[int] = None
+    start_date: Optional[date] = None
+    arrangement_duration: Optional[str] = None
+
+    # Budget
+    budget_min_euro: Optional[int] = None
+    budget_max_euro: Optional[int] = None
+    budget_type: Optional[str] = 'monthly'  # niet opgeslagen
+
+    # Ervaring
+    experience_years: Optional[int] = None
+    certification_level: Optional[str] = None  # legacy, niet opgeslagen
+    certifications: List[str] = []
+    comfort_levels: dict = {}
+    riding_styles: List[str] = []
+    general_skills: List[str] = []
+
+    # Doelen
+    riding_goals: List[str] = []
+    discipline_preferences: List[str] = []
+    personality_style: List[str] = []
+    desired_horse: Optional[dict] = None
+    lease_preferences: Optional[dict] = None
+    # Activiteiten
+    activity_mode: Optional[str] = None  # care_only | ride_or_care | ride_only | drive_only
+    activity_preferences: List[str] = []
+    mennen_experience: Optional[str] = None
+
+    # Taken
+    willing_tasks: List[str] = []
+    task_frequency: Optional[str] = None
+
+    # Voorkeuren
+    material_preferences: dict = {}
+    health_restrictions: List[str] = []
+    insurance_coverage: Optional[bool] = False
+    no_gos: List[str] = []
+
+    # Media
+    photos: List[str] = []
+    videos: Optional[List[str]] = None
+    video_intro_url: Optional[str] = None
+
+    # Minderjarig / fysiek
+    parent_consent: Optional[bool] = None
+    parent_contact: Optional[str] = None
+    rider_height_cm: Optional[int] = None
+    rider_weight_kg: Optional[int] = None
+    rider_bio: Optional[str] = None
+
+    @field_validator(
+        'max_travel_distance_km', 'session_duration_min', 'session_duration_max', 'min_days_per_week',
+        'budget_min_euro', 'budget_max_euro', 'experience_years', 'rider_height_cm', 'rider_weight_kg',
+        'start_date', mode='before',
+    )
+    @classmethod
+    def _blank_is_none(cls, value):
+        # formulieren sturen een leeg invoerveld als ""
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+
+def _country(value):
+    return value.upper()[:2]
+
+
+def _start_date(value):
+    return datetime.combine(value, datetime.min.time())
+
+
+FIELDS = {
+    # Adres / geo
+    'postcode': ('postcode', None),
+    'house_number': ('house_number', None),
+    'house_number_addition': ('house_number_addition', None),
+    'street': ('street', None),
+    'city': ('city', None),
+    'country_code': ('country_code', _country),
+    'lat': ('lat', None),
+    'lon': ('lon', None),
+    'geocode_confidence': ('geocode_confidence', None),
+    'needs_review': ('needs_review', None),
+    'max_travel_distance_km': ('max_travel_distance', None),
+    'transport_options': ('transport_options', None),
+    # Beschikbaarheid
+    'session_duration_min': ('session_duration_min', None),
+    'session_duration_max': ('session_duration_max', None),
+    'min_days_per_week': ('min_days_per_week', None),
+    'start_date': ('start_date', _start_date),
+    'arrangement_duration': ('duration_preference', None),
+    # Budget
+    'budget_min_euro': ('budget_min', None),
+    'budget_max_euro': ('budget_max', None),
+    # Ervaring / doelen
+    'experience_years': ('years_experience', None),
+    'certifications': ('certifications', None),
+    'riding_styles': ('riding_styles', None),
+    'general_skills': ('general_skills', None),
+    'riding_goals': ('goals', None),
+    'discipline_preferences': ('discipline_preferences', None),
+    'personality_style': ('personality_style', None),
+    'desired_horse': ('desired_horse', None),
+    'lease_preferences': ('lease_preferences', None),
+    # Activiteiten (genormaliseerd in normalize_activities)
+    'activity_mode': ('activity_mode', None),
+    'activity_preferences': ('activity_preferences', None),
+    'mennen_experience': ('mennen_experience', None),
+    # Taken / voorkeuren
+    'willing_tasks': ('willing_tasks', None),
+    'task_frequency': ('task_frequency', None),
+    'health_restrictions': ('health_limitations', None),
+    'insurance_coverage': ('has_insurance', bool),
+    'no_gos': ('no_gos', None),
+    # Media
+    'photos': ('photos', None),
+    'videos': ('videos', None),
+    'video_intro_url': ('video_intro', None),
+    # Minderjarig / fysiek
+    'parent_consent': ('parent_consent', None),
+    'parent_contact': ('parent_contact', None),
+    'rider_height_cm': ('rider_height_cm', None),
+    'rider_weight_kg': ('rider_weight_kg', None),
+    'rider_bio': ('rider_bio', None),
+}
+
+# comfort_levels / material_preferences sub-keys -> kolom; None laat de kolom ongemoeid
+COMFORT_MAP = {
+    'traffic': ('comfortable_with_traffic', bool),
+    'outdoor_solo': ('comfortable_solo_outside', bool),
+    'jumping_height': ('max_jump_height', int),
+    'nervous_horses': ('comfortable_with_nervous_horses', bool),
+    'young_horses': ('comfortable_with_young_horses', bool),
+    'stallions': ('comfortable_with_stallions', bool),
+    'trail_rides': ('comfortable_with_trail_rides', bool),
+}
+MATERIAL_MAP = {
+    'bitless_ok': ('bitless_ok', bool),
+    'auxiliary_reins': ('training_aids_ok', bool),
+    'spurs': ('spurs_ok', bool),
+}
+
+# Create: verplichte kolommen / historische lege waarden als de wizard nog niets stuurde
+CREATE_FALLBACKS = {
+    'postcode': '',
+    'house_number': '',
+    'city': '',
+    'max_travel_distance': 25,
+    'task_frequency': '',
+    'video_intro': '',
+}
+# Create: lege waarden opslaan als NULL
+CREATE_EMPTY_AS_NULL = {'house_number_addition', 'street', 'country_code', 'videos', 'lease_preferences', 'rider_bio'}
+# Update: null betekent "niet meegestuurd" (geen wisactie)
+UPDATE_KEEP_ON_NULL = {'desired_horse', 'lease_preferences'}
+
+DEFAULT_AGE = 25
+
+CARE_KEYS = ['verzorging', 'grondwerk', 'longeren', 'hand_walking', 'pasture_turnout', 'medical_assist']
+RIDE_KEYS = ['buitenritten', 'dressuur_training', 'springen_training']
+
+
+def parse_date_of_birth(value):
+    """dd-mm-yyyy of yyyy-mm-dd -> date; None bij leeg of ongeldig."""
+    for fmt in ("%d-%m-%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value or "", fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def age_on(dob, today=None):
+    today = today or date.today()
+    return max(today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day)), 0)
+
+
+def _nested(source, mapping):
+    values = {}
+    for key, (column, convert) in mapping.items():
+        raw = source.get(key)
+        if raw is None:
+            continue
+        try:
+            values[column] = convert(raw)
+        except (TypeError, ValueError):
+            continue
+    return values
+
+
+def build_values(payload: RiderProfileCreate, create: bool):
+    """Schema -> {kolom: waarde} voor RiderProfile (exclusief user-velden)."""
+    sent = payload.model_fields_set
+    columns = RiderProfile.__table__.c
+    values = {}
+    for key, (column, convert) in FIELDS.items():
+        if not create and key not in sent:
+            continue
+        value = getattr(payload, key)
+        if value is None:
+            if not create and (column in UPDATE_KEEP_ON_NULL or not columns[column].nullable):
+                continue
+        elif convert is not None:
+            value = convert(value)
+        if create:
+            if column in CREATE_EMPTY_AS_NULL and not value:
+                value = None
+            elif value in ('', None) and column in CREATE_FALLBACKS:
+                value = CREATE_FALLBACKS[column]
+        values[column] = value
+
+    values.update(_nested(payload.comfort_levels or {}, COMFORT_MAP))
+    values.update(_nested(payload.material_preferences or {}, MATERIAL_MAP))
+
+    # Beschikbaarheid: per-dag schema wint; anders dezelfde blokken voor alle gekozen dagen
+    if payload.available_schedule is not None:
+        values['available_days'] = payload.available_schedule
+    elif create or payload.available_days or payload.available_time_blocks:
+        values['available_days'] = {d: list(payload.available_time_blocks) for d in payload.available_days}
+
+    dob = parse_date_of_birth(payload.date_of_birth) if payload.date_of_birth else None
+    if dob is not None:
+        values['date_of_birth'] = dob
+        values['age'] = age_on(dob)
+    elif create:
+        values['age'] = DEFAULT_AGE
+    return values
+
+
+def normalize_activities(profile: RiderProfile):
+    """Houd activiteiten consistent met activity_mode."""
+    mode = profile.activity_mode
+    if mode == 'care_only':
+        profile.activity_preferences = [k for k in (profile.activity_preferences or []) if k in CARE_KEYS]
+        profile.mennen_experience = None
+        profile.goals = []
+        profile.discipline_preferences = []
+    elif mode == 'ride_only':
+        profile.activity_preferences = []
+        profile.mennen_experience = None
+    elif mode == 'drive_only':
+        profile.activity_preferences = []
+        profile.goals = []
+        profile.discipline_preferences = []
+    elif mode == 'ride_or_care':
+        allowed = set(CARE_KEYS + RIDE_KEYS)
+        profile.activity_preferences = [k for k in (profile.activity_preferences or []) if k in allowed]
+        profile.mennen_experience = None
+
+
+def user_changes(payload: RiderProfileCreate, user):
+    """Naam/telefoon die afwijken van de huidige user (voor lokale update + Kinde sync)."""
+    changes = {}
+    name = ' '.join(p for p in (payload.first_name, payload.last_name) if p)
+    if name and name != user.name:
+        changes['name'] = name
+    if payload.phone and payload.phone != user.phone:
+        changes['phone'] = payload.phone
+    return changes
@@ -0,0 +1,10 @@
+"""API-routes per domein, elk op een eigen `APIRouter` (tag = modulenaam).
+
+`main.create_app` hangt ze aan de app. De profiel-dependencies staan in
+auth.py (`current_owner`, `current_rider`, ...), zodat alle routers dezelfde
+per-request gecachte uitkomst gebruiken.
+"""
+from routers import abuse, auth, events, geo, horses, media, owner, rider
+
+ROUTERS = [auth.router, geo.router, media.router, owner.router, horses.router, rider.router, abuse.router,
+           events.router]
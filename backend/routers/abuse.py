@@ -0,0 +1,44 @@
+"""Meldingen van misbruik; de verwerking doet de moderatie-worker (moderation.py)."""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from auth import get_current_user
+from database import get_db
+from models import REPORT_REASONS, REPORT_TARGETS, User
+from moderation import enqueue as enqueue_report
+
+router = APIRouter(tags=["abuse"])
+
+class AbuseReportPayload(BaseModel):
+    target_type: str  # 'horse' of 'media'
+    horse_id: Optional[int] = None
+    media_url: Optional[str] = None
+    reason: str
+    comment: Optional[str] = None
+
+@router.post("/abuse/report", status_code=202)
+async def report_abuse(
+    payload: AbuseReportPayload,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Melding van een advertentie of foto. Alleen in de queue zetten; ontdubbelen,
+    optellen per advertentie/URL en content checks doet de worker (moderation.py)."""
+    if payload.target_type not in REPORT_TARGETS:
+        raise HTTPException(status_code=422, detail=f"target_type moet {' of '.join(REPORT_TARGETS)} zijn")
+    if payload.reason not in REPORT_REASONS:
+        raise HTTPException(status_code=422, detail=f"reason moet een van {', '.join(REPORT_REASONS)} zijn")
+    if payload.target_type == "horse":
+        if not payload.horse_id:
+            raise HTTPException(status_code=422, detail="horse_id is verplicht")
+        target_key = str(payload.horse_id)
+    else:
+        target_key = (payload.media_url or "").strip()
+        if not target_key or len(target_key) > 500:
+            raise HTTPException(status_code=422, detail="media_url is verplicht (max 500 tekens)")
+    comment = (payload.comment or "").strip()[:1000] or None
+    enqueue_report(db, f"user:{current_user.id}", payload.target_type, target_key, payload.reason, comment)
+    return {"status": "received"}
@@ -0,0 +1,164 @@
+"""Ingelogde gebruiker: /auth/me, rolkeuze, onboarding en publicatiestatus."""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from auth import current_owner, current_rider, get_current_user, load_user, require_rider
+from concurrency import commit_versioned
+from database import get_db
+from models import DRAFT, PUBLISHED, OwnerProfile, RiderProfile, User
+from responses import FastJSONResponse
+
+router = APIRouter(tags=["auth"])
+
+@router.get("/auth/me")
+async def get_me(request: Request, current_user: User = Depends(get_current_user)):
+    """Get current authenticated user info"""
+    # Probeer Kinde claims op te halen voor leading weergave
+    kinde_claims = {}
+    try:
+        auth_header = request.headers.get("authorization") or request.headers.get("Authorization")
+        if auth_header and auth_header.lower().startswith("bearer "):
+            token = auth_header.split(" ", 1)[1]
+            # Lazy import to avoid circular
+            from auth import verify_kinde_token
+            kinde_claims = verify_kinde_token(token) or {}
+    except Exception:
+        kinde_claims = {}
+
+    # Haal mogelijke naamvelden uit claims
+    given = (kinde_claims.get("given_name") or kinde_claims.get("first_name") or "").strip()
+    family = (kinde_claims.get("family_name") or kinde_claims.get("last_name") or "").strip()
+    full_claim_name = (given + (" " + family if family else "")).strip() or (kinde_claims.get("name") or "").strip()
+
+    return FastJSONResponse({
+        "id": current_user.id,
+        "kinde_id": current_user.kinde_id,
+        "email": current_user.email,
+        "name": current_user.name,
+        "phone": current_user.phone,
+        "owner_photo_url": (current_user.owner_profile.photo_url if current_user.owner_profile else None),
+        # Extra: wat Kinde zelf zegt (leading)
+        "kinde_given_name": given,
+        "kinde_family_name": family,
+        "kinde_full_name": full_claim_name,
+        "onboarding_completed": current_user.onboarding_completed,
+        "profile_type_chosen": current_user.profile_type_chosen,
+        "has_rider_profile": current_user.rider_profile is not None,
+        "rider_status": current_user.rider_profile.status if current_user.rider_profile else None,
+        "has_owner_profile": current_user.owner_profile is not None,
+        "created_at": current_user.created_at
+    })
+
+class SetRolePayload(BaseModel):
+    role: str  # 'rider' or 'owner'
+
+@router.post("/auth/set-role")
+async def set_role(
+    payload: SetRolePayload,
+    current_user: User = Depends(get_current_user),
+    owner: Optional[OwnerProfile] = Depends(current_owner),
+    rider: Optional[RiderProfile] = Depends(current_rider),
+    db: Session = Depends(get_db)
+):
+    role = (payload.role or '').strip().lower()
+    if role not in ("rider", "owner"):
+        raise HTTPException(status_code=400, detail="Invalid role")
+
+    # Profielen zijn al meegeladen door get_current_user (geen extra queries)
+    if role == "owner":
+        if owner is None:
+            raise HTTPException(status_code=400, detail="Owner profile not found")
+    else:
+        if rider is None:
+            raise HTTPException(status_code=400, detail="Rider profile not found")
+
+    user_id = current_user.id
+    current_user.profile_type_chosen = role
+    db.add(current_user)
+    db.commit()
+    # Eén query herlaadt user + profielen (i.p.v. refresh + lazy loads)
+    current_user = load_user(db, User.id == user_id)
+    # Return same shape as /auth/me
+    return await get_me(Request(scope={"type": "http", "headers": []}), current_user)
+
+class ProfileTypeRequest(BaseModel):
+    profile_type: str
+
+@router.post("/auth/set-profile-type")
+async def set_profile_type(
+    request: ProfileTypeRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Set profile type choice (rider/owner)"""
+    current_user.profile_type_chosen = request.profile_type
+    db.commit()
+    db.refresh(current_user)
+    
+    return {"message": "Profile type set", "profile_type": request.profile_type}
+
+@router.post("/auth/reset-profile")
+async def reset_profile(
+    current_user: User = Depends(get_current_user),
+    rider: Optional[RiderProfile] = Depends(current_rider),
+    db: Session = Depends(get_db)
+):
+    """Reset user profile - delete rider/owner profiles and reset onboarding"""
+    # Delete rider profile if exists
+    if rider:
+        db.delete(rider)
+    
+    # TODO: Delete owner profile when implemented
+    # owner_profile = db.query(OwnerProfile).filter(OwnerProfile.user_id == current_user.id).first()
+    # if owner_profile:
+    #     db.delete(owner_profile)
+    
+    # Reset user onboarding status
+    current_user.onboarding_completed = False
+    current_user.profile_type_chosen = None
+    
+    db.commit()
+    db.refresh(current_user)
+    
+    return {"message": "Profile reset successfully"}
+
+@router.post("/auth/complete-onboarding")
+async def complete_onboarding(
+    profile_type: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark onboarding as completed and set profile type (publiceert het ruiterprofiel)"""
+    current_user.onboarding_completed = True
+    current_user.profile_type_chosen = profile_type
+    if profile_type == "rider" and current_user.rider_profile is not None:
+        current_user.rider_profile.status = PUBLISHED
+    db.commit()
+    db.refresh(current_user)
+    
+    return {"message": "Onboarding completed", "profile_type": profile_type}
+
+
+@router.post("/auth/set-published")
+async def set_published(
+    published: bool,
+    profile_type: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    profile: RiderProfile = Depends(require_rider),
+    db: Session = Depends(get_db)
+):
+    """Zet de publicatiestatus van het ruiterprofiel (draft/published). Optioneel profile_type updaten.
+
+    Publiceren rondt ook de onboarding af; terugzetten naar concept laat die staan.
+    """
+    profile.status = PUBLISHED if published else DRAFT
+    if published:
+        current_user.onboarding_completed = True
+    if profile_type:
+        current_user.profile_type_chosen = profile_type
+    commit_versioned(db, RiderProfile, profile.id)
+    return {"message": "Published status updated", "published": profile.status == PUBLISHED,
+            "status": profile.status, "profile_type": current_user.profile_type_chosen}
@@ -0,0 +1,42 @@
+"""Live updates via Server-Sent Events (zie events.py)."""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+import events
+from auth import get_current_user
+from database import get_db
+from models import PUBLISHED, HorseProfile, OwnerProfile, User
+
+router = APIRouter(tags=["events"])
+
+@router.get("/events")
+async def event_stream(
+    ads: Optional[str] = Query(None, description="Komma-gescheiden horse_ids om te volgen (max 50)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Server-Sent Events: matches van de gebruiker en wijzigingen aan de gevolgde advertenties (zie events.py)."""
+    try:
+        horse_ids = events.parse_ads(ads)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Ongeldige ads: {e}")
+    if events.broker.count >= events.MAX_CONNECTIONS:
+        raise HTTPException(status_code=503, detail="Te veel open verbindingen", headers={"Retry-After": "30"})
+    if horse_ids:
+        # Alleen gepubliceerde advertenties of eigen paarden; de rest (concept van een ander,
+        # verwijderd) stil overslaan, een client kan een verouderde lijst meesturen
+        owned = select(OwnerProfile.id).where(OwnerProfile.user_id == current_user.id)
+        horse_ids = db.scalars(
+            select(HorseProfile.id).where(
+                HorseProfile.id.in_(horse_ids),
+                or_(HorseProfile.status == PUBLISHED, HorseProfile.owner_profile_id.in_(owned)),
+            )
+        ).all()
+    channels = [f"user:{current_user.id}"] + [f"ad:{h}" for h in horse_ids]
+    # De DB-connectie niet vasthouden zolang de stream openstaat
+    db.close()
+    return StreamingResponse(events.stream(channels), media_type="text/event-stream", headers=events.STREAM_HEADERS)
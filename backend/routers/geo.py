@@ -0,0 +1,19 @@
+"""Geo lookup (PDOK NL + Nominatim fallback, zie geocode.py)."""
+from fastapi import APIRouter, HTTPException, Query
+
+import geocode
+
+router = APIRouter(tags=["geo"])
+
+
+@router.get("/geo/lookup")
+async def geo_lookup(
+    country: str = Query("NL", min_length=2, max_length=2),
+    postcode: str = Query(...),
+    number: str = Query(...),
+    addition: str = Query(""),
+):
+    res = geocode.lookup(country, postcode, number, addition)
+    if res is None:
+        raise HTTPException(status_code=404, detail="Adres niet gevonden")
+    return res
@@ -0,0 +1,487 @@
+"""Paarden van de eigenaar (CRUD, bulk, export) en advertenties (zoeken, detail)."""
+import logging
+from typing import Any, Optional
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, load_only
+
+from auth import current_owner, get_current_user, require_owner
+from availability import overlap_days, sql_overlap_blocks, sql_overlap_days
+from concurrency import check_version, commit_versioned, conflict, parse_if_match
+from database import get_db
+from fulltext import apply_fulltext
+from horse_bulk import FORMATS as BULK_FORMATS, BulkError, detect_format, export_horses, import_horses
+from horse_patch import HorsePayload, PatchError, build_values, parse_patch, patch_horse
+from httpcache import ad_detail_cache, etag_matches, make_etag, not_modified, render_cached, with_etag
+from models import DRAFT, PUBLISHED, STATUSES, HorseProfile, OwnerProfile, PublishedAd, RiderProfile, User
+from pagination import InvalidCursorError, decode_cursor, encode_cursor
+from responses import FastJSONResponse, splice_json, with_field
+from search import split_csv
+from serializers import UnknownFieldsError, compile_horse_serializer, horse_columns, parse_fields
+from tags import has_any_tag, only_tags_within, tags_for
+
+log = logging.getLogger("horsesharing.api")
+
+router = APIRouter(tags=["horses"])
+
+def _parse_horse_fields(view: str, fields: Optional[str]):
+    """`view`/`fields=` querystring -> projectie, 400 bij onbekende velden."""
+    try:
+        return parse_fields(fields, view)
+    except UnknownFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/owner/horses")
+async def list_owner_horses(
+    request: Request,
+    view: str = Query("card", description="card | detail | edit"),
+    fields: Optional[str] = Query(None, description="Komma-gescheiden projectie binnen de view"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="`next_cursor` van de vorige pagina"),
+    owner: Optional[OwnerProfile] = Depends(current_owner),
+    db: Session = Depends(get_db)
+):
+    """Eigen paarden op id, per pagina; `total` en ETag komen uit één aggregaat op de index."""
+    keys = _parse_horse_fields(view, fields)
+    serialize = compile_horse_serializer(view, keys)
+    try:
+        after_id = decode_cursor(cursor)[0] if cursor else 0
+        if not isinstance(after_id, int):
+            raise InvalidCursorError("Ongeldige cursor")
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if owner is None:
+        return {"horses": [], "total": 0, "next_cursor": None}
+    owner_id = owner.id
+    # ETag over aantal + laatste wijziging + id's: wijzigt bij elke insert/update/delete
+    total, last_updated, id_sum = (
+        db.query(func.count(HorseProfile.id), func.max(HorseProfile.updated_at), func.sum(HorseProfile.id))
+        .filter(HorseProfile.owner_profile_id == owner_id)
+        .one()
+    )
+    etag = make_etag("owner-horses", owner_id, total, last_updated, id_sum, view, ",".join(keys or ()),
+                     limit, after_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    # Alleen de kolommen die de view nodig heeft; limit + 1 om te weten of er een volgende pagina is
+    horses = (
+        db.query(HorseProfile)
+        .options(load_only(*[getattr(HorseProfile, c) for c in horse_columns(view, keys)]))
+        .filter(HorseProfile.owner_profile_id == owner_id, HorseProfile.id > after_id)
+        .order_by(HorseProfile.id)
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = encode_cursor(horses[limit - 1].id) if len(horses) > limit else None
+    return with_etag(FastJSONResponse({
+        "horses": [serialize(h) for h in horses[:limit]], "total": total, "next_cursor": next_cursor,
+    }), etag)
+
+@router.post("/owner/horses/bulk")
+async def bulk_import_horses(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson | csv (default: uit Content-Type)"),
+    current_user: User = Depends(get_current_user),
+    owner: Optional[OwnerProfile] = Depends(current_owner),
+    db: Session = Depends(get_db)
+):
+    """NDJSON/CSV stream van paarden; per rij created/updated/error (zie horse_bulk)."""
+    fmt = detect_format(format, request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Verwacht application/x-ndjson of text/csv")
+    owner_id = _get_or_create_owner(db, owner, current_user.id).id
+    try:
+        result = await import_horses(db, owner_id, request.stream(), fmt)
+    except BulkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    log.info("bulk import", extra={"owner_id": owner_id, "format": fmt, "rows_created": result["created"],
+                                   "rows_updated": result["updated"], "rows_failed": result["failed"]})
+    return FastJSONResponse(result)
+
+@router.get("/owner/horses/export")
+async def export_owner_horses(
+    format: str = Query("ndjson", description="ndjson | csv"),
+    owner: Optional[OwnerProfile] = Depends(current_owner),
+    db: Session = Depends(get_db)
+):
+    """Alle eigen paarden als stream, in het formaat van de bulk import."""
+    if format not in BULK_FORMATS:
+        raise HTTPException(status_code=400, detail="format moet ndjson of csv zijn")
+    return StreamingResponse(export_horses(db, owner.id if owner else None, format), media_type=BULK_FORMATS[format], headers={
+        "Content-Disposition": f'attachment; filename="horses.{format}"'})
+
+@router.get("/owner/horses/{horse_id}")
+async def get_owner_horse(
+    horse_id: int,
+    fields: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Volledige serialisatie van één eigen paard (wizard prefill)."""
+    serialize = compile_horse_serializer("edit", _parse_horse_fields("edit", fields))
+    horse = (
+        db.query(HorseProfile)
+        .join(OwnerProfile, HorseProfile.owner_profile_id == OwnerProfile.id)
+        .filter(HorseProfile.id == horse_id, OwnerProfile.user_id == current_user.id)
+        .first()
+    )
+    if not horse:
+        raise HTTPException(status_code=404, detail="Horse not found")
+    return FastJSONResponse(serialize(horse))
+
+@router.get("/ads/search")
+async def search_ads(
+    q: Optional[str] = Query(None, max_length=200, description="Vrije zoektekst (titel, verhaal, ras, plaats)"),
+    match_schedule: bool = Query(False, description="Alleen advertenties die passen bij mijn beschikbaarheid"),
+    exclude_no_gos: Optional[str] = Query(None, description="Komma-gescheiden; paarden met één van deze no-gos uitsluiten"),
+    temperament: Optional[str] = Query(None, description="Komma-gescheiden, minimaal één van"),
+    ad_types: Optional[str] = Query(None, description="Komma-gescheiden, minimaal één van"),
+    coat_colors: Optional[str] = Query(None, description="Komma-gescheiden, minimaal één van"),
+    disciplines: Optional[str] = Query(None, description="Komma-gescheiden, minimaal één van"),
+    match_skills: bool = Query(False, description="Alleen paarden waarvan alle vereiste skills in mijn profiel staan"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Gepubliceerde advertenties: vrije tekst, lijstfilters en matching op het ruiterprofiel.
+
+    Leest alleen `published_ads` (voorgerenderde cards, zie published_ads.py).
+    """
+    query = db.query(PublishedAd.card, PublishedAd.available_mask)
+
+    rider = None
+    if match_schedule or match_skills:
+        rider = (
+            db.query(RiderProfile.id, RiderProfile.available_mask, RiderProfile.min_days_per_week)
+            .filter(RiderProfile.user_id == current_user.id)
+            .first()
+        )
+        if not rider:
+            raise HTTPException(status_code=404, detail="Rider profile not found")
+
+    rider_mask = 0
+    if match_schedule:
+        rider_mask = rider.available_mask or 0
+        # minimaal één gedeeld dagdeel, en genoeg gedeelde dagen voor beide kanten
+        query = query.filter(sql_overlap_blocks(PublishedAd.available_mask, rider_mask) > 0)
+        query = query.filter(or_(
+            PublishedAd.min_days_per_week.is_(None),
+            sql_overlap_days(PublishedAd.available_mask, rider_mask) >= PublishedAd.min_days_per_week,
+        ))
+        if rider.min_days_per_week:
+            query = query.filter(sql_overlap_days(PublishedAd.available_mask, rider_mask) >= int(rider.min_days_per_week))
+
+    if match_skills:
+        skills = tags_for(db, "rider", rider.id, "general_skills")
+        query = query.filter(only_tags_within("horse", PublishedAd.horse_id, "required_skills", skills))
+
+    # Lijstvelden via profile_tags (index) i.p.v. JSON scan
+    for attribute, raw in (
+        ("temperament", temperament),
+        ("ad_types", ad_types),
+        ("coat_colors", coat_colors),
+        ("disciplines", disciplines),
+    ):
+        values = split_csv(raw)
+        if values:
+            query = query.filter(has_any_tag("horse", PublishedAd.horse_id, attribute, values))
+
+    no_gos = split_csv(exclude_no_gos)
+    if no_gos:
+        query = query.filter(~has_any_tag("horse", PublishedAd.horse_id, "no_gos", no_gos))
+
+    # Full-text: filter + sortering op relevantie (daarna op recentheid)
+    if q and q.strip():
+        query = apply_fulltext(query, q.strip(), db.get_bind().dialect.name, PublishedAd.horse_id)
+
+    total = query.order_by(None).with_entities(func.count(PublishedAd.horse_id)).scalar()
+    rows = query.order_by(PublishedAd.updated_at.desc(), PublishedAd.horse_id.desc()).offset(offset).limit(limit).all()
+    cards = [
+        with_field(card.encode(), "schedule_overlap_days", overlap_days(rider_mask, mask)) if match_schedule
+        else card.encode()
+        for card, mask in rows
+    ]
+    return Response(splice_json({"total": total}, "results", cards), media_type="application/json")
+
+@router.get("/ads/{horse_id}")
+async def get_ad_detail(
+    horse_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Komma-gescheiden projectie"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Public-ish ad read: visible if published, or always for the owner."""
+    keys = _parse_horse_fields("detail", fields)
+    # Goedkope query: alleen wat nodig is voor toegang + ETag
+    meta = (
+        db.query(HorseProfile.updated_at, HorseProfile.status, OwnerProfile.user_id)
+        .outerjoin(OwnerProfile, HorseProfile.owner_profile_id == OwnerProfile.id)
+        .filter(HorseProfile.id == horse_id)
+        .first()
+    )
+    if not meta:
+        raise HTTPException(status_code=404, detail="Ad not found")
+    updated_at, status, owner_user_id = meta
+    is_owner = owner_user_id is not None and owner_user_id == current_user.id
+
+    # Gate: must be published unless owner
+    if not is_owner and status != PUBLISHED:
+        raise HTTPException(status_code=403, detail="Ad not available")
+
+    # ETag per rol: huisnummer alleen voor de eigenaar (privacy)
+    field_key = ",".join(keys or ())
+    etag = make_etag("ad", horse_id, updated_at, is_owner, field_key)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    def build():
+        h = db.query(HorseProfile).filter(HorseProfile.id == horse_id).first()
+        if not h:
+            raise HTTPException(status_code=404, detail="Ad not found")
+        return compile_horse_serializer("detail", keys, is_owner)(h)
+
+    return render_cached(ad_detail_cache, (horse_id, is_owner, field_key), etag, build)
+
+def _get_or_create_owner(db: Session, owner: Optional[OwnerProfile], user_id: int) -> OwnerProfile:
+    if not owner:
+        # maak owner profiel minimaal als het nog niet bestaat
+        owner = OwnerProfile(user_id=user_id, postcode="", visible_radius=10, available_days={})
+        db.add(owner)
+        db.commit()
+        db.refresh(owner)
+    return owner
+
+@router.post("/owner/horses")
+async def create_or_update_horse(
+    payload: HorsePayload,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    owner: Optional[OwnerProfile] = Depends(current_owner),
+    db: Session = Depends(get_db)
+):
+    owner = _get_or_create_owner(db, owner, current_user.id)
+
+    if payload.id:
+        horse = db.query(HorseProfile).filter(HorseProfile.id == payload.id, HorseProfile.owner_profile_id == owner.id).first()
+        if not horse:
+            raise HTTPException(status_code=404, detail="Horse not found")
+        check_version(parse_if_match(request), horse.version)
+    else:
+        # Nieuw paard: standaard als concept (niet gepubliceerd)
+        horse = HorseProfile(owner_profile_id=owner.id, name=payload.name or "", type=payload.type or "pony", status=DRAFT)
+        db.add(horse)
+
+    # payload-gedreven updates
+    if payload.title is not None:
+        horse.title = payload.title
+    if payload.description is not None:
+        horse.description = payload.description
+    if payload.ad_type is not None:
+        horse.ad_type = payload.ad_type
+    if payload.ad_types is not None:
+        horse.ad_types = payload.ad_types
+    if payload.name is not None:
+        horse.name = payload.name
+    if payload.type is not None:
+        horse.type = payload.type
+    if payload.height is not None:
+        try:
+            horse.height = int(payload.height)
+        except Exception:
+            pass
+    if payload.age is not None:
+        try:
+            horse.age = int(payload.age)
+        except Exception:
+            pass
+    if payload.gender is not None:
+        horse.gender = payload.gender
+    if payload.breed is not None:
+        horse.breed = payload.breed
+    if payload.disciplines is not None:
+        horse.disciplines = payload.disciplines
+    if payload.level is not None:
+        horse.level = payload.level
+    if payload.max_jump_height is not None:
+        try:
+            horse.max_jump_height = int(payload.max_jump_height)
+        except Exception:
+            pass
+    if payload.coat_colors is not None:
+        horse.coat_colors = payload.coat_colors
+    if payload.temperament is not None:
+        horse.temperament = payload.temperament
+    if payload.photos is not None:
+        horse.photos = payload.photos
+    if payload.videos is not None:
+        # persist array and keep first as legacy field for compatibility
+        horse.videos = payload.videos
+        if isinstance(payload.videos, list) and payload.videos:
+            horse.video = payload.videos[0]
+    if payload.video_intro_url is not None:
+        horse.video = payload.video_intro_url
+    if payload.video is not None:
+        horse.video = payload.video
+    if payload.required_tasks is not None:
+        horse.required_tasks = payload.required_tasks
+    if payload.optional_tasks is not None:
+        horse.optional_tasks = payload.optional_tasks
+    if payload.task_frequency is not None:
+        horse.task_frequency = payload.task_frequency
+    if payload.available_days is not None and isinstance(payload.available_days, dict):
+        horse.available_days = payload.available_days
+    if payload.min_days_per_week is not None:
+        try:
+            horse.min_days_per_week = int(payload.min_days_per_week)
+        except Exception:
+            pass
+    if payload.session_duration_min is not None:
+        horse.session_duration_min = payload.session_duration_min
+    if payload.session_duration_max is not None:
+        horse.session_duration_max = payload.session_duration_max
+    if payload.cost_model is not None:
+        horse.cost_model = payload.cost_model
+    if payload.cost_amount is not None:
+        try:
+            horse.cost_amount = int(payload.cost_amount)
+        except Exception:
+            pass
+    if payload.comfort_flags is not None:
+        horse.comfort_flags = payload.comfort_flags
+    if payload.activity_mode is not None:
+        horse.activity_mode = payload.activity_mode
+    if payload.required_skills is not None:
+        horse.required_skills = payload.required_skills
+    if payload.desired_rider_personality is not None:
+        horse.desired_rider_personality = payload.desired_rider_personality
+    if payload.rules is not None:
+        horse.rules = payload.rules
+    if payload.no_gos is not None:
+        horse.no_gos = payload.no_gos
+    if payload.is_available is not None:
+        horse.is_available = bool(payload.is_available)
+    if payload.status is not None:
+        if payload.status not in STATUSES:
+            raise HTTPException(status_code=422, detail=f"status moet {' of '.join(STATUSES)} zijn")
+        horse.status = payload.status
+    # Stable address
+    if payload.stable_country_code is not None:
+        horse.stable_country_code = (payload.stable_country_code or '').upper()[:2]
+    if payload.stable_postcode is not None:
+        horse.stable_postcode = payload.stable_postcode
+    if payload.stable_house_number is not None:
+        horse.stable_house_number = payload.stable_house_number
+    if payload.stable_house_number_addition is not None:
+        horse.stable_house_number_addition = payload.stable_house_number_addition
+    if payload.stable_street is not None:
+        horse.stable_street = payload.stable_street
+    if payload.stable_city is not None:
+        horse.stable_city = payload.stable_city
+    if payload.stable_lat is not None:
+        try:
+            horse.stable_lat = float(payload.stable_lat)
+        except Exception:
+            pass
+    if payload.stable_lon is not None:
+        try:
+            horse.stable_lon = float(payload.stable_lon)
+        except Exception:
+            pass
+    if payload.stable_geocode_confidence is not None:
+        try:
+            horse.stable_geocode_confidence = float(payload.stable_geocode_confidence)
+        except Exception:
+            pass
+    if payload.stable_needs_review is not None:
+        horse.stable_needs_review = bool(payload.stable_needs_review)
+    # Facilities flags
+    if payload.indoor_arena is not None:
+        horse.indoor_arena = bool(payload.indoor_arena)
+    if payload.outdoor_arena is not None:
+        horse.outdoor_arena = bool(payload.outdoor_arena)
+    if payload.longe_circle is not None:
+        horse.longe_circle = bool(payload.longe_circle)
+    if payload.horse_walker is not None:
+        horse.horse_walker = bool(payload.horse_walker)
+    if payload.toilet_available is not None:
+        horse.toilet_available = bool(payload.toilet_available)
+    if payload.locker_available is not None:
+        horse.locker_available = bool(payload.locker_available)
+    # Ad meta
+    if payload.ad_reason is not None:
+        horse.ad_reason = payload.ad_reason
+    # Dates handling
+    from datetime import datetime
+    if payload.no_end_date is not None:
+        horse.no_end_date = bool(payload.no_end_date)
+        if horse.no_end_date:
+            horse.end_date = None
+    if payload.start_date is not None:
+        try:
+            horse.start_date = datetime.strptime(payload.start_date, "%Y-%m-%d").date()
+        except Exception:
+            horse.start_date = None
+    if payload.end_date is not None and not bool(payload.no_end_date):
+        try:
+            horse.end_date = datetime.strptime(payload.end_date, "%Y-%m-%d").date()
+        except Exception:
+            horse.end_date = None
+
+    commit_versioned(db, HorseProfile, payload.id)
+    db.refresh(horse)
+    return {"message": "Horse saved", "horse_id": horse.id, "version": horse.version}
+
+@router.patch("/owner/horses/{horse_id}")
+async def patch_horse_fields(
+    horse_id: int,
+    request: Request,
+    body: Any = Body(..., description="Merge-patch object of JSON Patch lijst"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Per-veld update vanuit de wizard: alleen de meegestuurde velden, één UPDATE zonder SELECT/refresh."""
+    try:
+        changes = parse_patch(body)
+        values = build_values(changes)
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    if not values:
+        raise HTTPException(status_code=400, detail="Geen velden om bij te werken")
+
+    expected = parse_if_match(request)
+    row = patch_horse(db, horse_id, current_user.id, values, expected_version=expected)
+    if row is None:
+        current = (
+            db.query(HorseProfile.version)
+            .join(OwnerProfile, HorseProfile.owner_profile_id == OwnerProfile.id)
+            .filter(HorseProfile.id == horse_id, OwnerProfile.user_id == current_user.id)
+            .scalar()
+        )
+        if current is not None and expected is not None:
+            raise conflict(current)
+        raise HTTPException(status_code=404, detail="Horse not found")
+    db.commit()
+    return {
+        "message": "Horse saved",
+        "horse_id": horse_id,
+        "version": row["version"],
+        "updated_at": row["updated_at"],
+        "fields": sorted(changes),
+    }
+
+@router.delete("/owner/horses/{horse_id}")
+async def delete_horse(
+    horse_id: int,
+    owner: OwnerProfile = Depends(require_owner),
+    db: Session = Depends(get_db)
+):
+    horse = db.query(HorseProfile).filter(HorseProfile.id == horse_id, HorseProfile.owner_profile_id == owner.id).first()
+    if not horse:
+        raise HTTPException(status_code=404, detail="Horse not found")
+    db.delete(horse)
+    db.commit()
+    return {"message": "Horse deleted", "horse_id": horse_id}
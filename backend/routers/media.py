@@ -0,0 +1,129 @@
+"""Uploads van foto's en video's: Azure Blob Storage als dat geconfigureerd is, anders lokaal."""
+import logging
+import os
+import time
+import uuid
+from functools import lru_cache
+from typing import List
+
+from fastapi import APIRouter, Depends, File, Request, UploadFile
+from sqlalchemy.orm import Session
+
+import metrics
+from auth import get_current_user
+from database import get_db
+from models import User
+from tasks import enqueue_image_derivatives
+
+log = logging.getLogger("horsesharing.api")
+
+router = APIRouter(tags=["media"])
+
+@lru_cache(maxsize=None)
+def _azure_blob_sdk():
+    """Optional Azure SDK, pas bij de eerste upload geïmporteerd: (BlobServiceClient, ContentSettings) of None."""
+    try:
+        from azure.storage.blob import BlobServiceClient, ContentSettings
+    except Exception:
+        return None
+    return BlobServiceClient, ContentSettings
+
+def _observe_upload(backend: str, size: int, started: float):
+    labels = (backend,)
+    metrics.UPLOAD_FILES.inc(labels)
+    metrics.UPLOAD_BYTES.inc(labels, size)
+    metrics.UPLOAD_FILE_BYTES.observe(labels, size)
+    metrics.UPLOAD_SECONDS.observe(labels, time.perf_counter() - started)
+
+@router.post("/media/upload")
+async def upload_media(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Uploads images either to Azure Blob Storage (if configured) or locally (/uploads).
+
+    Lokale afbeeldingen krijgen verkleinde versies via de `image_derivatives` job (met Pillow).
+    """
+    allowed_ext = [".jpg", ".jpeg", ".png", ".webp", ".mp4", ".mov", ".webm"]
+    settings = request.app.state.settings
+    azure_sdk = _azure_blob_sdk() if settings.use_azure else None
+    use_azure = azure_sdk is not None
+    log.info("upload_media", extra={"user_id": current_user.id, "azure": bool(use_azure),
+                                    "files": len(files) if files else 0})
+    if log.isEnabledFor(logging.DEBUG):
+        for idx, f in enumerate(files or []):
+            name = f.filename or "(no-name)"
+            log.debug("upload_media file", extra={"index": idx, "name": name, "ext": os.path.splitext(name)[1].lower(),
+                                                  "content_type": getattr(f, "content_type", None)})
+
+    urls: List[str] = []
+    if use_azure:
+        try:
+            BlobServiceClient, ContentSettings = azure_sdk
+            container = settings.azure_container
+            public_base = settings.azure_public_base_url
+            bsc = BlobServiceClient.from_connection_string(settings.azure_connection_string)
+            container_client = bsc.get_container_client(container)
+            for f in files:
+                filename = f.filename or "upload"
+                ext = os.path.splitext(filename)[1].lower()
+                if ext not in allowed_ext:
+                    log.info("upload_media skip disallowed ext", extra={"name": filename, "ext": ext, "target": "azure"})
+                    continue
+                blob_name = f"{uuid.uuid4().hex}{ext}"
+                blob_client = container_client.get_blob_client(blob_name)
+                started = time.perf_counter()
+                data = await f.read()
+                log.debug("upload_media azure upload", extra={"name": filename, "blob": blob_name, "size": len(data)})
+                # Determine proper content type
+                if ext == ".mp4":
+                    content_type = "video/mp4"
+                elif ext == ".mov":
+                    content_type = "video/quicktime"
+                elif ext == ".webm":
+                    content_type = "video/webm"
+                elif ext == ".png":
+                    content_type = "image/png"
+                elif ext == ".webp":
+                    content_type = "image/webp"
+                else:
+                    content_type = "image/jpeg"
+                blob_client.upload_blob(data, overwrite=True, content_settings=ContentSettings(content_type=content_type))
+                _observe_upload("azure", len(data), started)
+                if public_base:
+                    urls.append(f"{public_base.rstrip('/')}/{blob_name}")
+                else:
+                    # Default Azure URL format
+                    account = bsc.account_name
+                    urls.append(f"https://{account}.blob.core.windows.net/{container}/{blob_name}")
+            return {"urls": urls}
+        except Exception as e:
+            # Fallback to local if Azure fails
+            log.warning("Azure upload failed, falling back to local", exc_info=True)
+
+    # Local fallback
+    saved_files: List[str] = []
+    queued = False
+    for f in files:
+        filename = f.filename or "upload"
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in allowed_ext:
+            log.info("upload_media skip disallowed ext", extra={"name": filename, "ext": ext, "target": "local"})
+            continue
+        unique = f"{uuid.uuid4().hex}{ext}"
+        dest_path = os.path.join(settings.upload_root, unique)
+        started = time.perf_counter()
+        data = await f.read()
+        log.debug("upload_media local save", extra={"name": filename, "path": dest_path, "size": len(data)})
+        with open(dest_path, "wb") as out:
+            out.write(data)
+        _observe_upload("local", len(data), started)
+        saved_files.append(unique)
+        queued = enqueue_image_derivatives(db, unique) or queued
+    if queued:
+        db.commit()
+    base = str(request.base_url).rstrip('/')
+    urls = [f"{base}/uploads/{name}" for name in saved_files]
+    return {"urls": urls}
@@ -0,0 +1,273 @@
+"""Eigenaarsprofiel en de like van een eigenaar op een ruiter."""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from auth import get_current_user, owner_profile
+from concurrency import check_version, commit_versioned, parse_if_match
+from database import get_db
+from matches import like_response, owner_like
+from models import OwnerProfile, User
+from tasks import enqueue_kinde_sync
+
+router = APIRouter(tags=["owner"])
+
+class OwnerProfilePayload(BaseModel):
+    # User fields (sync with Kinde like rider)
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    phone: Optional[str] = None
+    # Owner profile fields
+    postcode: Optional[str] = None
+    visible_radius: Optional[int] = None
+    house_number: Optional[str] = None
+    house_number_addition: Optional[str] = None
+    street: Optional[str] = None
+    city: Optional[str] = None
+    country_code: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    geocode_confidence: Optional[float] = None
+    needs_review: Optional[bool] = None
+    date_of_birth: Optional[str] = None # optional, if we later want to compute age
+    # Guardian consent (if under 18)
+    parent_consent: Optional[bool] = None
+    parent_name: Optional[str] = None
+    parent_email: Optional[str] = None
+    # Profile photo
+    photo_url: Optional[str] = None
+
+@router.get("/owner-profile")
+async def get_owner_profile(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    owner: Optional[OwnerProfile] = Depends(owner_profile),
+    db: Session = Depends(get_db)
+):
+    # Try to get latest Kinde claims for immediate reflection
+    kinde_claims = {}
+    try:
+        auth_header = request.headers.get("authorization") or request.headers.get("Authorization")
+        if auth_header and auth_header.lower().startswith("bearer "):
+            token = auth_header.split(" ", 1)[1]
+            from auth import verify_kinde_token
+            kinde_claims = verify_kinde_token(token) or {}
+    except Exception:
+        kinde_claims = {}
+
+    # Extract possible latest name/phone from claims
+    given = (kinde_claims.get("given_name") or kinde_claims.get("first_name") or "").strip()
+    family = (kinde_claims.get("family_name") or kinde_claims.get("last_name") or "").strip()
+    full_claim_name = (given + (" " + family if family else "")).strip() or (kinde_claims.get("name") or "").strip()
+    claim_phone = (kinde_claims.get("phone_number") or "").strip()
+
+    # Best-effort: sync local user record if claims provide fresher values
+    updated = False
+    if full_claim_name and (current_user.name or "").strip() != full_claim_name:
+        current_user.name = full_claim_name
+        updated = True
+    if claim_phone and (current_user.phone or "").strip() != claim_phone:
+        current_user.phone = claim_phone
+        updated = True
+    if updated:
+        db.add(current_user)
+        db.commit()
+        db.refresh(current_user)
+
+    if not owner:
+        return {
+            "exists": False,
+            "user": {
+                "name": full_claim_name or current_user.name,
+                "email": current_user.email,
+                "phone": claim_phone or current_user.phone,
+                "kinde_given_name": given,
+                "kinde_family_name": family,
+            },
+            "profile": {}
+        }
+    # Compute age and minor flag for convenience
+    computed_age = None
+    computed_is_minor = None
+    try:
+        if owner.date_of_birth:
+            from datetime import date as _date
+            dob = owner.date_of_birth
+            today = _date.today()
+            computed_age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+            computed_is_minor = (computed_age is not None) and (computed_age < 18)
+    except Exception:
+        computed_age = None
+        computed_is_minor = None
+
+    return {
+        "exists": True,
+        "user": {
+            "name": full_claim_name or current_user.name,
+            "email": current_user.email,
+            "phone": claim_phone or current_user.phone,
+            "kinde_given_name": given,
+            "kinde_family_name": family,
+        },
+        "profile": {
+            "postcode": owner.postcode,
+            "house_number": owner.house_number,
+            "house_number_addition": owner.house_number_addition,
+            "street": owner.street,
+            "city": owner.city,
+            "country_code": owner.country_code,
+            "lat": owner.lat,
+            "lon": owner.lon,
+            "geocode_confidence": owner.geocode_confidence,
+            "needs_review": owner.needs_review,
+            "visible_radius": owner.visible_radius,
+            "available_days": owner.available_days or {},
+            "duration": owner.duration,
+            "date_of_birth": owner.date_of_birth.isoformat() if owner.date_of_birth else None,
+            "age": computed_age,
+            "is_minor": computed_is_minor,
+            "parent_consent": owner.parent_consent,
+            "parent_name": owner.parent_name,
+            "parent_email": owner.parent_email,
+            "photo_url": owner.photo_url,
+            "version": owner.version,
+        }
+    }
+
+@router.post("/owner-profile")
+async def create_or_update_owner_profile(
+    payload: OwnerProfilePayload,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    owner: Optional[OwnerProfile] = Depends(owner_profile),
+    db: Session = Depends(get_db)
+):
+    if not owner:
+        owner = OwnerProfile(
+            user_id=current_user.id,
+            postcode=payload.postcode or "",
+            visible_radius=(payload.visible_radius if payload.visible_radius is not None else 10),
+            available_days={},
+            duration=None,
+        )
+        db.add(owner)
+    else:
+        check_version(parse_if_match(request), owner.version)
+        # payload-gedreven updates
+        if payload.postcode is not None:
+            owner.postcode = payload.postcode
+        if payload.visible_radius is not None:
+            try:
+                owner.visible_radius = int(payload.visible_radius)
+            except Exception:
+                pass
+    # New fields now supported
+    if hasattr(payload, 'house_number') and payload.house_number is not None:
+        owner.house_number = payload.house_number
+    if hasattr(payload, 'house_number_addition') and payload.house_number_addition is not None:
+        owner.house_number_addition = payload.house_number_addition
+    if hasattr(payload, 'street') and payload.street is not None:
+        owner.street = payload.street
+    if hasattr(payload, 'city') and payload.city is not None:
+        owner.city = payload.city
+    if hasattr(payload, 'country_code') and payload.country_code is not None:
+        owner.country_code = (payload.country_code or '').upper()[:2]
+    if hasattr(payload, 'lat') and payload.lat is not None:
+        owner.lat = float(payload.lat)
+    if hasattr(payload, 'lon') and payload.lon is not None:
+        owner.lon = float(payload.lon)
+    if hasattr(payload, 'geocode_confidence') and payload.geocode_confidence is not None:
+        owner.geocode_confidence = float(payload.geocode_confidence)
+    if hasattr(payload, 'needs_review') and payload.needs_review is not None:
+        owner.needs_review = bool(payload.needs_review)
+    # photo_url: ook leegmaken toestaan (null vanuit frontend)
+    try:
+        if 'photo_url' in getattr(payload, '__fields_set__', set()):
+            owner.photo_url = payload.photo_url or None
+    except Exception:
+        if hasattr(payload, 'photo_url'):
+            owner.photo_url = payload.photo_url or None
+    # Enforce required date_of_birth
+    if payload.date_of_birth is None or str(payload.date_of_birth).strip() == "":
+        raise HTTPException(status_code=422, detail="Geboortedatum is verplicht")
+    if hasattr(payload, 'date_of_birth') and payload.date_of_birth is not None:
+        try:
+            # Accept YYYY-MM-DD
+            from datetime import datetime
+            owner.date_of_birth = datetime.strptime(payload.date_of_birth, "%Y-%m-%d").date()
+        except Exception:
+            pass
+
+    # Basic validation
+    # Phone: allow +, digits, spaces and hyphens; require at least 10 digits
+    if payload.phone is not None:
+        import re
+        digits = re.sub(r"\D", "", payload.phone)
+        if len(digits) < 10:
+            raise HTTPException(status_code=422, detail="Telefoonnummer ongeldig (minimaal 10 cijfers)")
+
+    # Date of birth -> set and compute minor flag
+    is_minor = False
+    if hasattr(payload, 'date_of_birth') and payload.date_of_birth is not None:
+        try:
+            from datetime import datetime, date
+            try:
+                dob = datetime.strptime(payload.date_of_birth, "%Y-%m-%d").date()
+            except ValueError:
+                dob = datetime.strptime(payload.date_of_birth, "%d-%m-%Y").date()
+            owner.date_of_birth = dob
+            today = date.today()
+            age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+            is_minor = age < 18
+        except Exception:
+            pass
+
+    # Guardian consent: required if minor
+    if is_minor:
+        if not payload.parent_consent or not (payload.parent_name or '').strip() or not (payload.parent_email or '').strip():
+            raise HTTPException(status_code=422, detail="Ouder/voogd toestemming vereist voor minderjarige (naam en e-mail verplicht)")
+        # basic email check
+        import re
+        if not re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", payload.parent_email.strip()):
+            raise HTTPException(status_code=422, detail="E-mailadres ouder/voogd ongeldig")
+        owner.parent_consent = True
+        owner.parent_name = payload.parent_name.strip()
+        owner.parent_email = payload.parent_email.strip()
+        from datetime import datetime as _dt
+        owner.parent_consent_timestamp = _dt.utcnow()
+
+    # Update User fields (name/phone) and sync to Kinde like rider flow
+    name_updated = False
+    if (payload.first_name or payload.last_name):
+        parts = []
+        if payload.first_name: parts.append(payload.first_name)
+        if payload.last_name: parts.append(payload.last_name)
+        new_name = " ".join(parts).strip()
+        if new_name:
+            current_user.name = new_name
+            name_updated = True
+    if payload.phone is not None:
+        current_user.phone = payload.phone
+
+    # Naam/telefoon naar Kinde via de kinde_sync job (gaat mee in dezelfde commit)
+    enqueue_kinde_sync(db, current_user.kinde_id, name=current_user.name if name_updated else None,
+                       phone=current_user.phone if payload.phone is not None else None)
+
+    commit_versioned(db, OwnerProfile, owner.id)
+    db.refresh(owner)
+    return {"message": "Owner profile saved", "owner_profile_id": owner.id, "version": owner.version}
+
+@router.post("/matches/{match_id}/owner-like")
+async def like_rider(
+    match_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Eigenaar liket een ruiter die op zijn paard reageerde; één UPDATE die ook de match bepaalt."""
+    row, changed = owner_like(db, match_id, current_user.id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Match not found")
+    db.commit()
+    return like_response(row, changed)
@@ -0,0 +1,184 @@
+"""Ruiterprofiel en de like van een ruiter op een paard."""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+
+from auth import get_current_user, require_rider, rider_profile
+from concurrency import check_version, commit_versioned, parse_if_match
+from database import get_db
+from matches import like_response, rider_like
+from models import RiderProfile, User
+from responses import FastJSONResponse
+from rider_profile import RiderProfileCreate, normalize_activities
+from rider_profile import build_values as build_rider_values, user_changes as rider_user_changes
+from tasks import enqueue_kinde_sync
+
+router = APIRouter(tags=["rider"])
+
+@router.post("/rider-profile")
+async def create_or_update_rider_profile(
+    payload: RiderProfileCreate,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    existing_profile: Optional[RiderProfile] = Depends(rider_profile),
+    db: Session = Depends(get_db)
+):
+    """Create or update rider profile"""
+    if existing_profile:
+        check_version(parse_if_match(request), existing_profile.version)
+
+    # Naam/telefoon: lokaal + (best-effort) Kinde, alleen als ze echt wijzigen
+    user_fields = rider_user_changes(payload, current_user)
+    for key, value in user_fields.items():
+        setattr(current_user, key, value)
+    # Naam/telefoon naar Kinde via de kinde_sync job (gaat mee in dezelfde commit)
+    enqueue_kinde_sync(db, current_user.kinde_id, **user_fields)
+
+    values = build_rider_values(payload, create=existing_profile is None)
+    if existing_profile is None:
+        profile = RiderProfile(user_id=current_user.id, **values)
+        db.add(profile)
+    else:
+        profile = existing_profile
+        for column, value in values.items():
+            setattr(profile, column, value)
+    normalize_activities(profile)
+
+    if existing_profile is None:
+        db.commit()
+    else:
+        commit_versioned(db, RiderProfile, profile.id)
+
+    if existing_profile is None:
+        return {"message": "Rider profile created", "profile_id": profile.id, "version": profile.version}
+    return {"message": "Profile updated successfully", "id": profile.id, "version": profile.version}
+
+@router.get("/rider-profile")
+async def get_rider_profile(
+    current_user: User = Depends(get_current_user),
+    profile: Optional[RiderProfile] = Depends(rider_profile),
+):
+    """Get current user's rider profile"""
+    if not profile:
+        raise HTTPException(status_code=404, detail="Rider profile not found")
+    
+    # Bepaal voor/achternaam: eerste deel = voornaam, rest = achternaam
+    first = ""
+    last = ""
+    if current_user.name:
+        parts = current_user.name.split(" ", 1)
+        first = parts[0]
+        last = parts[1] if len(parts) > 1 else ""
+
+    # Flatten availability for frontend expectations
+    flat_days = []
+    flat_blocks = []
+    if isinstance(profile.available_days, dict):
+        flat_days = list(profile.available_days.keys())
+        # Union of all blocks
+        seen = set()
+        for arr in profile.available_days.values():
+            for b in (arr or []):
+                seen.add(b)
+        flat_blocks = list(seen)
+    else:
+        flat_days = profile.available_days if profile.available_days else []
+        flat_blocks = []
+
+    # Format DOB
+    dob_str = ""
+    try:
+        if profile.date_of_birth:
+            dob_str = profile.date_of_birth.strftime("%Y-%m-%d")
+    except Exception:
+        dob_str = ""
+
+    return FastJSONResponse({
+        "id": profile.id,
+        "user_id": profile.user_id,
+        "first_name": first,
+        "last_name": last,
+        "phone": current_user.phone,
+        "date_of_birth": dob_str,
+        "age": profile.age,
+        "postcode": profile.postcode,
+        "house_number": profile.house_number,
+        "house_number_addition": profile.house_number_addition,
+        "street": profile.street,
+        "city": profile.city,
+        "country_code": profile.country_code,
+        "lat": profile.lat,
+        "lon": profile.lon,
+        "geocode_confidence": profile.geocode_confidence,
+        "needs_review": profile.needs_review,
+        "max_travel_distance_km": profile.max_travel_distance,
+        "transport_options": profile.transport_options if profile.transport_options else [],
+        "available_days": flat_days,
+        "available_time_blocks": flat_blocks,
+        "available_schedule": profile.available_days or {},
+        "session_duration_min": profile.session_duration_min if profile.session_duration_min is not None else 60,
+        "session_duration_max": profile.session_duration_max if profile.session_duration_max is not None else 120,
+        "start_date": profile.start_date,
+        "arrangement_duration": profile.duration_preference,
+        "budget_min_euro": profile.budget_min,
+        "budget_max_euro": profile.budget_max,
+        "experience_years": profile.years_experience,
+        "certification_level": profile.fnrs_level or profile.knhs_level or "",
+        "certifications": profile.certifications or [],
+        "comfort_levels": {
+            "traffic": profile.comfortable_with_traffic,
+            "outdoor_solo": profile.comfortable_solo_outside,
+            "nervous_horses": bool(profile.comfortable_with_nervous_horses),
+            "young_horses": bool(profile.comfortable_with_young_horses),
+            "stallions": bool(profile.comfortable_with_stallions),
+            "trail_rides": bool(getattr(profile, 'comfortable_with_trail_rides', False)),
+            "jumping_height": profile.max_jump_height or 0
+        },
+        "min_days_per_week": profile.min_days_per_week,
+        "riding_goals": profile.goals if profile.goals else [],
+        "discipline_preferences": profile.discipline_preferences if profile.discipline_preferences else [],
+        "general_skills": profile.general_skills or [],
+        "riding_styles": profile.riding_styles if profile.riding_styles else [],
+        "activity_mode": profile.activity_mode,
+        "activity_preferences": profile.activity_preferences if profile.activity_preferences else [],
+        "mennen_experience": profile.mennen_experience,
+        "personality_style": profile.personality_style if profile.personality_style else [],
+        "willing_tasks": profile.willing_tasks if profile.willing_tasks else [],
+        "task_frequency": profile.task_frequency,
+        "lease_preferences": profile.lease_preferences or {},
+        "material_preferences": {
+            "bitless_ok": profile.bitless_ok,
+            "spurs": bool(getattr(profile, 'spurs_ok', False)),
+            "auxiliary_reins": profile.training_aids_ok,
+            "own_helmet": True  # UI-only default
+        },
+        "health_restrictions": profile.health_limitations or [],
+        "insurance_coverage": profile.has_insurance,
+        "no_gos": profile.no_gos or [],
+        "photos": profile.photos if profile.photos else [],
+        "videos": (profile.videos if getattr(profile, 'videos', None) is not None else ([] if not profile.video_intro else [profile.video_intro])),
+        "video_intro_url": profile.video_intro,
+        "parent_consent": profile.parent_consent,
+        "parent_contact": profile.parent_contact,
+        "rider_height_cm": profile.rider_height_cm,
+        "rider_weight_kg": profile.rider_weight_kg,
+        "rider_bio": profile.rider_bio,
+        "desired_horse": profile.desired_horse or {},
+        "created_at": profile.created_at,
+        "updated_at": profile.updated_at,
+        "version": profile.version,
+    })
+
+@router.post("/matches/{horse_id}/like")
+async def like_horse(
+    horse_id: int,
+    rider: RiderProfile = Depends(require_rider),
+    db: Session = Depends(get_db)
+):
+    """Ruiter liket een gepubliceerd paard; één UPSERT die ook de match bepaalt (zie matches.py)."""
+    row, changed = rider_like(db, rider.id, horse_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Ad not found")
+    db.commit()
+    return like_response(row, changed)
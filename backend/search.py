@@ -0,0 +1,6 @@
+"""Query-helpers voor zoeken en matchen op advertenties."""
+
+
+def split_csv(value):
+    """'a, b,,c' -> ['a', 'b', 'c']"""
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
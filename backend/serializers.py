@@ -0,0 +1,171 @@
+"""Serialisatie van HorseProfile voor de API.
+
+Eén bron voor alle responses met paard/advertentie-data. Elk veld heeft een
+getter en de kolommen waar het van afhangt; per view (card/detail/edit) en per
+`fields=` projectie wordt de lijst getters één keer gecompileerd en daarna
+hergebruikt.
+"""
+from functools import lru_cache
+
+from models import PUBLISHED
+
+
+def _attr(name):
+    return lambda h: getattr(h, name)
+
+
+def _list(name):
+    return lambda h: getattr(h, name) or []
+
+
+def _dict(name):
+    return lambda h: getattr(h, name) or {}
+
+
+def _iso(name):
+    def get(h):
+        val = getattr(h, name)
+        return val.isoformat() if val else None
+    return get
+
+
+def _videos(h):
+    return h.videos if h.videos is not None else ([h.video] if h.video else [])
+
+
+def _cover_photo(h):
+    return h.photos[0] if h.photos else None
+
+
+# key -> (getter, bronkolommen)
+HORSE_FIELDS = {
+    "id": (_attr("id"), ("id",)),
+    "title": (_attr("title"), ("title",)),
+    "description": (_attr("description"), ("description",)),
+    "ad_type": (_attr("ad_type"), ("ad_type",)),
+    "ad_types": (_list("ad_types"), ("ad_types",)),
+    "name": (_attr("name"), ("name",)),
+    "type": (_attr("type"), ("type",)),
+    "height": (_attr("height"), ("height",)),
+    "age": (_attr("age"), ("age",)),
+    "gender": (_attr("gender"), ("gender",)),
+    "breed": (_attr("breed"), ("breed",)),
+    "photos": (_list("photos"), ("photos",)),
+    "video": (_attr("video"), ("video",)),
+    "video_intro_url": (_attr("video"), ("video",)),  # compat
+    "videos": (_videos, ("videos", "video")),
+    "disciplines": (_dict("disciplines"), ("disciplines",)),
+    "max_jump_height": (_attr("max_jump_height"), ("max_jump_height",)),
+    "level": (_attr("level"), ("level",)),
+    "coat_colors": (_list("coat_colors"), ("coat_colors",)),
+    "temperament": (_list("temperament"), ("temperament",)),
+    "required_tasks": (_list("required_tasks"), ("required_tasks",)),
+    "optional_tasks": (_list("optional_tasks"), ("optional_tasks",)),
+    "task_frequency": (_attr("task_frequency"), ("task_frequency",)),
+    "required_skills": (_list("required_skills"), ("required_skills",)),
+    "desired_rider_personality": (_list("desired_rider_personality"), ("desired_rider_personality",)),
+    "available_days": (_dict("available_days"), ("available_days",)),
+    "min_days_per_week": (_attr("min_days_per_week"), ("min_days_per_week",)),
+    "session_duration_min": (_attr("session_duration_min"), ("session_duration_min",)),
+    "session_duration_max": (_attr("session_duration_max"), ("session_duration_max",)),
+    "comfort_flags": (_dict("comfort_flags"), ("comfort_flags",)),
+    "activity_mode": (_attr("activity_mode"), ("activity_mode",)),
+    "cost_model": (_attr("cost_model"), ("cost_model",)),
+    "cost_amount": (_attr("cost_amount"), ("cost_amount",)),
+    "rules": (_dict("rules"), ("rules",)),
+    "no_gos": (_list("no_gos"), ("no_gos",)),
+    "status": (_attr("status"), ("status",)),
+    "is_available": (lambda h: h.status == PUBLISHED, ("status",)),  # compat
+    # Ad meta
+    "ad_reason": (_attr("ad_reason"), ("ad_reason",)),
+    "start_date": (_iso("start_date"), ("start_date",)),
+    "end_date": (_iso("end_date"), ("end_date",)),
+    "no_end_date": (lambda h: bool(h.no_end_date), ("no_end_date",)),
+    # Stable address
+    "stable_country_code": (_attr("stable_country_code"), ("stable_country_code",)),
+    "stable_postcode": (_attr("stable_postcode"), ("stable_postcode",)),
+    "stable_house_number": (_attr("stable_house_number"), ("stable_house_number",)),
+    "stable_house_number_addition": (_attr("stable_house_number_addition"), ("stable_house_number_addition",)),
+    "stable_street": (_attr("stable_street"), ("stable_street",)),
+    "stable_city": (_attr("stable_city"), ("stable_city",)),
+    "stable_lat": (_attr("stable_lat"), ("stable_lat",)),
+    "stable_lon": (_attr("stable_lon"), ("stable_lon",)),
+    "stable_geocode_confidence": (_attr("stable_geocode_confidence"), ("stable_geocode_confidence",)),
+    "stable_needs_review": (_attr("stable_needs_review"), ("stable_needs_review",)),
+    # Facilities
+    "indoor_arena": (_attr("indoor_arena"), ("indoor_arena",)),
+    "outdoor_arena": (_attr("outdoor_arena"), ("outdoor_arena",)),
+    "lighting": (_attr("lighting"), ("lighting",)),
+    "longe_circle": (_attr("longe_circle"), ("longe_circle",)),
+    "trail_access": (_attr("trail_access"), ("trail_access",)),
+    "trailer_available": (_attr("trailer_available"), ("trailer_available",)),
+    "horse_walker": (_attr("horse_walker"), ("horse_walker",)),
+    "toilet_available": (_attr("toilet_available"), ("toilet_available",)),
+    "locker_available": (_attr("locker_available"), ("locker_available",)),
+    # Voor If-Match bij opslaan (optimistic concurrency)
+    "version": (_attr("version"), ("version",)),
+    # Alleen in card view: coverfoto i.p.v. de volledige fotolijst
+    "cover_photo": (_cover_photo, ("photos",)),
+}
+
+# Alleen zichtbaar voor de eigenaar (privacy)
+OWNER_ONLY_FIELDS = frozenset({"stable_house_number", "stable_house_number_addition"})
+
+CARD_FIELDS = (
+    "id", "title", "name", "type", "age", "height", "ad_type", "ad_types",
+    "cover_photo", "is_available", "stable_city", "cost_model", "cost_amount",
+)
+DETAIL_FIELDS = tuple(k for k in HORSE_FIELDS if k != "cover_photo")
+EDIT_FIELDS = DETAIL_FIELDS
+
+VIEWS = {
+    "card": CARD_FIELDS,
+    "detail": DETAIL_FIELDS,
+    "edit": EDIT_FIELDS,
+}
+
+
+class UnknownFieldsError(ValueError):
+    pass
+
+
+def parse_fields(fields, view="detail"):
+    """`fields=` querystring -> tuple van keys binnen de view (None = hele view)."""
+    if view not in VIEWS:
+        raise UnknownFieldsError(f"Onbekende view: {view}")
+    if not fields:
+        return None
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    allowed = VIEWS[view]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise UnknownFieldsError(f"Onbekende velden: {', '.join(unknown)}")
+    # id altijd mee zodat de client items kan herkennen
+    return requested if "id" in requested else ("id",) + requested
+
+
+@lru_cache(maxsize=256)
+def _compile(keys, is_owner):
+    return tuple(
+        (key, (lambda h: None) if (key in OWNER_ONLY_FIELDS and not is_owner) else HORSE_FIELDS[key][0])
+        for key in keys
+    )
+
+
+def compile_horse_serializer(view="detail", fields=None, is_owner=True):
+    """Geeft een functie HorseProfile -> dict voor de gegeven view/projectie."""
+    keys = tuple(fields) if fields else VIEWS[view]
+    getters = _compile(keys, bool(is_owner))
+
+    def serialize(h):
+        return {key: get(h) for key, get in getters}
+    return serialize
+
+
+def horse_columns(view="detail", fields=None):
+    """Kolomnamen die nodig zijn voor de view/projectie (voor load_only)."""
+    keys = tuple(fields) if fields else VIEWS[view]
+    cols = {"id"}
+    for key in keys:
+        cols.update(HORSE_FIELDS[key][1])
+    return sorted(cols)
@@ -0,0 +1,79 @@
+"""App-configuratie: één `Settings` object, één keer geladen.
+
+`get_settings()` leest `.env` (als python-dotenv er is; echte env vars gaan
+voor) en daarna de omgeving, en bewaart het resultaat. `create_app(settings)`
+in main.py gebruikt dat object, of een eigen instantie in bench/tests:
+
+    create_app(replace(get_settings(), upload_root="/tmp/uploads", jobs_worker=False))
+
+Tunables die een module zelf bij import leest (poll-intervallen, buckets,
+SSE-limieten) blijven gewone env vars; `.env` wordt pas bij de eerste
+`get_settings()` geladen, dus zet die in de echte omgeving.
+"""
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _csv(value):
+    return tuple(v.strip() for v in value.split(",") if v.strip())
+
+
+@dataclass(frozen=True)
+class Settings:
+    kinde_domain: str | None = None
+    kinde_m2m_client_id: str | None = None
+    kinde_m2m_client_secret: str | None = None
+    kinde_audience: str | None = None
+    kinde_m2m_scope: str | None = None
+
+    # Azure Blob Storage voor uploads; zonder connection string + container lokaal in upload_root
+    azure_connection_string: str | None = None
+    azure_container: str | None = None
+    azure_public_base_url: str | None = None  # bv. https://<account>.blob.core.windows.net/<container>
+    upload_root: str = os.path.join(BACKEND_DIR, "uploads")
+
+    cors_origins: tuple = ("http://localhost:5173",)  # Vite default port
+    metrics_token: str | None = None
+    # Workers in het API-proces; uit als ze los draaien (python -m moderation / python -m jobs)
+    moderation_worker: bool = True
+    jobs_worker: bool = True
+
+    @property
+    def use_azure(self):
+        return bool(self.azure_connection_string and self.azure_container)
+
+    @classmethod
+    def from_env(cls, env=None):
+        env = os.environ if env is None else env
+        return cls(
+            kinde_domain=env.get("KINDE_DOMAIN"),
+            kinde_m2m_client_id=env.get("KINDE_M2M_CLIENT_ID"),
+            kinde_m2m_client_secret=env.get("KINDE_M2M_CLIENT_SECRET"),
+            kinde_audience=env.get("KINDE_AUDIENCE"),
+            kinde_m2m_scope=env.get("KINDE_M2M_SCOPE"),
+            azure_connection_string=env.get("AZURE_STORAGE_CONNECTION_STRING"),
+            azure_container=env.get("AZURE_CONTAINER"),
+            azure_public_base_url=env.get("AZURE_PUBLIC_BASE_URL"),
+            upload_root=env.get("UPLOAD_ROOT") or cls.upload_root,
+            cors_origins=_csv(env.get("CORS_ORIGINS", "")) or cls.cors_origins,
+            metrics_token=env.get("METRICS_TOKEN"),
+            moderation_worker=env.get("MODERATION_WORKER", "inline") == "inline",
+            jobs_worker=env.get("JOBS_WORKER", "inline") == "inline",
+        )
+
+
+def _load_dotenv():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    _load_dotenv()
+    return Settings.from_env()
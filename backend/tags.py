@@ -0,0 +1,157 @@
+"""Tags: lijstwaarden uit JSON-kolommen genormaliseerd in `profile_tags`.
+
+Zo wordt "temperament rustig en ad_type lease" een index-lookup i.p.v. een
+full scan met JSON-decoding in Python. De JSON-velden blijven de API; de tags
+worden via mapper-events (ORM writes) of `sync_tags` (Core writes) bijgewerkt.
+"""
+from sqlalchemy import delete, event, exists, insert, inspect, select
+
+from models import HorseProfile, ProfileTag, RiderProfile
+
+# entity -> {tag attribute: bronkolommen}
+TAGGED = {
+    "horse": {
+        "ad_types": ("ad_types", "ad_type"),
+        "temperament": ("temperament",),
+        "coat_colors": ("coat_colors",),
+        "disciplines": ("disciplines",),
+        "required_skills": ("required_skills",),
+        "no_gos": ("no_gos",),
+    },
+    "rider": {
+        "general_skills": ("general_skills",),
+        "riding_styles": ("riding_styles",),
+        "discipline_preferences": ("discipline_preferences",),
+    },
+}
+ENTITY_MODELS = {"horse": HorseProfile, "rider": RiderProfile}
+
+
+def normalize(value):
+    return str(value).strip().lower()[:100]
+
+
+def _values(raw):
+    if raw is None:
+        return []
+    if isinstance(raw, dict):
+        # disciplines: {"dressuur": "L1"} -> sleutels
+        raw = list(raw.keys())
+    elif isinstance(raw, str):
+        raw = [raw]
+    return [normalize(v) for v in raw if v is not None and str(v).strip()]
+
+
+def extract_tags(entity, source):
+    """attribute -> set(waarden) uit een model-instance of dict met kolomwaarden."""
+    get = source.get if isinstance(source, dict) else (lambda col: getattr(source, col, None))
+    out = {}
+    for attribute, columns in TAGGED[entity].items():
+        values = set()
+        for col in columns:
+            values.update(_values(get(col)))
+        out[attribute] = values
+    return out
+
+
+def affected_attributes(entity, columns):
+    """Welke tag-attributen afhangen van de gegeven (gewijzigde) kolommen."""
+    columns = set(columns)
+    return [a for a, cols in TAGGED[entity].items() if columns.intersection(cols)]
+
+
+def sync_tags(connection, entity, entity_id, tags):
+    """Vervang de tags voor de attributen in `tags` (attribute -> waarden)."""
+    if not tags:
+        return
+    connection.execute(
+        delete(ProfileTag).where(
+            ProfileTag.entity == entity,
+            ProfileTag.entity_id == entity_id,
+            ProfileTag.attribute.in_(list(tags)),
+        )
+    )
+    rows = [
+        {"entity": entity, "entity_id": entity_id, "attribute": attribute, "value": value}
+        for attribute, values in tags.items()
+        for value in sorted(values)
+    ]
+    if rows:
+        connection.execute(insert(ProfileTag), rows)
+
+
+# -----------------------------
+# ORM sync
+# -----------------------------
+
+def _after_insert(entity):
+    def listener(mapper, connection, target):
+        sync_tags(connection, entity, target.id, extract_tags(entity, target))
+    return listener
+
+
+def _after_update(entity):
+    def listener(mapper, connection, target):
+        state = inspect(target)
+        changed = [
+            col for cols in TAGGED[entity].values() for col in cols
+            if state.attrs[col].history.has_changes()
+        ]
+        attributes = affected_attributes(entity, changed)
+        if attributes:
+            tags = extract_tags(entity, target)
+            sync_tags(connection, entity, target.id, {a: tags[a] for a in attributes})
+    return listener
+
+
+def _after_delete(entity):
+    def listener(mapper, connection, target):
+        connection.execute(
+            delete(ProfileTag).where(ProfileTag.entity == entity, ProfileTag.entity_id == target.id)
+        )
+    return listener
+
+
+for _entity, _model in ENTITY_MODELS.items():
+    event.listen(_model, "after_insert", _after_insert(_entity))
+    event.listen(_model, "after_update", _after_update(_entity))
+    event.listen(_model, "after_delete", _after_delete(_entity))
+
+
+# -----------------------------
+# Query helpers (search/matching)
+# -----------------------------
+
+def has_any_tag(entity, id_column, attribute, values):
+    """Filter: entiteit heeft minimaal één van `values` voor `attribute`."""
+    values = [normalize(v) for v in values]
+    return id_column.in_(
+        select(ProfileTag.entity_id).where(
+            ProfileTag.entity == entity,
+            ProfileTag.attribute == attribute,
+            ProfileTag.value.in_(values),
+        )
+    )
+
+
+def only_tags_within(entity, id_column, attribute, allowed):
+    """Filter: alle waarden van `attribute` zitten in `allowed` (bv. vereiste skills ⊆ skills ruiter)."""
+    allowed = [normalize(v) for v in allowed]
+    return ~exists(
+        select(1).where(
+            ProfileTag.entity == entity,
+            ProfileTag.entity_id == id_column,
+            ProfileTag.attribute == attribute,
+            ProfileTag.value.not_in(allowed),
+        )
+    )
+
+
+def tags_for(db, entity, entity_id, attribute):
+    return [
+        v for (v,) in db.query(ProfileTag.value).filter(
+            ProfileTag.entity == entity,
+            ProfileTag.entity_id == entity_id,
+            ProfileTag.attribute == attribute,
+        )
+    ]
@@ -0,0 +1,173 @@
+"""Job-types voor de runner in jobs.py.
+
+    kinde_sync         naam/telefoon naar Kinde (was inline in de request)
+    geocode_backfill   profielen/stallen zonder coördinaten alsnog geocoden
+    image_derivatives  verkleinde WebP-versies van lokale uploads (Pillow, process-pool)
+    upload_gc          lokale uploads die nergens meer naar verwezen worden opruimen
+"""
+import importlib.util
+import logging
+import os
+import time
+
+from sqlalchemy import or_, select, update
+
+import geocode
+from auth import sync_kinde_user
+from database import SessionLocal
+from jobs import enqueue, job
+from models import PUBLISHED, HorseProfile, OwnerProfile, RiderProfile
+from published_ads import SOURCE_COLUMNS as AD_SOURCE_COLUMNS, refresh_ad
+from settings import get_settings
+
+log = logging.getLogger("horsesharing.tasks")
+
+# Optional Pillow (image_derivatives); pas in de job zelf geïmporteerd
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+DERIVATIVE_WIDTHS = (480, 1080)
+
+# Een upload die nog niet in een profiel is opgeslagen mag niet meteen weg
+UPLOAD_GC_MIN_AGE_HOURS = float(os.getenv("UPLOAD_GC_MIN_AGE_HOURS", "24"))
+
+# entity -> (model, kolomprefix); paarden hebben het stal-adres
+GEOCODE_ENTITIES = {"rider": (RiderProfile, ""), "owner": (OwnerProfile, ""), "horse": (HorseProfile, "stable_")}
+# Nominatim staat max. 1 request/s toe
+GEOCODE_DELAY_SECONDS = float(os.getenv("GEOCODE_BACKFILL_DELAY", "1.0"))
+
+
+# -----------------------------
+# Kinde
+# -----------------------------
+
+def enqueue_kinde_sync(db, kinde_id, name=None, phone=None):
+    """Job alleen als er M2M creds zijn en er iets te syncen valt (anders is sync_kinde_user een no-op)."""
+    if kinde_id and (name or phone) and get_settings().kinde_m2m_client_id:
+        enqueue(db, "kinde_sync", {"kinde_id": kinde_id, "name": name, "phone": phone})
+
+
+@job("kinde_sync", concurrency=2, max_attempts=6, backoff=30)
+def kinde_sync(payload):
+    sync_kinde_user(payload["kinde_id"], name=payload.get("name"), phone=payload.get("phone"), strict=True)
+
+
+# -----------------------------
+# Geocoding
+# -----------------------------
+
+def _store_geocode(db, model, row_id, values):
+    """Core UPDATE zonder `version` op te hogen: een achtergrondveld mag een open wizard
+    (If-Match) geen 409 geven. Geen mapper events, dus published_ads zelf bijwerken."""
+    stmt = update(model).where(model.id == row_id).values(**values).execution_options(synchronize_session=False)
+    if model is not HorseProfile:
+        db.execute(stmt)
+        return
+    row = db.execute(stmt.returning(*[getattr(HorseProfile, c) for c in AD_SOURCE_COLUMNS])).mappings().first()
+    if row is not None and row["status"] == PUBLISHED:
+        refresh_ad(db.connection(), dict(row))
+
+
+@job("geocode_backfill", max_attempts=3, backoff=60)
+def geocode_backfill(payload):
+    """payload: {"entities": ["rider", "owner", "horse"], "limit": 200} (per entity).
+
+    Mislukt een adres, dan krijgt het needs_review=True en wordt het de volgende keer overgeslagen.
+    """
+    limit = int(payload.get("limit", 200))
+    found = missed = 0
+    with SessionLocal() as db:
+        for entity in payload.get("entities") or GEOCODE_ENTITIES:
+            model, prefix = GEOCODE_ENTITIES[entity]
+
+            def col(name):
+                return getattr(model, prefix + name)
+
+            rows = db.execute(
+                select(model.id, col("country_code"), col("postcode"), col("house_number"), col("house_number_addition"))
+                .where(col("lat").is_(None), col("postcode").isnot(None), col("postcode") != "",
+                       col("house_number").isnot(None), or_(col("needs_review").is_(None), col("needs_review").is_(False)))
+                .order_by(model.id)
+                .limit(limit)
+            ).all()
+            for row_id, country_code, postcode, house_number, addition in rows:
+                res = geocode.lookup(country_code or "NL", postcode, house_number, addition or "")
+                if res and res.get("lat") is not None:
+                    values = {"lat": res["lat"], "lon": res["lon"], "geocode_confidence": res["confidence"],
+                              "needs_review": res["confidence"] < 0.9}
+                    found += 1
+                else:
+                    values = {"needs_review": True}
+                    missed += 1
+                _store_geocode(db, model, row_id, {prefix + k: v for k, v in values.items()})
+                if GEOCODE_DELAY_SECONDS and res and res.get("source") == "OSM":
+                    time.sleep(GEOCODE_DELAY_SECONDS)
+            db.commit()
+    log.info("geocode backfill", extra={"found": found, "missed": missed})
+
+
+# -----------------------------
+# Afbeeldingen
+# -----------------------------
+
+def enqueue_image_derivatives(db, filename):
+    """True als er een job is klaargezet (de caller commit)."""
+    if PIL_AVAILABLE and os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+        enqueue(db, "image_derivatives", {"file": filename})
+        return True
+    return False
+
+
+@job("image_derivatives", executor="process", concurrency=2, max_attempts=2, backoff=30)
+def image_derivatives(payload):
+    """uploads/<naam>.jpg -> uploads/<naam>_w480.webp en _w1080.webp (nooit groter dan het origineel)."""
+    if not PIL_AVAILABLE:
+        raise RuntimeError("Pillow niet geïnstalleerd")
+    from PIL import Image
+    upload_root = get_settings().upload_root
+    name = os.path.basename(payload["file"])
+    path = os.path.join(upload_root, name)
+    stem = os.path.splitext(name)[0]
+    with Image.open(path) as img:
+        img.load()
+        for width in DERIVATIVE_WIDTHS:
+            if img.width <= width:
+                continue
+            height = round(img.height * width / img.width)
+            img.convert("RGB").resize((width, height), Image.LANCZOS).save(
+                os.path.join(upload_root, f"{stem}_w{width}.webp"), "WEBP", quality=82)
+
+
+# -----------------------------
+# Upload GC
+# -----------------------------
+
+def _referenced_uploads(db):
+    """Bestandsnamen onder /uploads/ waar een profiel naar verwijst."""
+    columns = [RiderProfile.photos, RiderProfile.videos, RiderProfile.video_intro, OwnerProfile.photo_url,
+               HorseProfile.photos, HorseProfile.videos, HorseProfile.video]
+    names = set()
+    for column in columns:
+        for value in db.scalars(select(column).where(column.isnot(None))):
+            for url in value if isinstance(value, list) else [value]:
+                if isinstance(url, str) and "/uploads/" in url:
+                    names.add(url.rsplit("/", 1)[-1])
+    return names
+
+
+@job("upload_gc", max_attempts=1)
+def upload_gc(payload):
+    """payload: {"dry_run": false}. Afgeleiden (<naam>_w480.webp) gaan mee met hun origineel."""
+    cutoff = time.time() - UPLOAD_GC_MIN_AGE_HOURS * 3600
+    with SessionLocal() as db:
+        keep = {os.path.splitext(name)[0] for name in _referenced_uploads(db)}
+    removed = []
+    for entry in os.scandir(get_settings().upload_root):
+        if not entry.is_file() or entry.name.startswith(".") or entry.stat().st_mtime > cutoff:
+            continue
+        stem = os.path.splitext(entry.name)[0].rsplit("_w", 1)[0]
+        if stem not in keep:
+            removed.append(entry.name)
+            if not payload.get("dry_run"):
+                os.remove(entry.path)
+    log.info("upload gc", extra={"removed": len(removed), "dry_run": bool(payload.get("dry_run"))})
@@ -138,6 +138,8 @@ export default function HorseAdWizard() {
 
   // Autosave (concept) — debounced
   const saveTimerRef = useRef(null);
+  // Laatst bekende versie (If-Match) om gelijktijdige wijzigingen te detecteren
+  const versionRef = useRef(null);
   const [saving, setSaving] = useState(false);
   const [toast, setToast] = useState({ visible: false, message: '' });
   const showToast = (msg, ms = 2000) => {
@@ -228,14 +230,23 @@ export default function HorseAdWizard() {
     if (Object.keys(payload).length === 0) return;
     try {
       setSaving(true);
-      const res = await api.ownerHorses.createOrUpdate(payload);
+      // Bestaand paard: alleen velden patchen; nieuw: aanmaken via POST
+      const { id: existingId, ...fields } = payload;
+      const res = existingId
+        ? await api.ownerHorses.patch(existingId, fields, versionRef.current)
+        : await api.ownerHorses.createOrUpdate(payload);
       if (res && res.horse_id && !horseId) setHorseId(String(res.horse_id));
+      if (res && res.version != null) versionRef.current = res.version;
       if (showToast) {
         setToast({ visible: true, message: 'Concept opgeslagen' });
         window.clearTimeout(doAutoSave._t);
         doAutoSave._t = window.setTimeout(() => setToast({ visible: false, message: '' }), 2000);
       }
     } catch (e) {
+      if (e.status === 409) {
+        setToast({ visible: true, message: 'Deze advertentie is ergens anders gewijzigd. Herlaad de pagina.' });
+        return;
+      }
       // stilhouden in UI; concept autosave mag stil falen
       console.warn('Autosave horse failed', e);
     } finally {
@@ -255,10 +266,9 @@ export default function HorseAdWizard() {
     if (!id) return; // new: no prefill
     (async () => {
       try {
-        const res = await api.ownerHorses.list();
-        const horses = Array.isArray(res?.horses) ? res.horses : [];
-        const h = horses.find(x => String(x.id) === String(id));
+        const h = await api.ownerHorses.get(id);
         if (!h) return;
+        versionRef.current = h.version ?? null;
         setBasic(prev => ({
           ...prev,
           title: h.title || prev.title,
@@ -410,13 +420,14 @@ export default function HorseAdWizard() {
     if (expectations.rules) payload.rules = expectations.rules;
 
     try {
-      if (horseId) payload.id = Number(horseId);
-      const res = await api.ownerHorses.createOrUpdate(payload);
+      const res = horseId
+        ? await api.ownerHorses.patch(Number(horseId), payload, versionRef.current)
+        : await api.ownerHorses.createOrUpdate(payload);
       if (res && res.horse_id) setHorseId(String(res.horse_id));
       showToast('Advertentie opgeslagen');
       navigate('/owner/horses');
     } catch (e) {
-      showToast('Opslaan mislukt');
+      showToast(e.status === 409 ? 'Deze advertentie is ergens anders gewijzigd. Herlaad de pagina.' : 'Opslaan mislukt', 4000);
     }
   };
 
@@ -19,7 +19,10 @@ const OwnerHorses = () => {
   const navigate = useNavigate();
   const { role: activeRole, setActiveRole } = useActiveRole();
   const [items, setItems] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [toast, setToast] = useState({ visible: false, message: '' });
   const showToast = (msg, ms = 2000) => {
     setToast({ visible: true, message: msg });
@@ -29,7 +32,7 @@ const OwnerHorses = () => {
 
   const setPublished = async (id, publish) => {
     try {
-      await api.ownerHorses.createOrUpdate({ id, is_available: !!publish });
+      await api.ownerHorses.patch(id, { is_available: !!publish });
       setItems(prev => prev.map(x => x.id === id ? { ...x, is_available: !!publish } : x));
       showToast(publish ? 'Gepubliceerd' : 'Teruggezet naar concept');
     } catch (e) {
@@ -45,6 +48,8 @@ const OwnerHorses = () => {
         try { if (activeRole !== 'owner') await setActiveRole('owner'); } catch {}
         const res = await api.ownerHorses.list();
         setItems(Array.isArray(res?.horses) ? res.horses : []);
+        setTotal(res?.total || 0);
+        setNextCursor(res?.next_cursor || null);
       } catch (e) {
         showToast('Laden mislukt');
       } finally {
@@ -53,6 +58,21 @@ const OwnerHorses = () => {
     })();
   }, [isAuthenticated]);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await api.ownerHorses.list({ cursor: nextCursor });
+      setItems(prev => [...prev, ...(Array.isArray(res?.horses) ? res.horses : [])]);
+      setTotal(res?.total || 0);
+      setNextCursor(res?.next_cursor || null);
+    } catch (e) {
+      showToast('Laden mislukt');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Helper: navigeer altijd in owner context
   const goOwner = async (path) => {
     try { if (activeRole !== 'owner') await setActiveRole('owner'); } catch {}
@@ -64,6 +84,7 @@ const OwnerHorses = () => {
     try {
       await api.ownerHorses.delete(id);
       setItems(prev => prev.filter(x => x.id !== id));
+      setTotal(prev => Math.max(0, prev - 1));
       showToast('Advertentie verwijderd');
     } catch (e) {
       showToast('Verwijderen mislukt');
@@ -78,7 +99,7 @@ const OwnerHorses = () => {
         <div className="flex items-center justify-between mb-6">
           <div>
             <h1 className="text-2xl md:text-3xl font-bold text-gray-900">Mijn Paarden</h1>
-            <p className="text-gray-600">Beheer je concepten en advertenties</p>
+            <p className="text-gray-600">Beheer je concepten en advertenties{total ? ` · ${total} ${total === 1 ? 'paard' : 'paarden'}` : ''}</p>
           </div>
           <button onClick={() => goOwner('/owner/horses/new')} className="btn-role shadow">
             Nieuwe advertentie
@@ -112,8 +133,8 @@ const OwnerHorses = () => {
                         ))}
                       </div>
                     </div>
-                    {Array.isArray(h.photos) && h.photos[0] ? (
-                      <img src={h.photos[0]} alt="foto" className="w-20 h-20 rounded-lg object-cover border" />
+                    {h.cover_photo ? (
+                      <img src={h.cover_photo} alt="foto" className="w-20 h-20 rounded-lg object-cover border" />
                     ) : (
                       <div className="w-20 h-20 rounded-lg bg-gray-100 border flex items-center justify-center">🐴</div>
                     )}
@@ -132,6 +153,13 @@ const OwnerHorses = () => {
               ))}
             </div>
           )}
+          {!loading && nextCursor && (
+            <div className="mt-6 flex justify-center">
+              <button onClick={loadMore} disabled={loadingMore} className="px-4 py-2 text-sm rounded-lg border border-role text-role bg-role-soft hover:brightness-95 disabled:opacity-50">
+                {loadingMore ? 'Laden…' : `Meer laden (${items.length} van ${total})`}
+              </button>
+            </div>
+          )}
         </div>
       </div>
       <Toast visible={toast.visible} message={toast.message} />
@@ -31,7 +31,7 @@ const OwnerProfile = () => {
     // Fetch horses list (condensed view under profile)
     (async () => {
       try {
-        const res = await api.ownerHorses.list();
+        const res = await api.ownerHorses.list({ limit: 4 });
         if (!mounted) return;
         setHorses(Array.isArray(res?.horses) ? res.horses : []);
       } catch (e) {
@@ -129,8 +129,8 @@ const OwnerProfile = () => {
               <div className="grid md:grid-cols-2 gap-4">
                 {horses.slice(0,4).map(h => (
                   <div key={h.id} className="bg-white border border-gray-200 rounded-lg p-4 flex gap-3">
-                    {Array.isArray(h.photos) && h.photos[0] ? (
-                      <img src={h.photos[0]} alt="foto" className="w-20 h-20 rounded-lg object-cover border" />
+                    {h.cover_photo ? (
+                      <img src={h.cover_photo} alt="foto" className="w-20 h-20 rounded-lg object-cover border" />
                     ) : (
                       <div className="w-20 h-20 rounded-lg bg-gray-100 border flex items-center justify-center">🐴</div>
                     )}
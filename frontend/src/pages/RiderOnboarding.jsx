@@ -33,7 +33,7 @@ const RiderOnboarding = () => {
         const api = createAPI(getToken);
         const me = await api.user.getMe();
         if (!mounted) return;
-        if (me?.onboarding_completed) {
+        if (me?.rider_status === 'published') {
           navigate('/rider-profile?blocked=published');
         }
       } catch {
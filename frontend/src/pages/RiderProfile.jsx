@@ -121,7 +121,7 @@ const RiderProfile = () => {
   const progressPercentage = calculateRiderProfileProgress(profileData);
   const incompleteSteps = getIncompleteSteps(profileData);
   const isPublishable = publishableReady(profileData || {});
-  const isPublished = !!(me?.has_rider_profile && me?.onboarding_completed);
+  const isPublished = me?.rider_status === 'published';
 
   const handlePublish = async () => {
     try {
@@ -10,12 +10,12 @@ async function apiCall(endpoint, options = {}, token = null) {
   }
   
   const config = {
+    ...options,
     headers: {
       'Content-Type': 'application/json',
       'Authorization': `Bearer ${token}`,
       ...options.headers,
     },
-    ...options,
   };
 
   const response = await fetch(`${API_BASE_URL}${endpoint}`, config);
@@ -32,8 +32,17 @@ async function apiCall(endpoint, options = {}, token = null) {
       endpoint: endpoint,
       method: config.method
     });
-    const errorMessage = error.detail || error.message || `HTTP ${response.status}`;
-    throw new Error(errorMessage);
+    // 409 (versieconflict) geeft een object met message + current_version
+    const detail = error.detail;
+    const errorMessage = (detail && detail.message) || detail || error.message || `HTTP ${response.status}`;
+    const err = new Error(errorMessage);
+    err.status = response.status;
+    err.detail = detail;
+    // 429 (rate limit): seconden tot een nieuwe poging zin heeft
+    if (response.status === 429) {
+      err.retryAfter = Number(response.headers.get('Retry-After')) || 1;
+    }
+    throw err;
   }
 
   return response.json();
@@ -76,9 +85,19 @@ export const createAPI = (getToken) => ({
 
   // Owner Horses (advertenties per paard)
   ownerHorses: {
-    async list() {
+    // Gepagineerd: { horses, total, next_cursor }; geef next_cursor terug als `cursor`
+    async list({ cursor = null, limit = null, view = null } = {}) {
       const token = await getToken();
-      return apiCall('/owner/horses', {}, token);
+      const params = new URLSearchParams();
+      if (cursor) params.set('cursor', cursor);
+      if (limit) params.set('limit', String(limit));
+      if (view) params.set('view', view);
+      const qs = params.toString();
+      return apiCall(`/owner/horses${qs ? `?${qs}` : ''}`, {}, token);
+    },
+    async get(id) {
+      const token = await getToken();
+      return apiCall(`/owner/horses/${id}`, {}, token);
     },
     async createOrUpdate(horse) {
       const token = await getToken();
@@ -87,6 +106,16 @@ export const createAPI = (getToken) => ({
         body: JSON.stringify(horse || {}),
       }, token);
     },
+    // Alleen gewijzigde velden (wizard per tab)
+    // `version` -> If-Match: 409 als iemand anders tussentijds heeft opgeslagen
+    async patch(id, fields, version = null) {
+      const token = await getToken();
+      return apiCall(`/owner/horses/${id}`, {
+        method: 'PATCH',
+        body: JSON.stringify(fields || {}),
+        ...(version != null ? { headers: { 'If-Match': `"${version}"` } } : {}),
+      }, token);
+    },
     async delete(id) {
       const token = await getToken();
       const resp = await fetch(`${API_BASE_URL}/owner/horses/${id}`, {
@@ -126,6 +155,83 @@ export const createAPI = (getToken) => ({
     }
   },
 
+  // Meldingen (advertentie of foto); verwerking gebeurt asynchroon
+  abuse: {
+    // target: { horse_id } of { media_url }; reason: spam/scam/inappropriate/animal_welfare/wrong_info/other
+    async report(target, reason, comment) {
+      const token = await getToken();
+      const body = { target_type: target?.media_url ? 'media' : 'horse', ...target, reason, comment };
+      return apiCall('/abuse/report', { method: 'POST', body: JSON.stringify(body) }, token);
+    }
+  },
+
+  // Likes; de response zegt alleen of het wederzijds is (de like van de ander blijft verborgen)
+  matches: {
+    async like(horseId) {
+      const token = await getToken();
+      return apiCall(`/matches/${horseId}/like`, { method: 'POST' }, token);
+    },
+    async ownerLike(matchId) {
+      const token = await getToken();
+      return apiCall(`/matches/${matchId}/owner-like`, { method: 'POST' }, token);
+    }
+  },
+
+  // Live updates (Server-Sent Events) i.p.v. pollen. fetch i.p.v. EventSource,
+  // zodat het token in de Authorization header blijft en niet in de URL.
+  // onEvent(name, data): 'ready' (ook na reconnect: opnieuw ophalen), 'match', 'like', 'ad', 'resync'.
+  // Geeft een functie terug die de stream sluit.
+  events: {
+    subscribe({ ads = [], onEvent }) {
+      const controller = new AbortController();
+      let retryMs = 5000;
+
+      const connect = async () => {
+        while (!controller.signal.aborted) {
+          try {
+            const token = await getToken();
+            const query = ads.length ? `?ads=${ads.join(',')}` : '';
+            const resp = await fetch(`${API_BASE_URL}/events${query}`, {
+              headers: { 'Authorization': `Bearer ${token}`, 'Accept': 'text/event-stream' },
+              signal: controller.signal,
+            });
+            if (resp.status === 429 || resp.status === 503) {
+              retryMs = (Number(resp.headers.get('Retry-After')) || 30) * 1000;
+              throw new Error(`HTTP ${resp.status}`);
+            }
+            if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+
+            const reader = resp.body.pipeThrough(new TextDecoderStream()).getReader();
+            let buffer = '';
+            for (;;) {
+              const { value, done } = await reader.read();
+              if (done) break;
+              buffer += value;
+              let end;
+              while ((end = buffer.indexOf('\n\n')) >= 0) {
+                const block = buffer.slice(0, end);
+                buffer = buffer.slice(end + 2);
+                let name = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                  if (line.startsWith('event: ')) name = line.slice(7);
+                  else if (line.startsWith('data: ')) data += line.slice(6);
+                  else if (line.startsWith('retry: ')) retryMs = Number(line.slice(7)) || retryMs;
+                }
+                if (data) onEvent?.(name, JSON.parse(data));
+              }
+            }
+          } catch (e) {
+            if (controller.signal.aborted) return;
+          }
+          await new Promise((resolve) => setTimeout(resolve, retryMs));
+        }
+      };
+      connect();
+      return () => controller.abort();
+    }
+  },
+
   // User API calls
   user: {
     // Haal huidige user info op